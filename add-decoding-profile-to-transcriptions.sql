@@ -0,0 +1,19 @@
+-- Record which Whisper decoding profile produced each transcription
+-- and how long decoding took, so profiles can be compared on latency
+
+ALTER TABLE transcriptions
+ADD COLUMN IF NOT EXISTS decoding_profile VARCHAR(20) DEFAULT NULL;
+
+ALTER TABLE transcriptions
+ADD COLUMN IF NOT EXISTS decode_ms INTEGER DEFAULT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_transcriptions_decoding_profile ON transcriptions(decoding_profile);
+
+COMMENT ON COLUMN transcriptions.decoding_profile IS 'Whisper decoding profile used (fast, balanced, accurate)';
+COMMENT ON COLUMN transcriptions.decode_ms IS 'Whisper decode time for this transcription in milliseconds';
+
+-- Example: average decode latency per profile
+-- SELECT decoding_profile, COUNT(*), AVG(decode_ms) FROM transcriptions GROUP BY decoding_profile;
+
+-- Success message
+SELECT 'Decoding profile columns added to transcriptions table successfully!' as status;
@@ -0,0 +1,15 @@
+-- Record which version of the announcement rule file (frontend/announcement_rules.json)
+-- decided each transcription, so rule changes can be compared and rows re-scored selectively
+
+ALTER TABLE transcriptions
+ADD COLUMN IF NOT EXISTS rule_version VARCHAR(50) DEFAULT NULL;
+
+CREATE INDEX IF NOT EXISTS idx_transcriptions_rule_version ON transcriptions(rule_version);
+
+COMMENT ON COLUMN transcriptions.rule_version IS 'Announcement rule file version that classified this transcription';
+
+-- Example: announcements saved per rule version
+-- SELECT rule_version, COUNT(*), MIN(created_at), MAX(created_at) FROM transcriptions GROUP BY rule_version;
+
+-- Success message
+SELECT 'Rule version column added to transcriptions table successfully!' as status;
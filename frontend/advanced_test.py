@@ -4,191 +4,32 @@ Advanced test script for announcement detection with comprehensive dataset
 This includes edge cases, ambiguous cases, and real-world scenarios
 """
 
-import re
 import json
 from typing import Dict, List, Tuple
 
+from announcement_classifier import classify_type, score
+
 class AdvancedAnnouncementTester:
-    def __init__(self):
-        # Enhanced announcement patterns
-        self.announcement_patterns = [
-            # Direct announcement words
-            r'\b(attention|announcement|notice|important|alert|urgent|bulletin)\b',
-            r'\b(please note|kindly note|for your information|fyi|be advised)\b',
-            
-            # Group addressing
-            r'\b(all passengers|all students|all staff|all users|everyone|ladies and gentlemen)\b',
-            r'\b(dear passengers|dear students|dear customers|valued customers)\b',
-            
-            # Transportation/venue specific
-            r'\b(boarding|departure|arrival|gate|platform|floor|room|terminal|bay)\b',
-            r'\b(now boarding|final call|last call|delayed|cancelled|rescheduled)\b',
-            r'\b(track|concourse|level|section|area|zone|wing)\b',
-            
-            # Meeting/event related
-            r'\b(meeting|event|session|break|lunch|closing|opening|ceremony)\b',
-            r'\b(conference|seminar|workshop|presentation|briefing)\b',
-            
-            # Safety/emergency
-            r'\b(reminder|warning|caution|safety|emergency|evacuation|drill)\b',
-            r'\b(code red|code blue|lockdown|all clear)\b',
-            
-            # Time-sensitive announcements
-            r'\b(starting|beginning|commencing|concluding|ending|resuming)\b',
-            r'\b(scheduled|postponed|moved|relocated|transferred)\b',
-            
-            # Service announcements
-            r'\b(service|facility|available|unavailable|closed|open)\b',
-            r'\b(maintenance|cleaning|inspection|testing)\b'
-        ]
-        
-        # Conversational indicators (things that suggest casual conversation)
-        self.conversation_indicators = [
-            r'\b(i think|i feel|i believe|in my opinion|personally)\b',
-            r'\b(how are you|what\'s up|hey|hi|hello|bye|goodbye)\b',
-            r'\b(can you|could you|would you|will you)\b',
-            r'\b(i like|i love|i hate|i prefer)\b',
-            r'\b(maybe|perhaps|probably|possibly)\b',
-            r'\b(oh|ah|um|uh|well|so|anyway)\b'
-        ]
-        
     def enhanced_is_announcement(self, text: str) -> Dict:
         """Enhanced announcement detection with detailed scoring"""
-        text_lower = text.lower()
-        result = {
-            'is_announcement': False,
-            'confidence': 0.0,
-            'pattern_matches': [],
-            'conversation_indicators': 0,
-            'formal_score': 0,
-            'time_score': 0,
-            'location_score': 0,
-            'structure_score': 0,
-            'total_score': 0
+        result = score(text)
+        features = result.features
+        return {
+            'is_announcement': result.is_announcement,
+            'confidence': result.confidence,
+            'reason': result.reason,
+            'pattern_matches': features['strong_patterns'] + features['patterns'],
+            'conversation_indicators': len(features['conversation_patterns']),
+            'formal_score': features['formal'],
+            'time_score': features['time'],
+            'location_score': features['location'],
+            'structure_score': features['structure'],
+            'total_score': result.total_score
         }
-        
-        # 1. Check for direct announcement patterns
-        pattern_score = 0
-        for pattern in self.announcement_patterns:
-            if re.search(pattern, text_lower):
-                pattern_score += 2  # High weight for direct patterns
-                result['pattern_matches'].append(pattern)
-        
-        # 2. Check for conversational indicators (negative score)
-        conversation_score = 0
-        for pattern in self.conversation_indicators:
-            if re.search(pattern, text_lower):
-                conversation_score += 1
-        result['conversation_indicators'] = conversation_score
-        
-        # 3. Length and structure analysis
-        words = text.split()
-        word_count = len(words)
-        
-        # Too short is likely not an announcement
-        if word_count < 5:
-            result['structure_score'] = -2
-        elif word_count < 8:
-            result['structure_score'] = -1
-        elif word_count >= 10:
-            result['structure_score'] = 1
-        
-        # 4. Formal language indicators (enhanced)
-        formal_indicators = [
-            'please', 'kindly', 'thank you', 'ladies and gentlemen',
-            'we would like to', 'we are pleased to', 'we regret to',
-            'due to', 'as a result of', 'in order to', 'effective immediately',
-            'passengers are', 'customers are', 'students are', 'staff are'
-        ]
-        formal_count = sum(1 for indicator in formal_indicators if indicator in text_lower)
-        result['formal_score'] = formal_count
-        
-        # 5. Time-related indicators (enhanced)
-        time_indicators = [
-            'minutes', 'hours', 'o\'clock', 'am', 'pm', 'schedule', 'time',
-            'today', 'tomorrow', 'yesterday', 'now', 'soon', 'shortly',
-            'immediately', 'currently', 'presently', 'at this time',
-            'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday', 'sunday'
-        ]
-        time_count = sum(1 for indicator in time_indicators if indicator in text_lower)
-        result['time_score'] = time_count
-        
-        # 6. Location/direction indicators (enhanced)
-        location_indicators = [
-            'to', 'from', 'at', 'in', 'gate', 'platform', 'room', 'floor', 'building',
-            'terminal', 'departure', 'arrival', 'lounge', 'hall', 'auditorium',
-            'classroom', 'office', 'lobby', 'entrance', 'exit', 'left', 'right',
-            'north', 'south', 'east', 'west', 'upstairs', 'downstairs'
-        ]
-        location_count = sum(1 for indicator in location_indicators if indicator in text_lower)
-        result['location_score'] = location_count
-        
-        # 7. Sentence structure analysis
-        structure_bonus = 0
-        # Announcements often start with attention-grabbing words
-        first_words = text_lower[:20].split()
-        if first_words and first_words[0] in ['attention', 'notice', 'announcement', 'important', 'please', 'all', 'ladies', 'dear']:
-            structure_bonus += 2
-        
-        # Announcements often contain imperative or declarative statements
-        if any(phrase in text_lower for phrase in ['please', 'will', 'are', 'is', 'has been', 'have been']):
-            structure_bonus += 1
-        
-        # Calculate total score
-        total_score = (
-            pattern_score +
-            result['formal_score'] * 1.5 +
-            result['time_score'] * 1.0 +
-            result['location_score'] * 0.8 +
-            result['structure_score'] +
-            structure_bonus -
-            conversation_score * 2  # Penalty for conversational indicators
-        )
-        
-        result['total_score'] = total_score
-        
-        # Determine if it's an announcement based on score
-        if pattern_score > 0:  # Direct pattern match is strong indicator
-            result['is_announcement'] = True
-            result['confidence'] = min(0.9, 0.6 + (total_score * 0.1))
-        elif total_score >= 4:  # High score without direct pattern
-            result['is_announcement'] = True
-            result['confidence'] = min(0.8, 0.4 + (total_score * 0.1))
-        elif total_score >= 2 and conversation_score == 0:  # Medium score, no conversation indicators
-            result['is_announcement'] = True
-            result['confidence'] = min(0.7, 0.3 + (total_score * 0.1))
-        else:
-            result['is_announcement'] = False
-            result['confidence'] = max(0.1, 0.5 - abs(total_score) * 0.1)
-        
-        return result
     
     def classify_announcement(self, text: str) -> str:
         """Enhanced announcement classification"""
-        text_lower = text.lower()
-        
-        # Travel/Transportation
-        if any(word in text_lower for word in ['boarding', 'gate', 'departure', 'arrival', 'flight', 'train', 'bus', 'platform', 'track', 'terminal']):
-            return 'travel'
-        
-        # Meeting/Conference
-        elif any(word in text_lower for word in ['meeting', 'session', 'conference', 'seminar', 'workshop', 'presentation', 'briefing', 'break', 'lunch']):
-            return 'meeting'
-        
-        # Emergency/Safety
-        elif any(word in text_lower for word in ['emergency', 'evacuation', 'safety', 'alert', 'drill', 'code red', 'code blue', 'lockdown']):
-            return 'emergency'
-        
-        # Service/Facility
-        elif any(word in text_lower for word in ['service', 'facility', 'maintenance', 'cleaning', 'closed', 'open', 'available', 'unavailable']):
-            return 'service'
-        
-        # General/Information
-        elif any(word in text_lower for word in ['reminder', 'notice', 'information', 'update', 'change', 'schedule']):
-            return 'general'
-        
-        else:
-            return 'other'
+        return classify_type(text)
 
 def create_comprehensive_test_dataset() -> List[Tuple[str, bool, str]]:
     """Create a comprehensive test dataset with diverse examples"""
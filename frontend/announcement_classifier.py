@@ -0,0 +1,643 @@
+#!/usr/bin/env python3
+"""
+Announcement scoring library - the one implementation of the announcement rules
+Used by the live and offline transcribers and the test scripts; dependency-free (standard library only).
+The rules and weights live in a versioned rule file that running transcribers reload when it changes. They are compiled into a word-indexed phrase table, so each transcript is tokenized once and only the
+patterns it can possibly match are searched. ``score`` also returns type, confidence and features; ``analyze``
+(what the transcribers call) decides with the fast bool path and only scores announcements in full; ``score_many`` does
+the same for a batch.
+"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from itertools import compress
+from types import MappingProxyType
+from typing import Iterable, List, Mapping, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Versioned rule file: patterns, indicator phrases, weights and thresholds (see announcement_rules.json)
+# ANNOUNCEMENT_RULES and ANNOUNCEMENT_RULES_RELOAD_SECONDS are read when a classifier is built, after .env is loaded
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'announcement_rules.json')
+# How often running transcribers check the rule file for changes (0 = never reload)
+DEFAULT_RELOAD_SECONDS = 5.0
+
+INDICATOR_CATEGORIES = ('formal', 'public', 'time', 'location')
+# Speedup the compiled engine was asked for over the rule-by-rule reference (both without logging)
+TARGET_SPEEDUP = 10.0
+_REQUIRED_RULES = ('version', 'conversation_patterns', 'strong_patterns', 'announcement_patterns', 'indicators',
+                   'weights', 'passive_phrases', 'first_word_scores', 'min_words', 'score_threshold', 'types',
+                   'default_type', 'severity')
+
+
+class AnnouncementScore(NamedTuple):
+    """Everything known about one transcript, from a single pass: what persistence, alerting and reporting use.
+
+    ``confidence`` is in the decision either way. Type and severity are filled
+    in for every transcript (so test mode can save anything); ``features``
+    holds the matched patterns and indicator counts and is read-only.
+    """
+    is_announcement: bool
+    announcement_type: str
+    severity: str
+    confidence: float
+    reason: str
+    total_score: float
+    features: Mapping[str, object]
+    rule_version: str
+
+
+def rules_path() -> str:
+    return os.getenv('ANNOUNCEMENT_RULES', DEFAULT_RULES_PATH)
+
+
+def reload_interval() -> float:
+    return float(os.getenv('ANNOUNCEMENT_RULES_RELOAD_SECONDS', DEFAULT_RELOAD_SECONDS))
+
+
+def load_rules(path: Optional[str] = None) -> dict:
+    """Read a rule file (default: ANNOUNCEMENT_RULES); ValueError if it lacks anything the classifier needs"""
+    with open(path or rules_path()) as f:
+        rules = json.load(f)
+    missing = [key for key in _REQUIRED_RULES if key not in rules]
+    missing += [f"indicators.{name}" for name in INDICATOR_CATEGORIES if name not in rules.get('indicators', {})]
+    missing += [f"weights.{name}" for name in INDICATOR_CATEGORIES + ('pattern', 'passive')
+                if name not in rules.get('weights', {})]
+    if missing:
+        raise ValueError(f"{path}: missing {', '.join(missing)}")
+    return rules
+
+
+def _expand(pattern: str) -> Optional[List[str]]:
+    """Every string a pattern built from literals, escapes, groups and '|' can match (None if it uses anything else)"""
+    def alternatives(pos: int):
+        options, current = [], ['']
+        while pos < len(pattern):
+            char = pattern[pos]
+            if char == '|':
+                options += current
+                current = ['']
+                pos += 1
+            elif char == ')':
+                break
+            elif char == '(':
+                inner, pos = alternatives(pos + 1)
+                if pos >= len(pattern) or pattern[pos] != ')':
+                    raise ValueError(pattern)
+                current = [prefix + option for prefix in current for option in inner]
+                pos += 1
+            elif char == '\\':
+                escaped = pattern[pos + 1:pos + 2]
+                if escaped != 'b':  # Word boundaries don't change the text matched
+                    if escaped.isalnum():
+                        raise ValueError(pattern)  # \w, \d, ... are classes, not literals
+                    current = [prefix + escaped for prefix in current]
+                pos += 2
+            elif char in '[].*+?{}^$':
+                raise ValueError(pattern)
+            else:
+                current = [prefix + char for prefix in current]
+                pos += 1
+            if pos < len(pattern) and pattern[pos] in '*+?{':
+                raise ValueError(pattern)  # Quantified group/char
+        return options + current, pos
+
+    try:
+        expansions, end = alternatives(0)
+    except ValueError:
+        return None
+    return expansions if end == len(pattern) else None
+
+
+_WORD = re.compile(r'\w+')
+# ASCII text is split into words with a byte translation instead of the regex: every byte outside [a-z0-9_]
+# becomes a space (the text is lowercased first; non-ASCII text takes the regex, which knows Unicode letters)
+_SEPARATORS = bytes(byte if chr(byte).isalnum() and byte < 128 or byte == ord('_') else ord(' ') for byte in range(256))
+# Rank of a word that decides nothing by itself
+_NO_MATCH = 3
+_NO_FEATURES = MappingProxyType({})
+
+
+def _word_bounded(pattern: str) -> bool:
+    """True if ``pattern`` is ``\\b...\\b`` around a part without top-level '|', so every alternative is word-bounded"""
+    if not (pattern.startswith('\\b') and pattern.endswith('\\b')) or len(pattern) < 4 or pattern[-3] == '\\':
+        return False
+    depth, pos, inner = 0, 0, pattern[2:-2]
+    while pos < len(inner):
+        char = inner[pos]
+        if char == '\\':
+            pos += 1
+        elif char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+        elif char == '|' and depth == 0:
+            return False
+        pos += 1
+    return True
+
+
+def _bounded_phrase(phrase: str):
+    """Regex for one literal phrase with the word boundaries of the pattern it came from"""
+    return re.compile(r'\b' + re.escape(phrase) + r'\b')
+
+
+def _bounded_in(spaced: bytes, key: bytes, text_lower: str, phrase: str) -> bool:
+    """``\\bphrase\\b`` in an ASCII text, without a regex.
+
+    ``spaced`` is the text with every non-word byte turned into a space and
+    one space added at each end; ``key`` is the phrase the same way. A hit
+    there has word boundaries on both sides, and it is a real occurrence if
+    the original text has the phrase at the same offset (punctuation inside
+    the phrase became spaces too).
+    """
+    at = spaced.find(key)
+    while at >= 0:
+        if text_lower.startswith(phrase, at):
+            return True
+        at = spaced.find(key, at + 1)
+    return False
+
+
+def _spaced_key(phrase: str) -> Optional[bytes]:
+    """``phrase`` as ``_bounded_in`` looks for it, or None when that can't find it (non-ASCII, punctuation at an end)"""
+    if phrase.isascii() and _WORD.fullmatch(phrase[0] + phrase[-1]):
+        return b' ' + phrase.encode().translate(_SEPARATORS) + b' '
+    return None
+
+
+def _split(text_lower: str):
+    """(spaced text for ``_bounded_in`` or None if not ASCII, the ``\\w+`` words of the text as UTF-8 bytes)"""
+    if text_lower.isascii():
+        spaced = b' ' + text_lower.encode().translate(_SEPARATORS) + b' '
+        return spaced, spaced.split()
+    return None, [word.encode() for word in _WORD.findall(text_lower)]
+
+
+class AnnouncementClassifier:
+    """The announcement rules compiled once: same decisions, a fraction of the work per transcript.
+
+    Every conversation/strong/announcement pattern is a word-bounded set of
+    literal phrases, so it can only match where one of its phrases appears
+    as a substring starting with a whole word. One tokenizing scan gives the
+    words present. A one-word alternative of a word-bounded pattern matches
+    exactly when that word is present, so most patterns are decided by the
+    word set alone (one dict lookup per word, no regex). Only multi-word
+    phrases are substring-checked, only when they could outrank what the
+    words already decided, and a regex only runs to confirm word boundaries
+    on an actual hit. The substring indicator counts are only computed when
+    no pattern decided.
+    """
+
+    CONVERSATION, STRONG, ANNOUNCEMENT = range(3)
+
+    def __init__(self, rules: Optional[dict] = None):
+        rules = rules if rules is not None else load_rules()
+        self.version = str(rules['version'])
+        # Patterns in rank, then rule-file order; everything below refers to them by position (id)
+        self._patterns = []
+        self._exact = {}    # word -> ids of patterns that word alone matches
+        self._by_word = {}  # first word -> [(rank, multi-word phrase, id, _spaced_key, regex confirming it)]
+        self._always = []   # ids of patterns that aren't plain phrase sets: always searched
+        for rank, patterns in ((self.CONVERSATION, rules['conversation_patterns']),
+                               (self.STRONG, rules['strong_patterns']),
+                               (self.ANNOUNCEMENT, rules['announcement_patterns'])):
+            for pattern in patterns:
+                self._index(rank, pattern)
+        self._phrase_words = frozenset(self._by_word)
+        self._trigger_words = frozenset(self._exact) | self._phrase_words
+        # For decisions, one table: word -> (best rank it decides alone, multi-word phrases keyed by it). Phrases are
+        # keyed by their longest word (rarer than the first: "i think" is found via "think") and listed best rank
+        # first, so a scan stops at the first phrase that can't improve on what's decided
+        best = {}
+        for entries in self._by_word.values():
+            for rank, phrase, _, key, confirm in entries:
+                best[phrase, key, confirm] = min(rank, best.get((phrase, key, confirm), rank))
+        ranked_phrases = {}
+        for (phrase, key, confirm), rank in sorted(best.items(), key=lambda entry: entry[1]):
+            # Every word of a word-bounded phrase is a whole word of the text; otherwise only the first is
+            bounded = confirm.pattern == _bounded_phrase(phrase).pattern
+            words = _WORD.findall(phrase) if bounded else _WORD.findall(phrase)[:1]
+            ranked_phrases.setdefault(max(words, key=len).encode(), []).append((rank, phrase, key, confirm))
+        word_rank = {word: min(self._patterns[pid][0] for pid in ids) for word, ids in self._exact.items()}
+        self._decision = {word: (word_rank.get(word, _NO_MATCH), tuple(ranked_phrases.get(word, ())))
+                          for word in word_rank.keys() | ranked_phrases.keys()}
+        self._decision_words = frozenset(self._decision)
+
+        indicators, weights = rules['indicators'], rules['weights']
+        self._categories = tuple((name, frozenset(indicators[name])) for name in INDICATOR_CATEGORIES)
+        self._formal, self._public = self._categories[0][1], self._categories[1][1]
+        self._passive = frozenset(rules['passive_phrases'])
+        self._phrases = tuple(dict.fromkeys([phrase for name in INDICATOR_CATEGORIES for phrase in indicators[name]]
+                                            + rules['passive_phrases']))
+        # Each phrase counts once per category it's listed in
+        self._weights = {phrase: sum(weights[name] for name, phrases in self._categories if phrase in phrases)
+                         for phrase in self._phrases}
+        self._pattern_weight = weights['pattern']
+        self._passive_weight = weights['passive']
+        self._first_word_scores = dict(rules['first_word_scores'])
+        self._min_words = rules['min_words']
+        self._threshold = rules['score_threshold']
+
+        self._type_keywords = [keyword for entry in rules['types'] for keyword in entry['keywords']]
+        self._type_of_keyword = [entry['type'] for entry in rules['types'] for _ in entry['keywords']]
+        self._default_type = rules['default_type']
+        severity = rules['severity']
+        self._critical_types = frozenset(severity['critical_types'])
+        # Whole words/phrases that make a transcript critical whatever its type ("fire" but not "fired")
+        critical_keywords = severity.get('critical_keywords', ())
+        self._critical_wording = (re.compile(r'\b(?:' + '|'.join(map(re.escape, critical_keywords)) + r')\b')
+                                  if critical_keywords else None)
+        self._high_types = frozenset(severity['high_types'])
+        self._high_keywords = tuple(severity['high_keywords'])
+        self._default_severity = severity['default']
+
+    def _index(self, rank: int, pattern: str):
+        pid = len(self._patterns)
+        self._patterns.append((rank, re.compile(pattern)))
+        expansions = _expand(pattern) if pattern.startswith('\\b') else None
+        first_words = [_WORD.match(phrase) for phrase in expansions or ()]
+        if not expansions or not all(first_words):
+            self._always.append(pid)
+            return
+        bounded = _word_bounded(pattern)
+        for phrase, word in zip(expansions, first_words):
+            key = word.group().encode()
+            if bounded and word.group() == phrase:
+                ids = self._exact.setdefault(key, [])
+                if pid not in ids:
+                    ids.append(pid)
+            else:
+                # In a word-bounded pattern each phrase is confirmed on its own (shared across patterns)
+                if bounded:
+                    entry = (rank, phrase, pid, _spaced_key(phrase), _bounded_phrase(phrase))
+                else:
+                    entry = (rank, phrase, pid, None, self._patterns[pid][1])
+                self._by_word.setdefault(key, []).append(entry)
+
+    def _decisive(self, text_lower: str) -> Optional[int]:
+        """Highest-priority pattern class that matches (CONVERSATION < STRONG < ANNOUNCEMENT), or None"""
+        # _split, inlined (this runs for every transcript)
+        if text_lower.isascii():
+            spaced = b' ' + text_lower.encode().translate(_SEPARATORS) + b' '
+            words = spaced.split()
+        else:
+            spaced, words = None, [word.encode() for word in _WORD.findall(text_lower)]
+        best = _NO_MATCH
+        for word in self._decision_words.intersection(words):
+            rank, phrases = self._decision[word]
+            if rank < best:
+                if rank == self.CONVERSATION:
+                    return rank
+                best = rank
+            for rank, phrase, key, confirm in phrases:
+                if rank >= best:
+                    break
+                if (_bounded_in(spaced, key, text_lower, phrase) if key is not None and spaced is not None else
+                        phrase in text_lower and confirm.search(text_lower)):
+                    if rank == self.CONVERSATION:
+                        return rank
+                    best = rank
+                    break
+        for pid in self._always:
+            rank, compiled = self._patterns[pid]
+            if rank < best and compiled.search(text_lower):
+                best = rank
+        return None if best == _NO_MATCH else best
+
+    def _matched(self, text_lower: str) -> List[List[str]]:
+        """Matched pattern strings per class: [conversation, strong, announcement]"""
+        spaced, words = _split(text_lower)
+        present = self._trigger_words.intersection(words)
+        ids = {pid for word in present for pid in self._exact.get(word, ())}
+        for word in self._phrase_words.intersection(present):
+            ids.update(pid for _, phrase, pid, key, confirm in self._by_word[word]
+                       if pid not in ids and (_bounded_in(spaced, key, text_lower, phrase)
+                                              if key is not None and spaced is not None else
+                                              phrase in text_lower and confirm.search(text_lower)))
+        ids.update(pid for pid in self._always if self._patterns[pid][1].search(text_lower))
+        matched = [[], [], []]
+        for pid in sorted(ids):
+            rank, compiled = self._patterns[pid]
+            matched[rank].append(compiled.pattern)
+        return matched
+
+    def _structure(self, first_word: str, present: List[str]) -> float:
+        """Formal opening word plus passive/formal constructions"""
+        return self._first_word_scores.get(first_word, 0) + (0 if self._passive.isdisjoint(present) else self._passive_weight)
+
+    def _scores(self, text_lower: str, first_word: str):
+        """(formal, public, total score) from the substring indicators and sentence structure"""
+        present = [phrase for phrase in self._phrases if phrase in text_lower]
+        structure = self._structure(first_word, present)
+        total = sum(map(self._weights.__getitem__, present)) + structure
+        return not self._formal.isdisjoint(present), not self._public.isdisjoint(present), total
+
+    def __call__(self, text: str) -> bool:
+        """Decision only - the fast path for live detection"""
+        text_lower = text.lower()
+        decisive = self._decisive(text_lower)
+        if decisive is not None and decisive < self.ANNOUNCEMENT:
+            return decisive == self.STRONG
+
+        tokens = text_lower.split()
+        if len(tokens) < self._min_words:
+            return False
+        if decisive == self.ANNOUNCEMENT:
+            return True
+
+        formal, public, total = self._scores(text_lower, tokens[0])
+        return (formal and public) or total >= self._threshold
+
+    def score(self, text: str) -> AnnouncementScore:
+        """Decision plus type, confidence and the feature breakdown behind it"""
+        text_lower = text.lower()
+        tokens = text_lower.split()
+        conversation, strong, patterns = self._matched(text_lower)
+
+        present = [phrase for phrase in self._phrases if phrase in text_lower]
+        counts = {name: len(phrases.intersection(present)) for name, phrases in self._categories}
+        structure = self._structure(tokens[0] if tokens else '', present)
+        total = len(patterns) * self._pattern_weight + sum(map(self._weights.__getitem__, present)) + structure
+
+        if conversation:
+            decision, reason, confidence = False, 'conversation', 0.9
+        elif strong:
+            decision, reason, confidence = True, 'strong', 0.95
+        elif len(tokens) < self._min_words:
+            decision, reason, confidence = False, 'too short', 0.8
+        elif patterns:
+            decision, reason, confidence = True, 'pattern', min(0.9, 0.6 + total * 0.05)
+        elif counts['formal'] and counts['public']:
+            decision, reason, confidence = True, 'formal + public', min(0.9, 0.5 + total * 0.05)
+        elif total >= self._threshold:
+            decision, reason, confidence = True, 'score', min(0.85, 0.4 + total * 0.1)
+        else:
+            decision, reason, confidence = False, 'score', max(0.5, 0.9 - total * 0.15)
+
+        features = {'conversation_patterns': tuple(conversation), 'strong_patterns': tuple(strong),
+                    'patterns': tuple(patterns), 'words': len(tokens), 'structure': structure, **counts}
+        announcement_type = self.classify_type(text_lower)
+        return AnnouncementScore(decision, announcement_type, self.severity(announcement_type, text_lower),
+                                 round(confidence, 2), reason, total, MappingProxyType(features), self.version)
+
+    def analyze(self, text: str) -> AnnouncementScore:
+        """The production path: the fast decision, and ``score`` only for announcements.
+
+        Everything else gets a decision-only result (default type and
+        severity, no confidence or features) - nothing downstream reads those
+        for a transcript that isn't saved or alerted on.
+        """
+        return self.score(text) if self(text) else self._not_announcement()
+
+    def _not_announcement(self) -> AnnouncementScore:
+        return AnnouncementScore(False, self._default_type, self._default_severity, 0.0, 'decision only', 0.0,
+                                 _NO_FEATURES, self.version)
+
+    def reference(self, text: str, announcement_type: Optional[str] = None, confidence: float = 1.0) -> AnnouncementScore:
+        """Result for a transcript already known to be an announcement (e.g. a recognized pre-recorded clip)"""
+        announcement_type = announcement_type or self.classify_type(text)
+        return AnnouncementScore(True, announcement_type, self.severity(announcement_type, text), confidence,
+                                 'reference', 0.0, MappingProxyType({}), self.version)
+
+    def score_many(self, texts: Iterable[str]) -> List[AnnouncementScore]:
+        """``analyze`` for a batch: decisions for every distinct text first, then full scores for the announcements.
+
+        Repeats (looped announcements, reprocessed rows) are decided once, and
+        everything that isn't an announcement shares one decision-only result,
+        so a batch costs the bool path plus ``score`` per distinct announcement.
+        """
+        texts = list(texts)
+        unique = list(dict.fromkeys(texts))
+        announcements = [text for text in unique if self(text)]
+        results = dict.fromkeys(unique, self._not_announcement())
+        results.update(zip(announcements, map(self.score, announcements)))
+        return list(map(results.__getitem__, texts))
+
+    def classify_type(self, text: str) -> str:
+        """Announcement type from keywords; the first listed type with a keyword in the text wins"""
+        return next(compress(self._type_of_keyword, map(text.lower().__contains__, self._type_keywords)),
+                    self._default_type)
+
+    def severity(self, announcement_type: str, text: str) -> str:
+        """Alert severity: critical for critical types or wording, high for high types or urgent wording, else the default"""
+        if announcement_type in self._critical_types or self.critical_wording(text):
+            return 'critical'
+        if announcement_type in self._high_types or any(map(text.lower().__contains__, self._high_keywords)):
+            return 'high'
+        return self._default_severity
+
+
+    def critical_wording(self, text: str) -> bool:
+        """True if the text has a critical keyword (evacuate, fire, ...), whatever its type or decision.
+
+        Type is first match, so "attention passengers, evacuate gate B" is
+        travel; early alerts on partial transcripts go by this instead.
+        """
+        return self._critical_wording is not None and self._critical_wording.search(text.lower()) is not None
+
+    def is_critical(self, text: str) -> bool:
+        """Worth an alert before the speaker finishes: critical wording, or a critical type"""
+        return self.critical_wording(text) or self.classify_type(text) in self._critical_types
+
+
+class ReloadableClassifier:
+    """The classifier for a rule file, recompiled and swapped in when the file changes.
+
+    The file is checked at most every ``interval`` seconds, from whichever
+    thread classifies next. A new version is compiled on the side and
+    replaces the old one in a single assignment, so every decision uses one
+    complete rule set; a file that fails to load or compile is logged and the
+    running rules stay. To record which version decided, take ``current``
+    once and use it for both the decision and its ``version``.
+    """
+
+    def __init__(self, path: Optional[str] = None, interval: Optional[float] = None):
+        self.path = path or rules_path()
+        self.interval = reload_interval() if interval is None else interval
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._stamp = self._file_stamp()
+        self._classifier = AnnouncementClassifier(load_rules(self.path))
+        self._next_check = time.monotonic() + self.interval
+
+    def _file_stamp(self):
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    @property
+    def current(self) -> AnnouncementClassifier:
+        if self.interval > 0 and time.monotonic() >= self._next_check and self._lock.acquire(blocking=False):
+            try:
+                self._next_check = time.monotonic() + self.interval
+                self._reload_if_changed()
+            finally:
+                self._lock.release()
+        return self._classifier
+
+    @property
+    def version(self) -> str:
+        return self.current.version
+
+    def _reload_if_changed(self):
+        try:
+            stamp = self._file_stamp()
+        except OSError as e:
+            logger.warning(f"Announcement rules {self.path} unavailable, keeping version {self._classifier.version}: {e}")
+            return
+        if stamp == self._stamp:
+            return
+        self._stamp = stamp  # A half-written file is retried once it changes again
+        try:
+            classifier = AnnouncementClassifier(load_rules(self.path))
+        except Exception as e:
+            logger.error(f"Announcement rules {self.path} not reloaded, keeping version {self._classifier.version}: {e}")
+            return
+        previous, self._classifier = self._classifier, classifier
+        self.reloads += 1
+        logger.info(f"Announcement rules reloaded: version {previous.version} -> {classifier.version}")
+
+    def __call__(self, text: str) -> bool:
+        return self.current(text)
+
+    def score(self, text: str) -> AnnouncementScore:
+        return self.current.score(text)
+
+    def analyze(self, text: str) -> AnnouncementScore:
+        return self.current.analyze(text)
+
+    def score_many(self, texts: Iterable[str]) -> List[AnnouncementScore]:
+        return self.current.score_many(texts)
+
+    def classify_type(self, text: str) -> str:
+        return self.current.classify_type(text)
+
+    def severity(self, announcement_type: str, text: str) -> str:
+        return self.current.severity(announcement_type, text)
+
+    def is_critical(self, text: str) -> bool:
+        return self.current.is_critical(text)
+
+
+_default_classifier = None
+_default_lock = threading.Lock()
+
+
+def default_classifier() -> ReloadableClassifier:
+    """Shared classifier for the configured rule file (ANNOUNCEMENT_RULES), loaded on first use"""
+    global _default_classifier
+    with _default_lock:
+        if _default_classifier is None:
+            _default_classifier = ReloadableClassifier()
+    return _default_classifier
+
+
+def is_announcement(text: str) -> bool:
+    return default_classifier()(text)
+
+
+def score(text: str) -> AnnouncementScore:
+    return default_classifier().score(text)
+
+
+def score_many(texts: Iterable[str]) -> List[AnnouncementScore]:
+    return default_classifier().score_many(texts)
+
+
+def classify_type(text: str) -> str:
+    """Announcement type from the rule file's keywords (travel, meeting, emergency, general or other by default)"""
+    return default_classifier().classify_type(text)
+
+
+def reference_is_announcement(text: str, rules: dict) -> bool:
+    """The original rule-by-rule implementation (without its logging), kept to check the compiled engine against"""
+    text_lower = text.lower()
+    for pattern in rules['conversation_patterns']:
+        if re.search(pattern, text_lower):
+            return False
+    if any(re.search(pattern, text_lower) for pattern in rules['strong_patterns']):
+        return True
+
+    matched_patterns = [pattern for pattern in rules['announcement_patterns'] if re.search(pattern, text_lower)]
+    announcement_score = len(matched_patterns)
+    if len(text.split()) < rules['min_words']:
+        return False
+
+    indicators, weights = rules['indicators'], rules['weights']
+    counts = {name: sum(1 for indicator in indicators[name] if indicator in text_lower) for name in INDICATOR_CATEGORIES}
+
+    structure_score = 0
+    first_words = text_lower.split()[:2]
+    if first_words:
+        structure_score += rules['first_word_scores'].get(first_words[0], 0)
+    if any(phrase in text_lower for phrase in rules['passive_phrases']):
+        structure_score += weights['passive']
+
+    total_score = announcement_score * weights['pattern'] + structure_score + sum(
+        counts[name] * weights[name] for name in INDICATOR_CATEGORIES)
+    if counts['formal'] >= 1 and counts['public'] >= 1:
+        return True
+    if total_score >= rules['score_threshold']:
+        return True
+    return len(matched_patterns) >= 1
+
+
+def transcript_corpus() -> List[str]:
+    """Every labeled transcript in the repo's test scripts (deduplicated, in order)"""
+    from advanced_test import create_comprehensive_test_dataset
+    from test_final import create_test_dataset as final_dataset
+    from test_improved import create_test_dataset as improved_dataset
+
+    texts = [case[0] for dataset in (create_comprehensive_test_dataset(), final_dataset(), improved_dataset())
+             for case in dataset]
+    return list(dict.fromkeys(texts))
+
+
+def main():
+    """Check the compiled engine against the reference on the test corpus and time it"""
+    rules = load_rules(sys.argv[1] if len(sys.argv) > 1 else None)
+    classifier = AnnouncementClassifier(rules)
+    corpus = transcript_corpus()
+    # Plus case/punctuation variants, so the check isn't limited to the exact dataset strings
+    corpus += [text.upper() for text in corpus] + [text.rstrip('.?!') + '?' for text in corpus]
+
+    mismatches = [text for text in corpus
+                  if not classifier(text) == classifier.analyze(text).is_announcement == classifier.score(text).is_announcement
+                  == reference_is_announcement(text, rules)]
+
+    # Rounds alternate between the engines, so load from other processes hits them alike; best round counts
+    engines = {'reference': lambda text: reference_is_announcement(text, rules), 'compiled': classifier,
+               'analyze': classifier.analyze, 'score': classifier.score}
+    best = dict.fromkeys(engines, float('inf'))
+    for _ in range(30):
+        for name, classify in engines.items():
+            started = time.perf_counter()
+            for text in corpus:
+                classify(text)
+            best[name] = min(best[name], time.perf_counter() - started)
+    reference_us, compiled_us, analyze_us, score_us = (best[name] / len(corpus) * 1e6 for name in engines)
+
+    print("⚡ COMPILED ANNOUNCEMENT CLASSIFIER")
+    print("=" * 60)
+    print(f"Rules:         version {classifier.version}")
+    print(f"Transcripts:   {len(corpus)}")
+    print(f"Agreement:     {len(corpus) - len(mismatches)}/{len(corpus)}")
+    print(f"Reference:     {reference_us:.1f} µs/transcript")
+    print(f"Compiled:      {compiled_us:.1f} µs/transcript ({reference_us / compiled_us:.1f}x faster)")
+    print(f"Analyze:       {analyze_us:.1f} µs/transcript (what the transcribers call)")
+    print(f"Full score:    {score_us:.1f} µs/transcript (type, confidence, features)")
+    speedup = reference_us / compiled_us
+    if speedup >= TARGET_SPEEDUP:
+        print(f"✅ Target {TARGET_SPEEDUP:.0f}x met ({speedup:.1f}x)")
+    else:
+        print(f"⚠️ Target {TARGET_SPEEDUP:.0f}x missed: {speedup:.1f}x against the logging-free reference")
+    for text in mismatches:
+        print(f"   ❌ {text}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""
+Acoustic fingerprint index of known venue announcements
+Looped pre-recorded announcements are recognized from spectral-peak hashes and skip Whisper entirely
+"""
+import argparse
+import json
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import List, Optional
+
+import numpy as np
+
+from features import HOP_LENGTH, SAMPLE_RATE, SegmentFeatures
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = 'announcements.json'
+
+# Constellation settings (frames are 10 ms, bins 40 Hz)
+PEAK_FREQ_RADIUS = 10       # A peak is the maximum of a (2*10+1) bins x (2*5+1) frames neighbourhood
+PEAK_TIME_RADIUS = 5
+PEAK_MIN_DB = 10.0          # ...and at least this far above its frame's median energy and its bin's median over time
+PEAKS_PER_SECOND = 30       # Strongest peaks kept, so density doesn't depend on loudness
+FAN_OUT = 10                # Each anchor is paired with its next few peaks...
+MAX_DELTA_FRAMES = 127      # ...up to ~1.3 s later (7 bits of the hash)
+MIN_FREQ_BIN = 3            # Ignore < 120 Hz (hum and handling noise)
+# Bumped whenever the settings above change which hashes a clip produces; saved indexes of another version are refused
+FINGERPRINT_VERSION = 2
+
+# Match acceptance, tuned with `announcement_index.py check` (noisy replays of the references themselves).
+# On speech-like clips (~80 hashes/second, test_announcement_index.py) a replay under white noise at amplitude
+# 0.005 / 0.01 / 0.02 keeps a median 0.13 / 0.05 / 0.03 of the reference's hashes at one offset, while other
+# references never line up more than 0.005
+DEFAULT_MATCH_THRESHOLD = 0.03  # Fraction of the reference's hashes confirmed (ANNOUNCEMENT_MATCH_THRESHOLD)
+MIN_MATCHING_HASHES = 15
+# The segment must span most of the reference, or a fragment that hits a few peaks would return the whole transcript
+MIN_COVERAGE = 0.8
+CHECK_NOISE_LEVELS = (0.005, 0.01, 0.02)
+
+
+def spectral_peaks(features: SegmentFeatures) -> np.ndarray:
+    """(frame, bin) of prominent time-frequency peaks, sorted by frame.
+
+    Peaks survive additive noise and level changes far better than the
+    spectrum itself, which is what lets an acoustic replay match its clip.
+    """
+    log_power = 10 * np.log10(np.maximum(features.power[MIN_FREQ_BIN:], 1e-10))
+    if log_power.shape[1] == 0:
+        return np.zeros((0, 2), dtype=np.int32)
+
+    # Separable max filter: maximum over frequency, then over time
+    padded = np.pad(log_power, ((PEAK_FREQ_RADIUS, PEAK_FREQ_RADIUS), (0, 0)), constant_values=-np.inf)
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * PEAK_FREQ_RADIUS + 1, axis=0).max(axis=-1)
+    padded = np.pad(local_max, ((0, 0), (PEAK_TIME_RADIUS, PEAK_TIME_RADIUS)), constant_values=-np.inf)
+    local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * PEAK_TIME_RADIUS + 1, axis=1).max(axis=-1)
+
+    # Above the frame's typical level and the bin's (stationary noise such as HVAC or a PA hum lifts the latter),
+    # so a noisy replay keeps the clip's own peaks instead of trading them for noise maxima
+    floor = np.maximum(np.median(log_power, axis=0)[None, :], np.median(log_power, axis=1)[:, None]) + PEAK_MIN_DB
+    bins, frames = np.nonzero((log_power == local_max) & (log_power > floor))
+    strength = log_power[bins, frames]
+
+    budget = max(1, int(features.duration * PEAKS_PER_SECOND))
+    if len(strength) > budget:
+        keep = np.argpartition(strength, -budget)[-budget:]
+        bins, frames = bins[keep], frames[keep]
+
+    order = np.lexsort((bins, frames))
+    return np.stack([frames[order], bins[order] + MIN_FREQ_BIN], axis=1).astype(np.int32)
+
+
+def peak_hashes(peaks: np.ndarray):
+    """Pair each peak with the next FAN_OUT peaks; returns (hashes uint32, anchor frames int32)"""
+    hashes, anchors = [], []
+    for step in range(1, FAN_OUT + 1):
+        if len(peaks) <= step:
+            break
+        anchor, target = peaks[:-step], peaks[step:]
+        delta = target[:, 0] - anchor[:, 0]
+        valid = (delta > 0) & (delta <= MAX_DELTA_FRAMES)
+        # 8 bits anchor bin | 8 bits target bin | 7 bits frame delta
+        hashes.append((anchor[valid, 1].astype(np.uint32) << 15) | (target[valid, 1].astype(np.uint32) << 7)
+                      | delta[valid].astype(np.uint32))
+        anchors.append(anchor[valid, 0])
+    if not hashes:
+        return np.zeros(0, dtype=np.uint32), np.zeros(0, dtype=np.int32)
+    return np.concatenate(hashes), np.concatenate(anchors).astype(np.int32)
+
+
+@dataclass(frozen=True)
+class AnnouncementMatch:
+    name: str
+    transcript: str
+    announcement_type: Optional[str]
+    score: float            # Fraction of the reference's hashes found at one consistent offset
+    offset_seconds: float   # Where the segment starts within the reference
+    match_ms: float
+
+
+class AnnouncementIndex:
+    """Inverted index from peak-pair hashes to (reference, frame) postings.
+
+    Postings live in three flat arrays sorted by hash, so a lookup is a
+    vectorized binary search plus one histogram of (reference, offset) votes:
+    a real replay lines up many hashes at a single time offset, noise does not.
+    """
+
+    def __init__(self, threshold: Optional[float] = None):
+        # Read here, not at import: the transcribers load .env after importing this module
+        self.threshold = (float(os.getenv('ANNOUNCEMENT_MATCH_THRESHOLD', DEFAULT_MATCH_THRESHOLD))
+                          if threshold is None else threshold)
+        self.references: List[dict] = []
+        self._hashes = np.zeros(0, dtype=np.uint32)
+        self._ref_ids = np.zeros(0, dtype=np.int32)
+        self._frames = np.zeros(0, dtype=np.int32)
+        self._pending = []
+
+    def __len__(self) -> int:
+        return len(self.references)
+
+    def add(self, name: str, audio: np.ndarray, transcript: str, announcement_type: Optional[str] = None,
+            features: Optional[SegmentFeatures] = None):
+        """Fingerprint a float32 16 kHz reference clip (``features``: its spectrogram, if already computed)"""
+        hashes, frames = peak_hashes(spectral_peaks(features or SegmentFeatures(audio)))
+        ref_id = len(self.references)
+        self.references.append({
+            'name': name,
+            'transcript': transcript,
+            'announcement_type': announcement_type,
+            'duration': len(audio) / SAMPLE_RATE,
+            'hashes': int(len(hashes))
+        })
+        self._pending.append((hashes, np.full(len(hashes), ref_id, dtype=np.int32), frames))
+
+    def drop_oldest(self, count: int):
+        """Forget the ``count`` references added first (the rest keep their order)"""
+        self._finalize()
+        keep = self._ref_ids >= count
+        self._hashes, self._frames = self._hashes[keep], self._frames[keep]
+        self._ref_ids = self._ref_ids[keep] - count
+        del self.references[:count]
+
+    def _finalize(self):
+        if not self._pending:
+            return
+        hashes, ref_ids, frames = zip(*self._pending)
+        self._pending = []
+        hashes = np.concatenate((self._hashes,) + hashes)
+        ref_ids = np.concatenate((self._ref_ids,) + ref_ids)
+        frames = np.concatenate((self._frames,) + frames)
+        order = np.argsort(hashes, kind='stable')
+        self._hashes, self._ref_ids, self._frames = hashes[order], ref_ids[order], frames[order]
+
+    def alignments(self, features: SegmentFeatures):
+        """Hashes a segment shares with each (reference, time offset): arrays (ref_ids, offset frames, votes)"""
+        self._finalize()
+        query, query_frames = peak_hashes(spectral_peaks(features))
+        empty = np.zeros(0, dtype=np.int64)
+        if not len(query) or not len(self._hashes):
+            return empty, empty, empty
+
+        # Every posting of every query hash, vectorized
+        lo = np.searchsorted(self._hashes, query, side='left')
+        hi = np.searchsorted(self._hashes, query, side='right')
+        counts = hi - lo
+        if not counts.sum():
+            return empty, empty, empty
+        rows = np.repeat(np.arange(len(query)), counts)
+        postings = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts) + np.repeat(lo, counts)
+
+        # Votes per (reference, reference frame - segment frame)
+        ref_ids = self._ref_ids[postings].astype(np.int64)
+        offsets = (self._frames[postings] - query_frames[rows]).astype(np.int64)
+        votes_key, votes = np.unique(ref_ids << 32 | (offsets + (1 << 31)), return_counts=True)
+        return votes_key >> 32, (votes_key & 0xFFFFFFFF) - (1 << 31), votes
+
+    def match(self, features: SegmentFeatures, threshold: Optional[float] = None) -> Optional[AnnouncementMatch]:
+        """Best reference for a segment, or None when nothing clears ``threshold`` (default: the index's)"""
+        started = time.perf_counter()
+        ref_ids, offsets, votes = self.alignments(features)
+        if not len(votes):
+            return None
+        best = int(np.argmax(votes))
+
+        reference = self.references[int(ref_ids[best])]
+        score = votes[best] / max(reference['hashes'], 1)
+        offset_seconds = int(offsets[best]) * HOP_LENGTH / SAMPLE_RATE
+        # Part of the reference the segment overlaps at the matched offset
+        covered = min(offset_seconds + features.duration, reference['duration']) - max(offset_seconds, 0.0)
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        # The stored transcript only stands in for Whisper if the segment is (mostly) just this clip, all of it
+        if votes[best] < MIN_MATCHING_HASHES or score < (self.threshold if threshold is None else threshold) \
+                or features.duration > reference['duration'] * 1.25 + 2.0 \
+                or covered < reference['duration'] * MIN_COVERAGE:
+            return None
+        return AnnouncementMatch(reference['name'], reference['transcript'], reference['announcement_type'],
+                                 float(score), offset_seconds, elapsed_ms)
+
+    def save(self, path: str):
+        self._finalize()
+        np.savez_compressed(path, hashes=self._hashes, ref_ids=self._ref_ids, frames=self._frames,
+                            references=np.array(json.dumps(self.references)), version=FINGERPRINT_VERSION)
+
+    @classmethod
+    def load(cls, path: str) -> 'AnnouncementIndex':
+        index = cls()
+        with np.load(path) as data:
+            version = int(data['version']) if 'version' in data.files else 1
+            if version != FINGERPRINT_VERSION:
+                raise ValueError(f"fingerprint version {version}, expected {FINGERPRINT_VERSION} - rebuild the index")
+            index._hashes, index._ref_ids, index._frames = data['hashes'], data['ref_ids'], data['frames']
+            index.references = json.loads(str(data['references']))
+        return index
+
+    @classmethod
+    def from_directory(cls, directory: str, transcribe=None) -> 'AnnouncementIndex':
+        """Index every WAV clip in ``directory``.
+
+        Transcripts and types come from ``announcements.json``
+        ({"gate_change.wav": {"transcript": ..., "announcement_type": ...}});
+        clips without a transcript use ``transcribe(audio)`` if given and are
+        skipped otherwise.
+        """
+        from audio_io import load_wav_16k
+
+        manifest_path = os.path.join(directory, MANIFEST_NAME)
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+
+        index = cls()
+        for name in sorted(os.listdir(directory)):
+            if not name.lower().endswith('.wav'):
+                continue
+            try:
+                audio = load_wav_16k(os.path.join(directory, name)).astype(np.float32) / 32768.0
+            except Exception as e:
+                logger.warning(f"Skipping reference {name}: {e}")
+                continue
+            entry = manifest.get(name, {})
+            transcript = entry.get('transcript') or (transcribe(audio) if transcribe else None)
+            if not transcript:
+                logger.warning(f"Skipping reference {name}: no transcript in {MANIFEST_NAME}")
+                continue
+            index.add(name, audio, transcript, entry.get('announcement_type'))
+        index._finalize()
+        logger.info(f"Indexed {len(index)} reference announcements ({len(index._hashes)} hashes) from {directory}")
+        return index
+
+
+def check_noisy_replays(index: AnnouncementIndex, clips: dict, levels=CHECK_NOISE_LEVELS, seed: int = 0) -> dict:
+    """Replay each indexed clip under white noise and score it against the index.
+
+    ``clips`` maps reference names to their float32 audio. Returns, per noise
+    amplitude, the scores of the clips' own references ('own'), the best
+    score any other reference reached ('other') and how many replays
+    ``match()`` accepted as the right clip ('matched'); the threshold
+    belongs between the 'own' and 'other' scores.
+    """
+    rng = np.random.default_rng(seed)
+    names = [reference['name'] for reference in index.references]
+    results = {}
+    for level in (0.0,) + tuple(levels):
+        own, other, matched = [], [], 0
+        for name, audio in clips.items():
+            noisy = audio + (level * rng.standard_normal(len(audio))).astype(np.float32)
+            features = SegmentFeatures(noisy)
+            ref_ids, _, votes = index.alignments(features)
+            is_own = np.array([names[ref_id] == name for ref_id in ref_ids], dtype=bool)
+            ref_id = names.index(name)
+            own.append(float(votes[is_own].max()) / max(index.references[ref_id]['hashes'], 1) if is_own.any() else 0.0)
+            other.append(max((votes[i] / max(index.references[ref_ids[i]]['hashes'], 1)
+                              for i in np.nonzero(~is_own)[0]), default=0.0))
+            result = index.match(features)
+            matched += bool(result and result.name == name)
+        results[level] = {'own': own, 'other': other, 'matched': matched}
+    return results
+
+
+def load_announcement_index(path: Optional[str] = None) -> Optional[AnnouncementIndex]:
+    """ANNOUNCEMENT_INDEX: a saved .npz index or a folder of reference clips; None when unset or unusable"""
+    path = path or os.getenv('ANNOUNCEMENT_INDEX')
+    if not path:
+        return None
+    try:
+        index = AnnouncementIndex.from_directory(path) if os.path.isdir(path) else AnnouncementIndex.load(path)
+    except Exception as e:
+        logger.error(f"Could not load announcement index {path}: {e}")
+        return None
+    if not len(index):
+        logger.warning(f"Announcement index {path} is empty - every segment goes to Whisper")
+        return None
+    logger.info(f"Announcement index ready: {len(index)} references")
+    return index
+
+
+def main():
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    parser = argparse.ArgumentParser(description="Build or query the reference announcement index")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    build = sub.add_parser('build', help="Fingerprint a folder of reference clips")
+    build.add_argument('directory')
+    build.add_argument('--output', default='announcement_index.npz')
+    build.add_argument('--transcribe', action='store_true',
+                       help=f"Transcribe clips missing from {MANIFEST_NAME} with Whisper")
+
+    query = sub.add_parser('match', help="Match WAV clips against an index")
+    query.add_argument('index')
+    query.add_argument('clips', nargs='+')
+
+    check = sub.add_parser('check', help="Replay a folder of reference clips under noise against its own index")
+    check.add_argument('directory')
+    check.add_argument('--noise', type=float, nargs='+', default=list(CHECK_NOISE_LEVELS),
+                       help="White noise amplitudes (full scale = 1.0)")
+    args = parser.parse_args()
+
+    if args.command == 'check':
+        from audio_io import load_wav_16k
+        index = AnnouncementIndex.from_directory(args.directory)
+        clips = {reference['name']: load_wav_16k(os.path.join(args.directory, reference['name'])).astype(np.float32)
+                 / 32768.0 for reference in index.references}
+        if not clips:
+            print(f"❌ No indexed clips in {args.directory}")
+            return
+        print(f"📊 {len(clips)} clips, threshold {index.threshold:.2f}, at least {MIN_MATCHING_HASHES} hashes")
+        for level, result in check_noisy_replays(index, clips, args.noise).items():
+            print(f"   noise {level:<6} own score median {np.median(result['own']):.3f} min {min(result['own']):.3f} | "
+                  f"best other {max(result['other']):.3f} | matched {result['matched']}/{len(clips)}")
+        return
+
+    if args.command == 'build':
+        transcribe = None
+        if args.transcribe:
+            from asr_client import load_asr
+            engine = load_asr(os.getenv('WHISPER_MODEL', 'base'))
+            transcribe = lambda audio: engine.transcribe(audio)['text'].strip()
+        started = time.perf_counter()
+        index = AnnouncementIndex.from_directory(args.directory, transcribe)
+        index.save(args.output)
+        print(f"✅ {len(index)} references indexed in {time.perf_counter() - started:.1f}s -> {args.output}")
+        return
+
+    from audio_io import load_wav_16k
+    index = load_announcement_index(args.index)
+    if index is None:
+        return
+    for clip in args.clips:
+        features = SegmentFeatures(load_wav_16k(clip).astype(np.float32) / 32768.0)
+        started = time.perf_counter()
+        result = index.match(features)
+        elapsed = (time.perf_counter() - started) * 1000
+        if result:
+            print(f"🎯 {clip}: {result.name} (score {result.score:.2f}, +{result.offset_seconds:.1f}s, {elapsed:.1f}ms) "
+                  f"[{result.announcement_type or '?'}] {result.transcript}")
+        else:
+            print(f"❌ {clip}: no match ({elapsed:.1f}ms)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Linear announcement model: hashed word/character n-grams + logistic regression
+An alternative backend to the rule file (ANNOUNCEMENT_BACKEND=model), trained on the labeled transcripts in the test
+scripts. ``predict_proba`` scores a whole batch with a few sparse NumPy operations; the report compares it with the rules.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+import zlib
+from types import MappingProxyType
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from announcement_classifier import AnnouncementScore, default_classifier
+
+logger = logging.getLogger(__name__)
+
+# Detectors the transcribers can use: the rule file (default) or this model
+ANNOUNCEMENT_BACKENDS = ('rules', 'model')
+# ANNOUNCEMENT_MODEL / ANNOUNCEMENT_MODEL_THRESHOLD are read on use, after the transcribers have loaded .env
+DEFAULT_THRESHOLD = 0.5
+
+HASH_BITS = 18
+WORD_NGRAMS = 2  # Unigrams and bigrams
+CHAR_NGRAMS = 3  # Within-word character trigrams (robust to small ASR misspellings); 0 disables
+
+_WORD = re.compile(r"[\w']+")
+
+
+def _word_grams(word: str, char_ngrams: int) -> List[str]:
+    """A word's own features: the word (prefixed 'w') and its padded character n-grams (prefixed 'c')"""
+    padded = f"<{word}>"
+    return ['w' + word] + ['c' + padded[i:i + char_ngrams] for i in range(len(padded) - char_ngrams + 1) if char_ngrams]
+
+
+class HashedMatrix(NamedTuple):
+    """Rows of hashed n-gram features in CSR form (row i is data[indptr[i]:indptr[i + 1]] at indices[...]).
+
+    Only what logistic regression needs is implemented, in NumPy, so scoring
+    never imports SciPy; ``to_csr`` converts for use with scipy.sparse.
+    """
+    indptr: np.ndarray
+    indices: np.ndarray
+    data: np.ndarray
+    n_features: int
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def _row_ids(self) -> np.ndarray:
+        return np.repeat(np.arange(self.n_rows), np.diff(self.indptr))
+
+    def dot(self, weights: np.ndarray) -> np.ndarray:
+        """X @ weights"""
+        return np.bincount(self._row_ids(), weights=self.data * weights[self.indices], minlength=self.n_rows)
+
+    def rdot(self, values: np.ndarray) -> np.ndarray:
+        """X.T @ values"""
+        return np.bincount(self.indices, weights=self.data * values[self._row_ids()], minlength=self.n_features)
+
+    def to_csr(self):
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.data, self.indices, self.indptr), shape=(self.n_rows, self.n_features))
+
+
+# Hashes of words (their whole feature bundle) and word n-grams seen so far, per feature configuration;
+# transcripts reuse a small vocabulary, so most lookups skip the string building and CRC entirely
+_hash_cache = {}
+HASH_CACHE_SIZE = 200000
+
+
+def hash_features(texts: Sequence[str], hash_bits: int = HASH_BITS, word_ngrams: int = WORD_NGRAMS,
+                  char_ngrams: int = CHAR_NGRAMS) -> HashedMatrix:
+    """Binary hashed n-gram features, each row L2-normalized (CRC32, so hashes are stable across processes)"""
+    mask = (1 << hash_bits) - 1
+    cache = _hash_cache.setdefault((hash_bits, word_ngrams, char_ngrams), {})
+    if len(cache) > HASH_CACHE_SIZE:
+        cache.clear()
+
+    indptr, indices = [0], []
+    for text in texts:
+        words = _WORD.findall(text.lower())
+        row = set()  # A repeated n-gram within one transcript counts once
+        for word in words:
+            hashes = cache.get(word)
+            if hashes is None:
+                hashes = cache[word] = tuple(zlib.crc32(gram.encode()) & mask for gram in _word_grams(word, char_ngrams))
+            row.update(hashes)
+        for n in range(2, word_ngrams + 1):
+            for i in range(len(words) - n + 1):
+                gram = ' '.join(words[i:i + n])
+                hashed = cache.get(gram)
+                if hashed is None:
+                    hashed = cache[gram] = zlib.crc32(('w' + gram).encode()) & mask
+                row.add(hashed)
+        indices.extend(row)
+        indptr.append(len(indices))
+    indptr = np.asarray(indptr, dtype=np.int64)
+    lengths = np.diff(indptr)
+    data = np.repeat(1.0 / np.sqrt(np.maximum(lengths, 1)), lengths)
+    return HashedMatrix(indptr, np.asarray(indices, dtype=np.int64), data, 1 << hash_bits)
+
+
+def _sigmoid(z: np.ndarray) -> np.ndarray:
+    return 1.0 / (1.0 + np.exp(-np.clip(z, -30, 30)))
+
+
+class LogisticAnnouncementModel:
+    """Logistic regression over hashed n-grams; drop-in for the rule classifier (call, score, score_many, version)"""
+
+    def __init__(self, weights: Optional[np.ndarray] = None, bias: float = 0.0, threshold: Optional[float] = None,
+                 hash_bits: int = HASH_BITS, word_ngrams: int = WORD_NGRAMS, char_ngrams: int = CHAR_NGRAMS):
+        self.hash_bits = hash_bits
+        self.word_ngrams = word_ngrams
+        self.char_ngrams = char_ngrams
+        self.weights = weights if weights is not None else np.zeros(1 << hash_bits)
+        self.bias = bias
+        self.threshold = model_threshold() if threshold is None else threshold
+        self._version = None
+
+    @property
+    def version(self) -> str:
+        """'model-' + a digest of the weights, so stored rows can be traced to the exact model"""
+        if self._version is None:
+            digest = hashlib.blake2b(self.weights.tobytes(), digest_size=6)
+            digest.update(np.float64(self.bias).tobytes())
+            self._version = f"model-{digest.hexdigest()}"
+        return self._version
+
+    def features(self, texts: Sequence[str]) -> HashedMatrix:
+        return hash_features(texts, self.hash_bits, self.word_ngrams, self.char_ngrams)
+
+    def fit(self, texts: Sequence[str], labels: Sequence[bool], iterations: int = 300, learning_rate: float = 2.0,
+            l2: float = 1e-3) -> 'LogisticAnnouncementModel':
+        """Full-batch gradient descent on the L2-regularized log loss (deterministic; small datasets)"""
+        X = self.features(texts)
+        y = np.asarray(labels, dtype=np.float64)
+        # Train over the hashed columns that actually occur; every other weight stays zero
+        columns, compact = np.unique(X.indices, return_inverse=True)
+        X = X._replace(indices=compact.reshape(-1), n_features=len(columns))
+        weights, bias = np.zeros(len(columns)), 0.0
+        for _ in range(iterations):
+            error = _sigmoid(X.dot(weights) + bias) - y
+            weights -= learning_rate * (X.rdot(error) / len(y) + l2 * weights)
+            bias -= learning_rate * error.mean()
+        self.weights = np.zeros(1 << self.hash_bits)
+        self.weights[columns] = weights
+        self.bias = float(bias)
+        self._version = None
+        return self
+
+    def predict_proba(self, texts: Sequence[str]) -> np.ndarray:
+        """Announcement probability for every transcript in the batch"""
+        if not len(texts):
+            return np.zeros(0)
+        return _sigmoid(self.features(texts).dot(self.weights) + self.bias)
+
+    def predict(self, texts: Sequence[str]) -> np.ndarray:
+        return self.predict_proba(texts) >= self.threshold
+
+    def __call__(self, text: str) -> bool:
+        return bool(self.predict_proba([text])[0] >= self.threshold)
+
+    def score_many(self, texts: Iterable[str]) -> List[AnnouncementScore]:
+        """Rule-compatible results; type and severity still come from the rule file's keywords"""
+        texts = list(texts)
+        probabilities = self.predict_proba(texts)
+        rules = default_classifier().current
+        results = []
+        for text, probability in zip(texts, probabilities):
+            decision = bool(probability >= self.threshold)
+            announcement_type = rules.classify_type(text)
+            results.append(AnnouncementScore(
+                decision, announcement_type, rules.severity(announcement_type, text),
+                round(float(probability if decision else 1 - probability), 2), 'model',
+                float(np.log(probability / (1 - probability))) if 0 < probability < 1 else float('inf') * (2 * decision - 1),
+                MappingProxyType({'probability': float(probability)}), self.version))
+        return results
+
+    def score(self, text: str) -> AnnouncementScore:
+        return self.score_many([text])[0]
+
+    def analyze(self, text: str) -> AnnouncementScore:
+        """Same as ``score``: the probability is the decision, so there is no cheaper path"""
+        return self.score(text)
+
+    def classify_type(self, text: str) -> str:
+        return default_classifier().classify_type(text)
+
+    def severity(self, announcement_type: str, text: str) -> str:
+        return default_classifier().severity(announcement_type, text)
+
+    def is_critical(self, text: str) -> bool:
+        return default_classifier().is_critical(text)
+
+    def reference(self, text: str, announcement_type: Optional[str] = None, confidence: float = 1.0) -> AnnouncementScore:
+        return default_classifier().current.reference(text, announcement_type, confidence)._replace(rule_version=self.version)
+
+    def save(self, path: str):
+        # Only the non-zero hashed weights are stored
+        nonzero = np.flatnonzero(self.weights)
+        np.savez_compressed(path, indices=nonzero, values=self.weights[nonzero], bias=self.bias,
+                            threshold=self.threshold, config=np.array([self.hash_bits, self.word_ngrams, self.char_ngrams]))
+
+    @classmethod
+    def load(cls, path: str) -> 'LogisticAnnouncementModel':
+        with np.load(path) as data:
+            hash_bits, word_ngrams, char_ngrams = (int(value) for value in data['config'])
+            weights = np.zeros(1 << hash_bits)
+            weights[data['indices']] = data['values']
+            return cls(weights, float(data['bias']), float(data['threshold']), hash_bits, word_ngrams, char_ngrams)
+
+
+def model_threshold() -> float:
+    return float(os.getenv('ANNOUNCEMENT_MODEL_THRESHOLD', DEFAULT_THRESHOLD))
+
+
+def labeled_examples() -> Tuple[List[str], List[bool]]:
+    """Every labeled transcript in the test scripts' datasets (deduplicated)"""
+    from advanced_test import create_comprehensive_test_dataset
+    from test_final import create_test_dataset as final_dataset
+    from test_improved import create_test_dataset as improved_dataset
+
+    examples = {}
+    for dataset in (create_comprehensive_test_dataset(), final_dataset(), improved_dataset()):
+        for text, label, _ in dataset:
+            examples[text] = label
+    return list(examples), list(examples.values())
+
+
+def resolve_backend(name: Optional[str]) -> str:
+    """Validate an ANNOUNCEMENT_BACKEND value, defaulting to the rules"""
+    name = (name or 'rules').lower()
+    if name not in ANNOUNCEMENT_BACKENDS:
+        raise ValueError(f"Unknown announcement backend '{name}' (choose from {', '.join(ANNOUNCEMENT_BACKENDS)})")
+    return name
+
+
+def load_announcement_model(path: Optional[str] = None) -> LogisticAnnouncementModel:
+    """Saved model from ANNOUNCEMENT_MODEL, or one trained on the labeled datasets (well under a second)"""
+    path = os.getenv('ANNOUNCEMENT_MODEL', '') if path is None else path
+    if path and os.path.exists(path):
+        model = LogisticAnnouncementModel.load(path)
+        logger.info(f"Announcement model loaded from {path} ({model.version})")
+        return model
+    if path:
+        logger.warning(f"Announcement model {path} not found - training on the labeled test datasets")
+    model = LogisticAnnouncementModel().fit(*labeled_examples())
+    logger.info(f"Announcement model trained on the labeled test datasets ({model.version})")
+    return model
+
+
+def cross_validate(texts: List[str], labels: List[bool], folds: int = 5, seed: int = 0) -> np.ndarray:
+    """Out-of-fold model decisions: every text is predicted by a model that never saw it"""
+    order = np.random.default_rng(seed).permutation(len(texts))
+    predictions = np.zeros(len(texts), dtype=bool)
+    for fold in range(folds):
+        held_out = order[fold::folds]
+        train = np.setdiff1d(order, held_out)
+        model = LogisticAnnouncementModel().fit([texts[i] for i in train], [labels[i] for i in train])
+        predictions[held_out] = model.predict([texts[i] for i in held_out])
+    return predictions
+
+
+def compare(folds: int = 5, batch_size: int = 10000) -> dict:
+    """Rules vs model: accuracy on the labeled datasets and throughput on a batch of transcripts"""
+    texts, labels = labeled_examples()
+    expected = np.asarray(labels)
+    rules = default_classifier().current
+    rule_predictions = np.array([rules(text) for text in texts])
+    model_predictions = cross_validate(texts, labels, folds)
+
+    def accuracy(predictions: np.ndarray) -> dict:
+        return {
+            'accuracy': float((predictions == expected).mean()),
+            'false_positives': int((predictions & ~expected).sum()),
+            'false_negatives': int((~predictions & expected).sum())
+        }
+
+    # Throughput on distinct transcripts (variants of the datasets), so deduplication doesn't flatter either side
+    batch = [f"{text} {i}" for i in range(batch_size // len(texts) + 1) for text in texts][:batch_size]
+    single = batch[:1000]
+    model = LogisticAnnouncementModel().fit(texts, labels)
+
+    return {
+        'examples': len(texts),
+        'announcements': int(expected.sum()),
+        'rules': {'version': rules.version, **accuracy(rule_predictions),
+                  'texts_per_second': _texts_per_second(lambda: [rules(text) for text in single], len(single)),
+                  'batch_texts_per_second': _texts_per_second(lambda: rules.score_many(batch), len(batch))},
+        'model': {'version': model.version, 'folds': folds, **accuracy(model_predictions),
+                  'texts_per_second': _texts_per_second(lambda: [model(text) for text in single], len(single)),
+                  'batch_texts_per_second': _texts_per_second(lambda: model.predict_proba(batch), len(batch))},
+        'disagreements': [text for text, rule, learned in zip(texts, rule_predictions, model_predictions) if rule != learned]
+    }
+
+
+def _texts_per_second(run, count: int) -> float:
+    started = time.perf_counter()
+    run()
+    return count / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hashed n-gram logistic-regression announcement model")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    train = subparsers.add_parser('train', help="Train on the labeled test datasets and save the model")
+    train.add_argument('--output', default='announcement_model.npz')
+    train.add_argument('--threshold', type=float, default=model_threshold())
+    report = subparsers.add_parser('report', help="Side-by-side accuracy and throughput vs the rule file")
+    report.add_argument('--folds', type=int, default=5, help="Cross-validation folds for the model's accuracy")
+    report.add_argument('--batch', type=int, default=10000, help="Transcripts per throughput batch")
+    report.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    if args.command == 'train':
+        texts, labels = labeled_examples()
+        model = LogisticAnnouncementModel(threshold=args.threshold).fit(texts, labels)
+        model.save(args.output)
+        print(f"✅ Trained on {len(texts)} transcripts ({sum(labels)} announcements) -> {args.output} ({model.version})")
+        return
+
+    results = compare(args.folds, args.batch)
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"📊 RULES vs MODEL ({results['examples']} labeled transcripts, {results['announcements']} announcements)")
+    print("=" * 70)
+    print(f"{'':24s} {'rules v' + results['rules']['version']:>20s} {'model (' + str(args.folds) + '-fold CV)':>22s}")
+    for key, label in (('accuracy', 'Accuracy'), ('false_positives', 'False positives'), ('false_negatives', 'False negatives')):
+        rule, model = results['rules'][key], results['model'][key]
+        print(f"{label:24s} {rule:>20.1%} {model:>22.1%}" if key == 'accuracy' else f"{label:24s} {rule:>20d} {model:>22d}")
+    print(f"{'Texts/sec (one by one)':24s} {results['rules']['texts_per_second']:>20,.0f} {results['model']['texts_per_second']:>22,.0f}")
+    print(f"{'Texts/sec (batch)':24s} {results['rules']['batch_texts_per_second']:>20,.0f} {results['model']['batch_texts_per_second']:>22,.0f}")
+    for text in results['disagreements']:
+        print(f"   ≠ {text}")
+
+
+if __name__ == "__main__":
+    main()
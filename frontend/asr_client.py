@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Client for the local Whisper inference server (asr_server.py)
+Talks to the warm model over a Unix socket; needs neither whisper nor torch in the calling process
+"""
+import json
+import logging
+import os
+import socket
+import struct
+import threading
+from typing import List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from decoding import resolve_profile
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SOCKET = '/tmp/hackquest-whisper.sock'
+
+
+def socket_path_from_env() -> str:
+    """WHISPER_SOCKET, read when needed rather than at import (.env is loaded after the imports)"""
+    return os.getenv('WHISPER_SOCKET', DEFAULT_SOCKET)
+
+# Frame: 8-byte prefix (header length, payload length), JSON header, raw payload bytes
+_PREFIX = struct.Struct('>II')
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(min(size, 1 << 20))
+        if not chunk:
+            raise EOFError("Connection closed")
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def send_message(sock: socket.socket, header: dict, payload: bytes = b''):
+    encoded = json.dumps(header).encode('utf-8')
+    sock.sendall(_PREFIX.pack(len(encoded), len(payload)) + encoded + payload)
+
+
+def recv_message(sock: socket.socket):
+    """Read one framed message; returns (header dict, payload bytes)"""
+    header_len, payload_len = _PREFIX.unpack(_recv_exact(sock, _PREFIX.size))
+    header = json.loads(_recv_exact(sock, header_len).decode('utf-8'))
+    payload = _recv_exact(sock, payload_len) if payload_len else b''
+    return header, payload
+
+
+class WhisperServerError(RuntimeError):
+    """The inference server rejected or failed a job"""
+
+
+class WhisperClient:
+    """Drop-in for WhisperEngine that sends jobs to the inference server.
+
+    Each calling thread keeps its own connection, so several ASR workers can
+    have jobs in flight at once.
+    """
+
+    def __init__(self, socket_path: Optional[str] = None, timeout: float = 300.0):
+        self.socket_path = socket_path or socket_path_from_env()
+        self.timeout = timeout
+        self.model_name = None
+        self.n_mels = 80
+        self.quantized = False
+        self._local = threading.local()
+
+    def _connection(self) -> socket.socket:
+        sock = getattr(self._local, 'sock', None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def _close(self):
+        sock = getattr(self._local, 'sock', None)
+        if sock is not None:
+            sock.close()
+            self._local.sock = None
+
+    def request(self, header: dict, payload: bytes = b'') -> dict:
+        """Send one job and wait for its result (reconnects once if the server restarted)"""
+        for attempt in range(2):
+            try:
+                sock = self._connection()
+                send_message(sock, header, payload)
+                response, _ = recv_message(sock)
+                break
+            except (OSError, EOFError):
+                self._close()
+                if attempt:
+                    raise
+        if not response.get('ok'):
+            raise WhisperServerError(response.get('error', 'unknown server error'))
+        return response
+
+    def ping(self) -> dict:
+        info = self.request({'op': 'ping'})
+        self.model_name = info.get('model')
+        self.n_mels = info.get('n_mels', self.n_mels)
+        self.quantized = info.get('quantized', False)
+        return info
+
+    def transcribe(self, audio: Union[str, np.ndarray], profile: Optional[str] = None) -> dict:
+        """Transcribe a file path or float32 16 kHz waveform; returns text, language and timed segments.
+
+        Files are decoded here and sent as PCM: the server only accepts
+        samples, never paths to open on the client's behalf.
+        """
+        profile = resolve_profile(profile)
+        if isinstance(audio, str):
+            from audio_io import load_audio_16k
+            audio = load_audio_16k(audio)
+        samples = np.ascontiguousarray(audio, dtype=np.float32)
+        return self.request({'op': 'transcribe', 'profile': profile, 'dtype': 'float32'}, samples.tobytes())
+
+    def transcribe_batch(self, audios: Sequence[Optional[np.ndarray]], profile: Optional[str] = None,
+                         mels: Optional[Sequence[Optional[np.ndarray]]] = None) -> List[str]:
+        """Batched decode on the server (see WhisperEngine.transcribe_batch); precomputed mels are sent instead of PCM"""
+        items, payload = self._encode_items(audios, mels)
+        response = self.request(
+            {'op': 'transcribe_batch', 'profile': resolve_profile(profile), 'dtype': 'float32', 'items': items}, payload
+        )
+        return response['texts']
+
+    def triage_batch(self, audios: Sequence[Optional[np.ndarray]],
+                     mels: Optional[Sequence[Optional[np.ndarray]]] = None) -> List[Tuple[str, float]]:
+        """Cascade triage pass on the server (see WhisperEngine.triage_batch)"""
+        items, payload = self._encode_items(audios, mels)
+        response = self.request({'op': 'triage_batch', 'dtype': 'float32', 'items': items}, payload)
+        return list(zip(response['texts'], response['logprobs']))
+
+    def _encode_items(self, audios, mels):
+        """Item descriptors plus one float32 payload: the mel where it matches the server model, else the PCM"""
+        items, arrays = [], []
+        for i, audio in enumerate(audios):
+            mel = mels[i] if mels is not None else None
+            if mel is not None and mel.shape[0] == self.n_mels:
+                items.append({'mel': mel.shape[0]})
+                arrays.append(np.ascontiguousarray(mel, dtype=np.float32))
+            else:
+                items.append({'pcm': len(audio)})
+                arrays.append(np.ascontiguousarray(audio, dtype=np.float32))
+        return items, b''.join(a.tobytes() for a in arrays)
+
+    def close(self):
+        self._close()
+
+
+def load_asr(model_name: str = "base", socket_path: Optional[str] = None):
+    """Return a client for the running inference server, or load the model in-process.
+
+    WHISPER_SERVER=auto (default) falls back to a local model when no server
+    is listening, ``required`` fails instead and ``off`` never connects.
+    WHISPER_QUANTIZE=true loads the local model as int8 (CPU only).
+    """
+    mode = os.getenv('WHISPER_SERVER', 'auto').lower()
+    quantize = os.getenv('WHISPER_QUANTIZE', 'false').lower() == 'true'
+    socket_path = socket_path or socket_path_from_env()
+
+    if mode != 'off':
+        client = WhisperClient(socket_path)
+        try:
+            info = client.ping()
+            logger.info(f"Using Whisper inference server at {socket_path} (model '{info.get('model')}')")
+            if info.get('model') != model_name:
+                logger.warning(f"Inference server runs '{info.get('model')}', not the requested '{model_name}'")
+            if info.get('quantized') != quantize:
+                logger.warning(f"Inference server model is {'int8' if info.get('quantized') else 'fp32'} "
+                               f"(WHISPER_QUANTIZE={'true' if quantize else 'false'} here)")
+            return client
+        except (OSError, EOFError, WhisperServerError) as e:
+            client.close()
+            if mode == 'required':
+                raise ConnectionError(f"Whisper inference server not reachable at {socket_path}: {e}") from e
+            logger.info(f"No Whisper inference server at {socket_path} - loading model in-process")
+
+    from asr_engine import WhisperEngine
+    from runtime import apply_torch_threads, load_runtime_profile
+    apply_torch_threads(load_runtime_profile())
+    return WhisperEngine(model_name, quantize=quantize)
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Whisper ASR engine shared by the transcribers
+Wraps one loaded model with single-segment and batched decoding
+"""
+import dataclasses
+import logging
+import os
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+import torch
+import whisper
+
+from decoding import is_silence, mel_decoding_options, needs_fallback, temperatures, transcribe_options
+from features import MAX_MEL_SECONDS, SegmentFeatures
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE
+QUANTIZED_CACHE_DIR = os.path.join(os.getenv('XDG_CACHE_HOME', os.path.join(os.path.expanduser('~'), '.cache')), 'whisper')
+
+
+def quantize_model(model: torch.nn.Module) -> torch.nn.Module:
+    """Dynamically quantize every Linear layer of a CPU Whisper model to int8.
+
+    Whisper wraps ``nn.Linear`` in a subclass that only casts weights to the
+    input dtype; ``quantize_dynamic`` matches exact types, so the layers are
+    turned back into plain ``nn.Linear`` (a no-op for fp32 on CPU) first.
+    """
+    for module in model.modules():
+        if isinstance(module, torch.nn.Linear):
+            module.__class__ = torch.nn.Linear
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def _torch_version() -> Tuple[int, int]:
+    major, minor = torch.__version__.split('+')[0].split('.')[:2]
+    return int(major), int(minor)
+
+
+# torch.load(weights_only=True) (torch >= 1.13) unpickles tensors and containers only; older torch has no such option
+_SAFE_LOAD = {'weights_only': True} if _torch_version() >= (1, 13) else {}
+
+
+def load_quantized_model(model_name: str, cache_dir: str = QUANTIZED_CACHE_DIR) -> torch.nn.Module:
+    """Load the int8 model from the on-disk cache, converting and caching it on first use.
+
+    The cache holds the model dimensions and the quantized ``state_dict``
+    (tensors only, no pickled modules); loading builds a fresh Whisper of
+    those dimensions, quantizes it the same way and loads the weights into it.
+    """
+    # Packed int8 weights may change layout between torch releases
+    cache_path = os.path.join(cache_dir, f"{model_name}-int8-torch{torch.__version__.split('+')[0]}.pt")
+    if os.path.exists(cache_path):
+        try:
+            checkpoint = torch.load(cache_path, map_location='cpu', **_SAFE_LOAD)
+            model = quantize_model(whisper.model.Whisper(whisper.model.ModelDimensions(**checkpoint['dims'])))
+            model.load_state_dict(checkpoint['model_state_dict'])
+            if model_name in whisper._ALIGNMENT_HEADS:  # As whisper.load_model does; not part of the state dict
+                model.set_alignment_heads(whisper._ALIGNMENT_HEADS[model_name])
+            logger.info(f"Loaded int8 Whisper model from {cache_path}")
+            return model
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable quantized model cache {cache_path}: {e}")
+
+    logger.info(f"Quantizing Whisper '{model_name}' to int8 (first run only)...")
+    model = quantize_model(whisper.load_model(model_name, device='cpu'))
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        torch.save({'dims': dataclasses.asdict(model.dims), 'model_state_dict': model.state_dict()}, cache_path)
+        logger.info(f"Cached int8 Whisper model at {cache_path}")
+    except OSError as e:
+        logger.warning(f"Could not cache quantized model: {e}")
+    return model
+
+
+class WhisperEngine:
+    """One Whisper model shared by every device and worker in the process"""
+
+    def __init__(self, model_name: str = "base", device: Optional[str] = None, quantize: bool = False):
+        logger.info(f"Loading Whisper model '{model_name}'...")
+        self.model_name = model_name
+        if quantize and device not in (None, 'cpu'):
+            logger.warning(f"int8 quantization is CPU-only - loading fp32 model on {device}")
+            quantize = False
+        self.quantized = quantize
+        self.model = load_quantized_model(model_name) if quantize else whisper.load_model(model_name, device=device)
+        self.fp16 = self.model.device.type != 'cpu'
+        logger.info(f"Whisper model loaded successfully ({'int8' if quantize else 'fp32'})")
+
+    def transcribe(self, audio, profile: Optional[str] = None) -> dict:
+        """Full Whisper transcription of a waveform or file path (handles any length)"""
+        return self.model.transcribe(audio, **transcribe_options(profile, self.fp16))
+
+    @property
+    def n_mels(self) -> int:
+        return self.model.dims.n_mels
+
+    def transcribe_batch(self, audios: Sequence[Optional[np.ndarray]], profile: Optional[str] = None,
+                         mels: Optional[Sequence[Optional[np.ndarray]]] = None) -> List[str]:
+        """Transcribe several float32 16 kHz waveforms, batching those that fit one 30s window.
+
+        Segments of up to 30s are decoded together from (n_mels, 3000) log-mel
+        windows: ``mels[i]`` if precomputed (``audios[i]`` may then be None),
+        otherwise computed here. Longer ones fall back to sequential
+        ``transcribe`` calls.
+        """
+        mels = list(mels) if mels is not None else [None] * len(audios)
+        for i, audio in enumerate(audios):
+            if mels[i] is not None and mels[i].shape[0] != self.n_mels:
+                mels[i] = None  # Computed for a model with a different mel filterbank
+            if mels[i] is None and len(audio) <= MAX_MEL_SECONDS * SAMPLE_RATE:
+                mels[i] = SegmentFeatures(audio, self.n_mels).whisper_mel()
+
+        texts: List[Optional[str]] = [None] * len(audios)
+        batch_indexes = [i for i, mel in enumerate(mels) if mel is not None]
+        if batch_indexes:
+            for i, text in zip(batch_indexes, self.decode_mels([mels[i] for i in batch_indexes], profile)):
+                texts[i] = text
+            logger.debug(f"Decoded {len(batch_indexes)} segments from log-mel windows")
+
+        for i, audio in enumerate(audios):
+            if texts[i] is None:
+                texts[i] = self.transcribe(audio, profile)['text'].strip()
+
+        return texts
+
+    def triage_batch(self, audios: Sequence[Optional[np.ndarray]],
+                     mels: Optional[Sequence[Optional[np.ndarray]]] = None) -> List[Tuple[str, float]]:
+        """Cheapest possible pass for cascade triage: one greedy decode of each segment's first 30s window.
+
+        Returns (text, avg_logprob) per segment; text is empty for windows Whisper considers silence.
+        """
+        mels = list(mels) if mels is not None else [None] * len(audios)
+        for i, audio in enumerate(audios):
+            if mels[i] is None or mels[i].shape[0] != self.n_mels:
+                mels[i] = SegmentFeatures(audio[:int(MAX_MEL_SECONDS * SAMPLE_RATE)], self.n_mels).whisper_mel()
+
+        batch = torch.from_numpy(np.stack(mels)).to(self.model.device)
+        options = whisper.DecodingOptions(**mel_decoding_options('fast', self.fp16, 0.0))
+        return [
+            ("" if is_silence(result.avg_logprob, result.no_speech_prob) else result.text.strip(), float(result.avg_logprob))
+            for result in whisper.decode(self.model, batch, options)
+        ]
+
+    def decode_mels(self, mels: Sequence[np.ndarray], profile: Optional[str] = None) -> List[str]:
+        """Decode (n_mels, 3000) windows in one batch, retrying individual windows at the profile's fallback temperatures"""
+        batch = torch.from_numpy(np.stack(mels)).to(self.model.device)
+        ladder = temperatures(profile)
+        results = whisper.decode(self.model, batch, whisper.DecodingOptions(**mel_decoding_options(profile, self.fp16, ladder[0])))
+
+        texts = []
+        for i, result in enumerate(results):
+            for temperature in ladder[1:]:
+                if not needs_fallback(result.compression_ratio, result.avg_logprob, result.no_speech_prob):
+                    break
+                options = whisper.DecodingOptions(**mel_decoding_options(profile, self.fp16, temperature))
+                result = whisper.decode(self.model, batch[i:i + 1], options)[0]
+            texts.append("" if is_silence(result.avg_logprob, result.no_speech_prob) else result.text.strip())
+        return texts
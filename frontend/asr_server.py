@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Local Whisper inference server
+Keeps one model warm behind a Unix socket so capture, offline and debug scripts
+can restart without reloading it. Start once per machine:
+
+    python asr_server.py --model base
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import threading
+import time
+
+import numpy as np
+
+from asr_client import recv_message, send_message, socket_path_from_env
+from asr_engine import WhisperEngine
+from audio_buffer import pcm16_to_float32
+from features import N_FRAMES
+from log_config import configure_logging
+from runtime import apply_torch_threads, load_runtime_profile, pin_current_thread
+
+logger = logging.getLogger(__name__)
+
+
+def _decode_pcm(header: dict, payload: bytes) -> np.ndarray:
+    dtype = header.get('dtype', 'float32')
+    if dtype == 'float32':
+        return np.frombuffer(payload, dtype=np.float32)
+    if dtype == 'int16':
+        return pcm16_to_float32(np.frombuffer(payload, dtype=np.int16))
+    raise ValueError(f"Unsupported PCM dtype '{dtype}' (float32 or int16 at 16 kHz)")
+
+
+def _decode_items(header: dict, payload: bytes):
+    """Batch items are float32 PCM ({'pcm': samples}) or precomputed log-mel windows ({'mel': n_mels} x 3000 frames)"""
+    values = np.frombuffer(payload, dtype=np.float32)
+    audios, mels, offset = [], [], 0
+    for item in header['items']:
+        if 'mel' in item:
+            size = item['mel'] * N_FRAMES
+            audios.append(None)
+            mels.append(values[offset:offset + size].reshape(item['mel'], N_FRAMES))
+        else:
+            size = item['pcm']
+            audios.append(values[offset:offset + size])
+            mels.append(None)
+        offset += size
+    return audios, mels
+
+
+def _claim_socket(socket_path: str):
+    """Remove a stale socket file, refusing to start if a live server still answers on it"""
+    if not os.path.exists(socket_path):
+        return
+    if not stat.S_ISSOCK(os.stat(socket_path).st_mode):
+        raise RuntimeError(f"{socket_path} exists and is not a socket - pick another --socket")
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.settimeout(1.0)
+        probe.connect(socket_path)
+    except OSError:
+        os.unlink(socket_path)  # Nobody listening: left behind by a previous run
+        return
+    finally:
+        probe.close()
+    raise RuntimeError(f"Another process is already serving on {socket_path} - stop it or pick another --socket")
+
+
+class WhisperRequestHandler(socketserver.BaseRequestHandler):
+    """Serves framed jobs on one client connection until the client hangs up"""
+
+    def handle(self):
+        while True:
+            try:
+                header, payload = recv_message(self.request)
+            except (EOFError, ConnectionError):
+                return
+
+            try:
+                response = self.server.dispatch(header, payload)
+                response['ok'] = True
+            except Exception as e:
+                logger.error(f"Job {header.get('op')} failed: {e}")
+                response = {'ok': False, 'error': str(e)}
+
+            try:
+                send_message(self.request, response)
+            except OSError:
+                return
+
+
+class WhisperServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server around one WhisperEngine; jobs run one at a time on the model"""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str, engine: WhisperEngine):
+        _claim_socket(socket_path)
+        # Owner-only from the moment it exists: clients send audio and the server spends the model on them
+        umask = os.umask(0o177)
+        try:
+            super().__init__(socket_path, WhisperRequestHandler)
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+        self.socket_path = socket_path
+        self.engine = engine
+        self.started = time.time()
+        self.jobs = 0
+        self._model_lock = threading.Lock()
+
+    def dispatch(self, header: dict, payload: bytes) -> dict:
+        op = header.get('op')
+        if op == 'ping':
+            return {'model': self.engine.model_name, 'quantized': self.engine.quantized,
+                    'n_mels': self.engine.n_mels, 'uptime': time.time() - self.started, 'jobs': self.jobs}
+        if op == 'transcribe':
+            return self.transcribe(header, payload)
+        if op == 'transcribe_batch':
+            return self.transcribe_batch(header, payload)
+        if op == 'triage_batch':
+            return self.triage_batch(header, payload)
+        raise ValueError(f"Unknown op '{op}'")
+
+    def transcribe(self, header: dict, payload: bytes) -> dict:
+        if 'path' in header:
+            raise ValueError("File paths are not accepted - send the audio as PCM samples")
+        audio = _decode_pcm(header, payload)
+        started = time.perf_counter()
+        with self._model_lock:
+            result = self.engine.transcribe(audio, header.get('profile'))
+            self.jobs += 1
+        return {
+            'text': result['text'].strip(),
+            'language': result.get('language'),
+            'profile': header.get('profile'),
+            'segments': [
+                {'start': s['start'], 'end': s['end'], 'text': s['text'].strip()}
+                for s in result.get('segments', [])
+            ],
+            'elapsed': time.perf_counter() - started
+        }
+
+    def transcribe_batch(self, header: dict, payload: bytes) -> dict:
+        audios, mels = _decode_items(header, payload)
+        started = time.perf_counter()
+        with self._model_lock:
+            texts = self.engine.transcribe_batch(audios, header.get('profile'), mels)
+            self.jobs += len(audios)
+        return {'texts': texts, 'elapsed': time.perf_counter() - started}
+
+    def triage_batch(self, header: dict, payload: bytes) -> dict:
+        audios, mels = _decode_items(header, payload)
+        started = time.perf_counter()
+        with self._model_lock:
+            results = self.engine.triage_batch(audios, mels)
+            self.jobs += len(audios)
+        return {
+            'texts': [text for text, _ in results],
+            'logprobs': [logprob for _, logprob in results],
+            'elapsed': time.perf_counter() - started
+        }
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv()  # Same .env as the transcribers (WHISPER_MODEL, WHISPER_SOCKET, WHISPER_LANGUAGE, ...)
+
+    parser = argparse.ArgumentParser(description="Serve a warm Whisper model over a Unix socket")
+    parser.add_argument('--model', default=os.getenv('WHISPER_MODEL', 'base'), help="Whisper model name (WHISPER_MODEL)")
+    parser.add_argument('--quantize', action='store_true',
+                        default=os.getenv('WHISPER_QUANTIZE', 'false').lower() == 'true',
+                        help="Serve a dynamically int8-quantized model (CPU, WHISPER_QUANTIZE)")
+    parser.add_argument('--socket', default=socket_path_from_env(), help="Unix socket path (WHISPER_SOCKET)")
+    args = parser.parse_args()
+
+    configure_logging()  # Console only, written off the request threads
+
+    # The whole server is ASR work: keep it (and torch's thread pool) off the capture cores
+    runtime = load_runtime_profile()
+    apply_torch_threads(runtime)
+    pin_current_thread(runtime.asr_cores)
+    logger.info(f"Runtime profile: {runtime}")
+
+    try:
+        _claim_socket(args.socket)  # Before loading the model, which takes a while
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    server = WhisperServer(args.socket, WhisperEngine(args.model, quantize=args.quantize))
+    signal.signal(signal.SIGTERM, lambda sig, frame: sys.exit(0))
+
+    print(f"🧠 Whisper '{args.model}' ({'int8' if args.quantize else 'fp32'}) inference server listening on {args.socket}")
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        print("\n🛑 Shutting down inference server...")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
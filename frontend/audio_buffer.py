@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Fixed-capacity audio buffers for the live capture loop
+Stores int16 PCM in preallocated NumPy arrays and hands out zero-copy views
+"""
+import numpy as np
+from typing import Union
+
+
+class AudioRingBuffer:
+    """Fixed-capacity int16 ring buffer with contiguous zero-copy reads.
+
+    The backing array is mirrored (every sample is stored twice, ``capacity``
+    apart) so any window of up to ``capacity`` samples is one contiguous slice
+    and can be returned as a view without copying or re-packing.
+    """
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._buffer = np.zeros(capacity * 2, dtype=np.int16)
+        self._read_pos = 0  # Absolute sample index of the oldest unread sample
+        self._write_pos = 0  # Absolute sample index one past the newest sample
+        self.dropped_samples = 0  # Oldest samples overwritten on overflow
+
+    def __len__(self) -> int:
+        return self._write_pos - self._read_pos
+
+    @property
+    def free_space(self) -> int:
+        return self.capacity - len(self)
+
+    def write(self, data: Union[bytes, np.ndarray]) -> int:
+        """Append samples, overwriting the oldest ones on overflow.
+
+        Returns the number of samples dropped to make room.
+        """
+        samples = np.frombuffer(data, dtype=np.int16) if isinstance(data, (bytes, bytearray)) else data
+        skipped = max(0, len(samples) - self.capacity)  # Older than the newest ``capacity``: never stored
+        if skipped:
+            samples = samples[skipped:]
+
+        count = len(samples)
+        if count == 0:
+            return 0
+
+        start = self._write_pos % self.capacity
+        first = min(count, self.capacity - start)
+
+        # Primary copy plus its mirror, split where the write wraps
+        self._buffer[start:start + first] = samples[:first]
+        self._buffer[start + self.capacity:start + self.capacity + first] = samples[:first]
+        if first < count:
+            rest = count - first
+            self._buffer[:rest] = samples[first:]
+            self._buffer[self.capacity:self.capacity + rest] = samples[first:]
+
+        self._write_pos += count
+
+        overflow = max(0, len(self) - self.capacity)
+        self._read_pos += overflow
+        self.dropped_samples += overflow + skipped
+        return overflow + skipped
+
+    def peek(self, count: int) -> np.ndarray:
+        """Return a read-only view of the oldest ``count`` unread samples"""
+        count = min(count, len(self))
+        start = self._read_pos % self.capacity
+        view = self._buffer[start:start + count]
+        view.flags.writeable = False
+        return view
+
+    def consume(self, count: int) -> None:
+        """Mark the oldest ``count`` samples as read"""
+        self._read_pos += min(count, len(self))
+
+    def read(self, count: int) -> np.ndarray:
+        """Return a view of the next ``count`` samples and consume them.
+
+        The view stays valid until ``capacity - count`` more samples are written.
+        """
+        view = self.peek(count)
+        self.consume(len(view))
+        return view
+
+    def clear(self) -> None:
+        """Drop all unread samples without touching the backing array"""
+        self._read_pos = self._write_pos
+
+
+class SegmentRecorder:
+    """Preallocated int16 recording buffer for a single speech segment"""
+
+    def __init__(self, max_samples: int):
+        self.max_samples = max_samples
+        self._buffer = np.zeros(max_samples, dtype=np.int16)
+        self._length = 0
+
+    def __len__(self) -> int:
+        return self._length
+
+    @property
+    def is_full(self) -> bool:
+        return self._length >= self.max_samples
+
+    def append(self, samples: Union[bytes, np.ndarray]) -> int:
+        """Copy samples into the recording; returns how many were stored"""
+        if isinstance(samples, (bytes, bytearray)):
+            samples = np.frombuffer(samples, dtype=np.int16)
+        count = min(len(samples), self.max_samples - self._length)
+        self._buffer[self._length:self._length + count] = samples[:count]
+        self._length += count
+        return count
+
+    def view(self) -> np.ndarray:
+        """Return a zero-copy view of everything recorded so far"""
+        return self._buffer[:self._length]
+
+    def reset(self) -> None:
+        self._length = 0
+
+
+def pcm16_to_float32(samples: np.ndarray) -> np.ndarray:
+    """Convert int16 PCM to the float32 [-1, 1) waveform Whisper expects"""
+    return samples.astype(np.float32) / 32768.0
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+WAV loading for the offline tools (reference index, reports, benchmarks)
+Clips are mixed to mono and resampled to 16 kHz with an anti-aliasing filter
+"""
+import subprocess
+import wave
+from math import gcd
+
+import numpy as np
+
+RATE = 16000
+
+
+def resample(samples: np.ndarray, rate: int, target: int = RATE) -> np.ndarray:
+    """Band-limited resampling of a mono signal from ``rate`` to ``target`` Hz (float64 out).
+
+    scipy's polyphase resampler low-pass filters below the target Nyquist
+    frequency, so content above it is removed instead of folding back into
+    the band; linear interpolation alone would alias it.
+    """
+    x = np.asarray(samples, dtype=np.float64)
+    if rate == target or not len(x):
+        return x.copy()
+
+    from scipy.signal import resample_poly  # Only WAVs that aren't already 16 kHz need scipy
+
+    common = gcd(rate, target)
+    return resample_poly(x, target // common, rate // common)
+
+
+def load_wav_16k(path: str) -> np.ndarray:
+    """Load a 16-bit PCM WAV file as mono int16 at 16 kHz"""
+    with wave.open(path, 'rb') as wf:
+        if wf.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+        channels = wf.getnchannels()
+        rate = wf.getframerate()
+        samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    if rate != RATE:
+        samples = resample(samples, rate)
+    return np.clip(np.round(samples), -32768, 32767).astype(np.int16)
+
+
+def load_audio_16k(path: str) -> np.ndarray:
+    """Load any audio file as mono float32 at 16 kHz: 16-bit WAV directly, everything else through ffmpeg
+    (the same command whisper.load_audio runs)"""
+    if path.lower().endswith('.wav'):
+        try:
+            return load_wav_16k(path).astype(np.float32) / 32768.0
+        except (ValueError, EOFError, wave.Error):
+            pass  # Not 16-bit PCM: let ffmpeg convert it
+    command = ['ffmpeg', '-nostdin', '-threads', '0', '-i', path,
+               '-f', 's16le', '-ac', '1', '-acodec', 'pcm_s16le', '-ar', str(RATE), '-']
+    try:
+        out = subprocess.run(command, capture_output=True, check=True).stdout
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio {path}: {e.stderr.decode(errors='replace').strip()}") from e
+    return np.frombuffer(out, dtype=np.int16).astype(np.float32) / 32768.0
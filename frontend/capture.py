@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Audio capture devices for the live transcriber
+One process can capture from several PyAudio inputs, each tagged with its own device_id
+"""
+import logging
+from typing import List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEVICE_ID = 'live_audio_device'
+
+
+class CaptureDevice:
+    """One input stream with its own VAD/segmenter state, tagged with a device_id"""
+
+    def __init__(self, device_id: str, input_device_index: Optional[int], segmenter,
+                 decoding_profile: Optional[str] = None):
+        self.device_id = device_id
+        self.input_device_index = input_device_index
+        self.segmenter = segmenter
+        self.decoding_profile = decoding_profile
+        self.stream = None
+        self.input_overflows = 0
+
+    def __repr__(self):
+        index = 'default' if self.input_device_index is None else self.input_device_index
+        return f"CaptureDevice({self.device_id!r}, input={index}, profile={self.decoding_profile})"
+
+
+def parse_device_config(spec: Optional[str]) -> List[Tuple[Optional[int], str, Optional[str]]]:
+    """Parse AUDIO_DEVICES, e.g. "2:platform_1:fast,5:platform_2".
+
+    Each entry is ``<input device index>:<device_id>[:<decoding profile>]``; a
+    bare index gets the device_id ``device_<index>`` and a missing profile
+    means the default one. An empty spec means the default input.
+    """
+    if not spec or not spec.strip():
+        return [(None, DEFAULT_DEVICE_ID, None)]
+
+    devices = []
+    for entry in spec.split(','):
+        entry = entry.strip()
+        if not entry:
+            continue
+        index, _, rest = entry.partition(':')
+        device_id, _, profile = rest.partition(':')
+        try:
+            input_index = int(index)
+        except ValueError:
+            raise ValueError(f"Invalid AUDIO_DEVICES entry '{entry}' - expected <index>:<device_id>[:<profile>]")
+        devices.append((input_index, device_id.strip() or f'device_{input_index}', profile.strip() or None))
+
+    device_ids = [device_id for _, device_id, _ in devices]
+    if len(set(device_ids)) != len(device_ids):
+        raise ValueError(f"Duplicate device_id in AUDIO_DEVICES: {spec}")
+    return devices
+
+
+def list_input_devices(audio) -> List[Tuple[int, str, int]]:
+    """Return (index, name, max input channels) for every PyAudio input device"""
+    devices = []
+    for index in range(audio.get_device_count()):
+        info = audio.get_device_info_by_index(index)
+        if info.get('maxInputChannels', 0) > 0:
+            devices.append((index, info.get('name', ''), int(info['maxInputChannels'])))
+    return devices
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Two-stage ASR cascade: a small Whisper model triages every segment, the main model only re-decodes likely announcements
+Includes an evaluation against main-model-only decoding on labeled clips (ASR time saved vs announcement recall lost)
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TRIAGE_MODEL = 'tiny'
+# Separate from the main server's socket, so triage never lands on the main model by accident
+DEFAULT_TRIAGE_SOCKET = '/tmp/hackquest-whisper-tiny.sock'
+# Triage decodes below this average token log-probability are too rough to trust either way
+DEFAULT_LOGPROB_THRESHOLD = -0.8
+
+
+class CascadeSettings:
+    """Triage model, its server socket and the escalation threshold.
+
+    Read from the environment when constructed (WHISPER_TRIAGE_MODEL,
+    WHISPER_TRIAGE_SOCKET, TRIAGE_LOGPROB_THRESHOLD), i.e. after .env is loaded.
+    """
+
+    def __init__(self, model_name: Optional[str] = None, socket_path: Optional[str] = None,
+                 logprob_threshold: Optional[float] = None):
+        self.model_name = model_name or os.getenv('WHISPER_TRIAGE_MODEL', DEFAULT_TRIAGE_MODEL)
+        self.socket_path = socket_path or os.getenv('WHISPER_TRIAGE_SOCKET', DEFAULT_TRIAGE_SOCKET)
+        self.logprob_threshold = (float(os.getenv('TRIAGE_LOGPROB_THRESHOLD', DEFAULT_LOGPROB_THRESHOLD))
+                                  if logprob_threshold is None else logprob_threshold)
+
+    def __repr__(self):
+        return (f"CascadeSettings(model={self.model_name!r}, socket={self.socket_path!r}, "
+                f"logprob_threshold={self.logprob_threshold})")
+
+
+def should_escalate(text: str, avg_logprob: float, classifier: Callable[[str], bool],
+                    logprob_threshold: float = DEFAULT_LOGPROB_THRESHOLD) -> bool:
+    """Re-decode with the main model if the rough transcript looks like an announcement or is low-confidence"""
+    if not text:
+        return False  # Triage model heard no speech
+    return avg_logprob < logprob_threshold or classifier(text)
+
+
+def load_triage_asr(settings: Optional[CascadeSettings] = None):
+    """Triage model: its own inference server (asr_server.py --model tiny --socket ...) or in-process"""
+    from asr_client import load_asr
+    settings = settings or CascadeSettings()
+    return load_asr(settings.model_name, socket_path=settings.socket_path)
+
+
+class CascadeStats:
+    """Running totals for the live cascade; the saving estimate prices skipped segments at the main model's average"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.triaged = 0
+        self.escalated = 0
+        self.triage_seconds = 0.0
+        self.main_seconds = 0.0
+
+    def record_triage(self, segments: int, escalated: int, seconds: float):
+        with self._lock:
+            self.triaged += segments
+            self.escalated += escalated
+            self.triage_seconds += seconds
+
+    def record_main(self, seconds: float):
+        with self._lock:
+            self.main_seconds += seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            skipped = self.triaged - self.escalated
+            per_segment = self.main_seconds / self.escalated if self.escalated else 0.0
+            return {
+                'triaged': self.triaged,
+                'escalated': self.escalated,
+                'escalation_rate': self.escalated / self.triaged if self.triaged else 0.0,
+                'triage_seconds': self.triage_seconds,
+                'main_seconds': self.main_seconds,
+                'estimated_saved_seconds': skipped * per_segment - self.triage_seconds
+            }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"{s['escalated']}/{s['triaged']} segments escalated ({s['escalation_rate']:.0%}), "
+                f"triage {s['triage_seconds']:.1f}s, main {s['main_seconds']:.1f}s, "
+                f"~{s['estimated_saved_seconds']:.1f}s ASR saved")
+
+
+def evaluate(clips: Dict[str, np.ndarray], labels: Dict[str, bool], main_engine, triage_engine,
+             classifier: Callable[[str], bool], profile: Optional[str] = None,
+             logprob_threshold: float = DEFAULT_LOGPROB_THRESHOLD) -> dict:
+    """Cascade vs main-model-only decoding on labeled clips (label True = announcement).
+
+    Decoding is deterministic, so an escalated clip's main-model result is
+    the same as its main-only result and is decoded once, charged to both.
+    """
+    rows = []
+    for name, audio in clips.items():
+        started = time.perf_counter()
+        main_text = main_engine.transcribe_batch([audio], profile)[0]
+        main_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        triage_text, avg_logprob = triage_engine.triage_batch([audio])[0]
+        triage_seconds = time.perf_counter() - started
+
+        escalated = should_escalate(triage_text, avg_logprob, classifier, logprob_threshold)
+        cascade_text = main_text if escalated else triage_text
+        rows.append({
+            'clip': name,
+            'label': labels[name],
+            'main_detected': bool(main_text) and classifier(main_text),
+            'cascade_detected': bool(cascade_text) and classifier(cascade_text),
+            'escalated': escalated,
+            'triage_logprob': avg_logprob,
+            'main_seconds': main_seconds,
+            'cascade_seconds': triage_seconds + (main_seconds if escalated else 0.0)
+        })
+
+    def recall(key: str) -> float:
+        positives = [row for row in rows if row['label']]
+        return sum(row[key] for row in positives) / len(positives) if positives else 0.0
+
+    main_total = sum(row['main_seconds'] for row in rows)
+    cascade_total = sum(row['cascade_seconds'] for row in rows)
+    return {
+        'clips': len(rows),
+        'announcements': sum(row['label'] for row in rows),
+        'escalation_rate': sum(row['escalated'] for row in rows) / len(rows) if rows else 0.0,
+        'main_only_seconds': main_total,
+        'cascade_seconds': cascade_total,
+        'saved_fraction': 1 - cascade_total / main_total if main_total else 0.0,
+        'main_only_recall': recall('main_detected'),
+        'cascade_recall': recall('cascade_detected'),
+        'recall_lost': recall('main_detected') - recall('cascade_detected'),
+        'lost_announcements': [row['clip'] for row in rows if row['label'] and row['main_detected'] and not row['cascade_detected']],
+        'details': rows
+    }
+
+
+def load_labels(directory: str, labels_path: Optional[str] = None) -> Dict[str, bool]:
+    """{"clip.wav": true|false} or {"clip.wav": {"announcement": true}}; defaults to <directory>/labels.json"""
+    with open(labels_path or os.path.join(directory, 'labels.json')) as f:
+        raw = json.load(f)
+    return {name: bool(value['announcement'] if isinstance(value, dict) else value) for name, value in raw.items()}
+
+
+def main():
+    from dotenv import load_dotenv
+    load_dotenv()
+    settings = CascadeSettings()
+
+    parser = argparse.ArgumentParser(description="Measure ASR time saved and recall lost by the tiny -> base cascade")
+    parser.add_argument('directory', help="Folder of 16-bit WAV clips")
+    parser.add_argument('--labels', help="Labels JSON (default: <directory>/labels.json)")
+    parser.add_argument('--main', default=os.getenv('WHISPER_MODEL', 'base'), help="Main model (default base)")
+    parser.add_argument('--triage', default=settings.model_name, help=f"Triage model (default {settings.model_name})")
+    parser.add_argument('--profile', help="Decoding profile for the main model")
+    parser.add_argument('--threshold', type=float, default=settings.logprob_threshold,
+                        help="Escalate triage decodes below this avg log-probability")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    from asr_client import load_asr
+    from log_config import stage_logger
+    from model import LiveAudioTranscriber
+    from audio_io import load_wav_16k
+
+    labels = load_labels(args.directory, args.labels)
+    clips = {name: load_wav_16k(os.path.join(args.directory, name)).astype(np.float32) / 32768.0
+             for name in sorted(labels)}
+    # Same rules the live pipeline escalates on; per-pattern logging is just noise here
+    logging.getLogger('model').setLevel(logging.WARNING)
+    stage_logger('classification').setLevel(logging.WARNING)
+    classifier = LiveAudioTranscriber().matches_announcement_rules
+
+    report = evaluate(clips, labels, load_asr(args.main), load_triage_asr(CascadeSettings(args.triage, settings.socket_path)), classifier,
+                      args.profile, args.threshold)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+
+    print(f"⚡ ASR CASCADE: {args.triage} -> {args.main} ({report['clips']} clips, {report['announcements']} announcements)")
+    print("=" * 70)
+    lines = [
+        (f"Escalated to {args.main}", f"{report['escalation_rate']:.0%}"),
+        (f"ASR time {args.main}-only", f"{report['main_only_seconds']:.1f}s"),
+        ("ASR time cascade", f"{report['cascade_seconds']:.1f}s ({report['saved_fraction']:.0%} saved)"),
+        (f"Recall {args.main}-only", f"{report['main_only_recall']:.1%}"),
+        ("Recall cascade", f"{report['cascade_recall']:.1%} ({report['recall_lost']:.1%} lost)")
+    ]
+    for label, value in lines:
+        print(f"{label + ':':22s} {value}")
+    for clip in report['lost_announcements']:
+        print(f"   ❌ missed: {clip}")
+
+
+if __name__ == "__main__":
+    main()
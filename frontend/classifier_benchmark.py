@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+Announcement classifier throughput benchmark across every detector entry point
+Builds a large synthetic transcript corpus from the test datasets' phrases and reports texts/sec, per-call latency,
+memory allocated and decision agreement for each variant; --baseline turns it into a regression check
+The transcriber and tester entry points all run the shared compiled classifier, so their agreement is measured
+against independent implementations: the original rule-by-rule evaluation of the same rule file (gated) and the
+learned model backend (informational - a different classifier, expected to disagree on part of the corpus)
+"""
+import argparse
+import hashlib
+import json
+import logging
+import random
+import re
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from announcement_classifier import load_rules, reference_is_announcement, transcript_corpus
+
+# Reference variant first: agreement is measured against it
+VARIANTS = ('reference', 'live', 'offline', 'enhanced', 'test_final', 'test_improved', 'model')
+REFERENCE = VARIANTS[0]
+# Not held to --min-agreement: an independently trained classifier, compared for information only
+INFORMATIONAL = ('model',)
+VARIANT_LABELS = {
+    'reference': 'reference_is_announcement (rule-by-rule, same rule file)',
+    'live': 'LiveAudioTranscriber.is_announcement',
+    'offline': 'OfflineAudioTranscriber.is_announcement',
+    'enhanced': 'AdvancedAnnouncementTester.enhanced_is_announcement',
+    'test_final': 'FinalOptimizedTester.is_announcement',
+    'test_improved': 'ImprovedAnnouncementTester.is_announcement',
+    'model': 'LogisticAnnouncementModel (ANNOUNCEMENT_BACKEND=model)'
+}
+
+
+def corpus_phrases() -> List[str]:
+    """Clauses of every labeled transcript (split at , : ;), deduplicated"""
+    phrases = (part.strip() for text in transcript_corpus() for part in re.split(r'[,:;]', text))
+    return list(dict.fromkeys(phrase for phrase in phrases if phrase))
+
+
+def build_corpus(size: int, seed: int = 0) -> List[str]:
+    """``size`` transcripts of 1-3 recombined phrases, with the case and punctuation variations ASR produces"""
+    rng = random.Random(seed)
+    phrases = corpus_phrases()
+    styles = (str, str, str, str.lower, str.upper,
+              lambda line: line.rstrip('.?!') + '.', lambda line: line.rstrip('.?!') + '?')
+    return [rng.choice(styles)(', '.join(rng.sample(phrases, rng.choice((1, 1, 2, 2, 3))))) for _ in range(size)]
+
+
+def load_variants(names=VARIANTS) -> Dict[str, Callable[[str], bool]]:
+    """Each variant as a text -> bool callable, built the way its callers build it (test mode off)"""
+    variants = {}
+    for name in names:
+        if name == 'reference':
+            rules = load_rules()
+            variants[name] = lambda text: reference_is_announcement(text, rules)
+        elif name == 'live':
+            from model import LiveAudioTranscriber
+            transcriber = LiveAudioTranscriber()
+            transcriber.test_mode = False
+            variants[name] = transcriber.is_announcement
+        elif name == 'offline':
+            from offline_transcription import OfflineAudioTranscriber
+            transcriber = OfflineAudioTranscriber()
+            transcriber.test_mode = False
+            variants[name] = transcriber.is_announcement
+        elif name == 'enhanced':
+            from advanced_test import AdvancedAnnouncementTester
+            enhanced = AdvancedAnnouncementTester().enhanced_is_announcement
+            variants[name] = lambda text: enhanced(text)['is_announcement']
+        elif name == 'test_final':
+            from test_final import FinalOptimizedTester
+            variants[name] = FinalOptimizedTester().is_announcement
+        elif name == 'test_improved':
+            from test_improved import ImprovedAnnouncementTester
+            variants[name] = ImprovedAnnouncementTester().is_announcement
+        elif name == 'model':
+            from announcement_model import load_announcement_model
+            variants[name] = load_announcement_model()
+    return variants
+
+
+def measure(detect: Callable[[str], bool], corpus: List[str], rounds: int = 1, latency_sample: int = 20000,
+            memory_sample: int = 2000) -> dict:
+    """Throughput over the whole corpus (best of ``rounds``), per-call latency and traced memory on samples"""
+    for text in corpus[:1000]:  # Warm up (lazy rule loading, caches)
+        detect(text)
+
+    best, decisions = float('inf'), None
+    for _ in range(max(1, rounds)):
+        started = time.perf_counter()
+        decisions = [detect(text) for text in corpus]
+        best = min(best, time.perf_counter() - started)
+
+    # Per-call timing has its own overhead, so it runs on a separate pass over a sample
+    timer = time.perf_counter_ns
+    latencies = np.empty(min(latency_sample, len(corpus)), dtype=np.int64)
+    for i, text in enumerate(corpus[:len(latencies)]):
+        started = timer()
+        detect(text)
+        latencies[i] = timer() - started
+
+    # tracemalloc slows everything down, so it gets its own (smaller) pass too
+    sample = corpus[:memory_sample]
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        for text in sample:
+            detect(text)
+        after, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    decisions = np.fromiter(decisions, dtype=bool, count=len(corpus))
+    return {
+        'texts_per_sec': len(corpus) / best,
+        'p50_us': float(np.percentile(latencies, 50)) / 1000,
+        'p99_us': float(np.percentile(latencies, 99)) / 1000,
+        'peak_kib': (peak - before) / 1024,
+        'retained_bytes_per_call': (after - before) / len(sample) if sample else 0.0,
+        'positive_rate': float(decisions.mean()) if len(decisions) else 0.0,
+        'decisions_digest': hashlib.blake2b(np.packbits(decisions).tobytes(), digest_size=8).hexdigest(),
+        'decisions': decisions
+    }
+
+
+def run(size: int, seed: int = 0, names=VARIANTS, rounds: int = 1, latency_sample: int = 20000,
+        memory_sample: int = 2000) -> dict:
+    """Benchmark the variants on one corpus; decisions are compared against the rule-by-rule reference"""
+    corpus = build_corpus(size, seed)
+    # The reference always runs: agreement among the shared-classifier variants alone would hold by construction
+    variants = load_variants((REFERENCE,) + tuple(name for name in names if name != REFERENCE))
+    # Construction logs at INFO; the benchmark only wants its own output
+    logging.getLogger().setLevel(logging.WARNING)
+
+    results = {name: measure(detect, corpus, rounds, latency_sample, memory_sample) for name, detect in variants.items()}
+    reference = results[REFERENCE]['decisions']
+    for result in results.values():
+        disagree = np.flatnonzero(result.pop('decisions') != reference)
+        result['agreement'] = 1 - len(disagree) / len(corpus) if corpus else 1.0
+        result['disagreements'] = [corpus[i] for i in disagree[:5]]
+
+    return {
+        'corpus': {
+            'size': len(corpus),
+            'seed': seed,
+            'phrases': len(corpus_phrases()),
+            'digest': hashlib.blake2b('\n'.join(corpus).encode(), digest_size=8).hexdigest()
+        },
+        'reference': REFERENCE,
+        'variants': results
+    }
+
+
+def regressions(report: dict, baseline: dict, max_slowdown: float, min_agreement: float) -> List[str]:
+    """Problems to fail on: disagreeing variants, changed decisions on the same corpus, throughput drops"""
+    problems = []
+    same_corpus = baseline.get('corpus', {}).get('digest') == report['corpus']['digest']
+    for name, result in report['variants'].items():
+        if name not in INFORMATIONAL and result['agreement'] < min_agreement:
+            problems.append(f"{name} agrees with {report['reference']} on only {result['agreement']:.4%}")
+        previous = baseline.get('variants', {}).get(name)
+        if previous is None:
+            continue
+        if same_corpus and previous['decisions_digest'] != result['decisions_digest']:
+            problems.append(f"{name} decisions changed (positive rate {previous['positive_rate']:.2%} -> "
+                            f"{result['positive_rate']:.2%})")
+        if result['texts_per_sec'] < previous['texts_per_sec'] * (1 - max_slowdown):
+            problems.append(f"{name} slowed down: {previous['texts_per_sec']:,.0f} -> "
+                            f"{result['texts_per_sec']:,.0f} texts/s")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput, latency, allocations and agreement of every "
+                                                 "announcement detector on a synthetic transcript corpus")
+    parser.add_argument('--size', type=int, default=200000, help="Synthetic transcripts (default 200000)")
+    parser.add_argument('--seed', type=int, default=0, help="Corpus seed; same seed and size = same corpus")
+    parser.add_argument('--variant', action='append', choices=VARIANTS, help="Only run these variants")
+    parser.add_argument('--rounds', type=int, default=1, help="Timed passes per variant (best is reported)")
+    parser.add_argument('--latency-sample', type=int, default=20000, help="Texts timed individually for p50/p99")
+    parser.add_argument('--memory-sample', type=int, default=2000, help="Texts traced with tracemalloc")
+    parser.add_argument('--baseline', help="Earlier --json output to check for regressions against")
+    parser.add_argument('--max-slowdown', type=float, default=0.25,
+                        help="Fail if throughput drops by more than this fraction vs the baseline")
+    parser.add_argument('--min-agreement', type=float, default=1.0,
+                        help="Fail if a rule-based variant agrees with the reference on fewer texts than this")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    report = run(args.size, args.seed, args.variant or VARIANTS, args.rounds, args.latency_sample, args.memory_sample)
+    baseline: Optional[dict] = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    problems = regressions(report, baseline or {}, args.max_slowdown, args.min_agreement)
+
+    if args.json:
+        print(json.dumps(dict(report, problems=problems), indent=2))
+    else:
+        corpus = report['corpus']
+        print(f"🏁 CLASSIFIER BENCHMARK ({corpus['size']:,} transcripts from {corpus['phrases']} phrases, "
+              f"seed {corpus['seed']})")
+        print("=" * 100)
+        print(f"{'variant':14s} {'texts/s':>10s} {'p50 µs':>8s} {'p99 µs':>8s} {'peak KiB':>9s} "
+              f"{'kept B/call':>11s} {'positive':>9s} {'agreement':>10s}")
+        for name, result in report['variants'].items():
+            print(f"{name:14s} {result['texts_per_sec']:10,.0f} {result['p50_us']:8.1f} {result['p99_us']:8.1f} "
+                  f"{result['peak_kib']:9.1f} {result['retained_bytes_per_call']:11.1f} "
+                  f"{result['positive_rate']:9.1%} {result['agreement']:10.2%}")
+            for text in result['disagreements']:
+                print(f"   ≠ {text}")
+        print(f"Agreement is against {VARIANT_LABELS[report['reference']]}; "
+              f"{', '.join(INFORMATIONAL)} agreement is informational (independent learned classifier, not gated)")
+        for problem in problems:
+            print(f"❌ {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,7 +2,6 @@
 """
 Debug script to test the transcription system step by step
 """
-import whisper
 import pyaudio
 import wave
 import tempfile
@@ -11,6 +10,7 @@ import time
 import numpy as np
 from supabase import create_client
 from dotenv import load_dotenv
+from asr_client import WhisperClient, load_asr
 
 def test_microphone():
     """Test if microphone is working"""
@@ -55,8 +55,11 @@ def test_whisper():
     """Test if Whisper is working"""
     print("🗣️ Testing Whisper...")
     try:
-        model = whisper.load_model("base")
-        print("✅ Whisper model loaded successfully")
+        model = load_asr("base")
+        if isinstance(model, WhisperClient):
+            print(f"✅ Connected to Whisper inference server at {model.socket_path}")
+        else:
+            print("✅ Whisper model loaded successfully (no inference server running)")
         return model
     except Exception as e:
         print(f"❌ Whisper test failed: {e}")
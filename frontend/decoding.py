@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Named Whisper decoding profiles
+Trade accuracy for latency per device; pure Python so socket clients can validate names without whisper
+"""
+import os
+from typing import Optional
+
+# Announcements here are in one known language: skip per-segment detection (WHISPER_LANGUAGE=auto re-enables it)
+DEFAULT_LANGUAGE = 'en'
+
+# Keyword arguments for model.transcribe(). Temperatures after the first are fallbacks, only
+# tried when a decode looks repetitive or low-confidence; every fallback is a full extra pass.
+DECODING_PROFILES = {
+    # Greedy, no fallbacks, no timestamp tokens: one decoder pass per 30s window
+    'fast': {
+        'temperature': (0.0,),
+        'beam_size': None,
+        'best_of': None,
+        'condition_on_previous_text': False,
+        'without_timestamps': True
+    },
+    # Greedy first pass with two cheap sampling fallbacks for garbled decodes
+    'balanced': {
+        'temperature': (0.0, 0.4, 0.8),
+        'beam_size': None,
+        'best_of': 2,
+        'condition_on_previous_text': False,
+        'without_timestamps': False
+    },
+    # Beam search with Whisper's full fallback ladder
+    'accurate': {
+        'temperature': (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        'beam_size': 5,
+        'best_of': 5,
+        'condition_on_previous_text': True,
+        'without_timestamps': False
+    }
+}
+
+DEFAULT_PROFILE = 'balanced'
+
+# Whisper's own fallback / silence thresholds (see whisper.transcribe)
+COMPRESSION_RATIO_THRESHOLD = 2.4
+LOGPROB_THRESHOLD = -1.0
+NO_SPEECH_THRESHOLD = 0.6
+
+
+def resolve_profile(name: Optional[str]) -> str:
+    """Validate a profile name, defaulting to DEFAULT_PROFILE"""
+    name = (name or DEFAULT_PROFILE).lower()
+    if name not in DECODING_PROFILES:
+        raise ValueError(f"Unknown decoding profile '{name}' (choose from {', '.join(DECODING_PROFILES)})")
+    return name
+
+
+def _language() -> Optional[str]:
+    # Read per decode, not at import: the transcribers load .env after this module is imported
+    language = os.getenv('WHISPER_LANGUAGE', DEFAULT_LANGUAGE)
+    return None if language.lower() == 'auto' else language
+
+
+def transcribe_options(profile: Optional[str], fp16: bool) -> dict:
+    """model.transcribe() keyword arguments for a profile"""
+    options = dict(DECODING_PROFILES[resolve_profile(profile)])
+    options['language'] = _language()
+    options['fp16'] = fp16  # Explicit so CPU runs don't warn and fall back on every call
+    return options
+
+
+def temperatures(profile: Optional[str]) -> tuple:
+    """First-pass temperature followed by the profile's fallbacks"""
+    return DECODING_PROFILES[resolve_profile(profile)]['temperature']
+
+
+def mel_decoding_options(profile: Optional[str], fp16: bool, temperature: float = 0.0) -> dict:
+    """whisper.DecodingOptions arguments for one pass over a 30s mel window"""
+    options = DECODING_PROFILES[resolve_profile(profile)]
+    return {
+        'language': _language(),
+        'temperature': temperature,
+        # Beam search for the greedy pass, best-of sampling for fallbacks (Whisper rejects the mix)
+        'beam_size': options['beam_size'] if temperature == 0 else None,
+        'best_of': options['best_of'] if temperature > 0 else None,
+        'without_timestamps': True,
+        'fp16': fp16
+    }
+
+
+def needs_fallback(compression_ratio: float, avg_logprob: float, no_speech_prob: float) -> bool:
+    """Whisper's retry rule: repetitive or low-confidence output, unless the window is just silence"""
+    if is_silence(avg_logprob, no_speech_prob):
+        return False
+    return compression_ratio > COMPRESSION_RATIO_THRESHOLD or avg_logprob < LOGPROB_THRESHOLD
+
+
+def is_silence(avg_logprob: float, no_speech_prob: float) -> bool:
+    return no_speech_prob > NO_SPEECH_THRESHOLD and avg_logprob < LOGPROB_THRESHOLD
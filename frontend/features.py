@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Shared STFT / log-mel features for a speech segment
+Computed once per segment and reused by Whisper (precomputed mel) and siren detection (band energies)
+"""
+from typing import Optional
+
+import numpy as np
+
+# Whisper's front end: 25 ms Hann window, 10 ms hop at 16 kHz, 30 s (3000 frame) input window
+SAMPLE_RATE = 16000
+N_FFT = 400
+HOP_LENGTH = 160
+N_FRAMES = 3000
+MAX_MEL_SECONDS = N_FRAMES * HOP_LENGTH / SAMPLE_RATE
+
+_LOG_FLOOR = -10.0  # log10 of Whisper's 1e-10 clamp (what zero padding turns into)
+_mel_filters = {}
+
+
+def mel_filters(n_mels: int = 80) -> np.ndarray:
+    """Mel filterbank matrix (n_mels, N_FFT // 2 + 1); Whisper's own filters come from the same call"""
+    if n_mels not in _mel_filters:
+        import librosa
+        _mel_filters[n_mels] = librosa.filters.mel(sr=SAMPLE_RATE, n_fft=N_FFT, n_mels=n_mels).astype(np.float32)
+    return _mel_filters[n_mels]
+
+
+class SegmentFeatures:
+    """Power spectrogram and raw log-mel of one float32 16 kHz segment.
+
+    The STFT matches ``whisper.log_mel_spectrogram`` (centered, reflect
+    padded, periodic Hann, last frame dropped), so ``whisper_mel()`` can be
+    handed straight to the decoder. The log-mel is only computed when first
+    asked for: segments answered by the fingerprint index or cache never
+    need it (nor librosa for the filterbank).
+    """
+
+    def __init__(self, audio: np.ndarray, n_mels: int = 80):
+        self.audio = audio
+        self.n_mels = n_mels
+
+        samples = np.asarray(audio, dtype=np.float32)
+        if len(samples) <= N_FFT // 2:
+            samples = np.pad(samples, (0, N_FFT // 2 + 1 - len(samples)))
+        padded = np.pad(samples, N_FFT // 2, mode='reflect')
+        frames = np.lib.stride_tricks.sliding_window_view(padded, N_FFT)[::HOP_LENGTH]
+
+        window = (0.5 - 0.5 * np.cos(2 * np.pi * np.arange(N_FFT) / N_FFT)).astype(np.float32)
+        spectrum = np.fft.rfft(frames * window, axis=1)
+        self.power = (spectrum.real ** 2 + spectrum.imag ** 2).T[:, :-1].astype(np.float32)  # (freq bins, frames)
+        self._log_mel = None
+
+    @property
+    def log_mel(self) -> np.ndarray:
+        """Un-normalized log10 mel energies (n_mels, frames); see whisper_mel()"""
+        if self._log_mel is None:
+            mel = mel_filters(self.n_mels) @ self.power
+            self._log_mel = np.log10(np.maximum(mel, 1e-10))
+        return self._log_mel
+
+    @property
+    def duration(self) -> float:
+        return len(self.audio) / SAMPLE_RATE
+
+    @property
+    def freqs(self) -> np.ndarray:
+        return np.fft.rfftfreq(N_FFT, 1.0 / SAMPLE_RATE)
+
+    def band_magnitudes(self, low_hz: float, high_hz: float) -> np.ndarray:
+        """STFT magnitudes of the bins between ``low_hz`` and ``high_hz`` (bins, frames)"""
+        freqs = self.freqs
+        mask = (freqs >= low_hz) & (freqs <= high_hz)
+        return np.sqrt(self.power[mask, :])
+
+    def whisper_mel(self, start_sample: int = 0) -> np.ndarray:
+        """Normalized (n_mels, 3000) log-mel window for Whisper, starting at ``start_sample``.
+
+        Whisper normalizes each window against its own peak, so slicing the
+        raw log-mel here gives the same input as recomputing it for the slice.
+        """
+        start = start_sample // HOP_LENGTH
+        log_spec = self.log_mel[:, start:start + N_FRAMES]
+        if log_spec.shape[1] < N_FRAMES:
+            log_spec = np.pad(log_spec, ((0, 0), (0, N_FRAMES - log_spec.shape[1])), constant_values=_LOG_FLOOR)
+        log_spec = np.maximum(log_spec, log_spec.max() - 8.0)
+        return ((log_spec + 4.0) / 4.0).astype(np.float32)
+
+
+def detect_siren(features: SegmentFeatures, low_hz: float = 1000, high_hz: float = 3000,
+                 variance_threshold: float = 1.0, reference_n_fft: Optional[int] = 2048) -> bool:
+    """Siren heuristic on 1-3 kHz band energy: present and strongly varying over time.
+
+    Magnitudes scale with the FFT window length, so the variance is rescaled
+    to the n_fft=2048 librosa STFT the threshold was originally tuned on.
+    """
+    band = features.band_magnitudes(low_hz, high_hz)
+    if band.size == 0:
+        return False
+    mean_energy = float(np.mean(band))
+    var_energy = float(np.var(np.mean(band, axis=0)))
+    if reference_n_fft:
+        var_energy *= (reference_n_fft / N_FFT) ** 2
+    return mean_energy > 0 and var_energy > variance_threshold
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the entry points
+Each scenario runs in a fresh interpreter; reports wall time, the slowest imports and which heavy dependencies got loaded
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+FRONTEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Dependencies that should only load when audio, Whisper or the database is actually used
+HEAVY_MODULES = ('whisper', 'torch', 'supabase', 'pyaudio', 'librosa', 'scipy')
+
+SCENARIOS = {
+    'import offline_transcription': "import offline_transcription",
+    'import model': "import model",
+    'offline is_announcement': (
+        "from offline_transcription import OfflineAudioTranscriber\n"
+        "t = OfflineAudioTranscriber()\n"
+        "t.analyze_transcription('Flight 123 now boarding at gate 5')"
+    ),
+    'live is_announcement': (
+        "from model import LiveAudioTranscriber\n"
+        "t = LiveAudioTranscriber()\n"
+        "t.analyze_transcription('Attention all passengers')"
+    ),
+    'import asr_engine (model path)': "import asr_engine",
+}
+
+# Runs inside the child: time the snippet, then report what it pulled in
+_HARNESS = """
+import json, sys, time
+started = time.perf_counter()
+error = None
+try:
+    exec(compile({code!r}, '<scenario>', 'exec'))
+except Exception as e:
+    error = f"{{type(e).__name__}}: {{e}}"
+elapsed = time.perf_counter() - started
+heavy = sorted({{name.split('.')[0] for name in sys.modules}} & set({heavy!r}))
+print('@@RESULT@@' + json.dumps({{'seconds': elapsed, 'heavy': heavy, 'modules': len(sys.modules), 'error': error}}))
+"""
+
+
+def parse_importtime(stderr: str, top: int = 5) -> List[dict]:
+    """Slowest imports by cumulative time from ``python -X importtime`` output"""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        # "import time:  self [us] | cumulative | imported package" - nested imports are indented
+        try:
+            _, cumulative_us, name = line[len('import time:'):].split('|')
+            cumulative_ms = int(cumulative_us) / 1000
+        except ValueError:
+            continue
+        if len(name) - len(name.lstrip()) <= 3:  # Entry modules and their direct imports; deeper ones are already in those totals
+            rows.append({'module': name.strip(), 'cumulative_ms': cumulative_ms})
+    return sorted(rows, key=lambda row: -row['cumulative_ms'])[:top]
+
+
+def run_scenario(code: str, runs: int) -> dict:
+    """Median wall time of ``code`` over fresh interpreters, plus import details from the first run"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [FRONTEND_DIR, env.get('PYTHONPATH')]))
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    script = _HARNESS.format(code=code, heavy=HEAVY_MODULES)
+
+    timings, first = [], None
+    for i in range(runs):
+        command = [sys.executable] + (['-X', 'importtime'] if i == 0 else []) + ['-c', script]
+        proc = subprocess.run(command, cwd=FRONTEND_DIR, env=env, capture_output=True, text=True)
+        marker = [line for line in proc.stdout.splitlines() if line.startswith('@@RESULT@@')]
+        if not marker:
+            return {'error': (proc.stderr.strip().splitlines() or ['no output'])[-1]}
+        result = json.loads(marker[0][len('@@RESULT@@'):])
+        if i == 0:
+            first = result
+            first['slowest_imports'] = parse_importtime(proc.stderr)
+        else:
+            timings.append(result['seconds'])  # The -X importtime run is slower; not counted when others exist
+
+    first['median_ms'] = statistics.median(timings or [first['seconds']]) * 1000
+    del first['seconds']
+    return first
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure startup/import cost of the transcriber entry points")
+    parser.add_argument('--runs', type=int, default=5, help="Fresh interpreters per scenario (default 5)")
+    parser.add_argument('--scenario', action='append', choices=list(SCENARIOS), help="Only run these scenarios")
+    parser.add_argument('--budget-ms', type=float, help="Exit non-zero if a lightweight scenario is slower than this")
+    parser.add_argument('--json', action='store_true', help="Print machine-readable results")
+    args = parser.parse_args()
+
+    names = args.scenario or list(SCENARIOS)
+    results: Dict[str, dict] = {name: run_scenario(SCENARIOS[name], max(1, args.runs) + 1) for name in names}
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    else:
+        print("⏱️ IMPORT-TIME BENCHMARK")
+        print("=" * 70)
+        for name, result in results.items():
+            if 'median_ms' not in result:
+                print(f"❌ {name}: {result['error']}")
+                continue
+            heavy = ', '.join(result['heavy']) or 'none'
+            print(f"{name:32s} {result['median_ms']:8.1f} ms  {result['modules']:4d} modules  heavy: {heavy}")
+            if result['error']:
+                print(f"   ⚠️ {result['error']}")
+            for row in result['slowest_imports'][:3]:
+                print(f"   {row['module']:28s} {row['cumulative_ms']:8.1f} ms")
+
+    # Scenarios that don't need the model must stay free of heavy dependencies (and within budget)
+    failed = False
+    for name, result in results.items():
+        if 'asr_engine' in name or 'median_ms' not in result:
+            continue
+        if result['heavy']:
+            print(f"❌ {name} loaded heavy dependencies: {', '.join(result['heavy'])}")
+            failed = True
+        if args.budget_ms and result['median_ms'] > args.budget_ms:
+            print(f"❌ {name} took {result['median_ms']:.0f} ms (budget {args.budget_ms:.0f} ms)")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Non-blocking logging for the transcribers
+Callers only put records on a queue; a background listener formats them and writes the log file and console,
+so disk and terminal I/O never run on the capture or ASR threads
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional
+
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+# Pipeline stages (plus the capture callbacks) that log through their own stage logger and can be gated separately
+STAGES = ('capture', 'segmentation', 'features', 'asr', 'classification', 'persistence')
+STAGE_LOGGER = 'stage'
+
+# Attributes every LogRecord has; anything else on a record came in through ``extra=`` and is an event field
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime'}
+
+_listener: Optional[QueueListener] = None
+
+
+def stage_logger(stage: str) -> logging.Logger:
+    """Logger for one stage, e.g. ``stage_logger('asr')``; its level comes from LOG_STAGE_LEVELS"""
+    if stage not in STAGES:
+        raise ValueError(f"Unknown log stage '{stage}' (expected one of: {', '.join(STAGES)})")
+    return logging.getLogger(f'{STAGE_LOGGER}.{stage}')
+
+
+def parse_stage_levels(spec: Optional[str]) -> Dict[str, int]:
+    """Parse LOG_STAGE_LEVELS, e.g. "capture=WARNING,classification=DEBUG" """
+    levels = {}
+    for entry in filter(None, (part.strip() for part in (spec or '').split(','))):
+        stage, _, name = entry.partition('=')
+        level = logging.getLevelName(name.strip().upper())
+        if stage.strip() not in STAGES or not isinstance(level, int):
+            raise ValueError(f"Invalid LOG_STAGE_LEVELS entry '{entry}' (expected <stage>=<level>, "
+                             f"stages: {', '.join(STAGES)})")
+        levels[stage.strip()] = level
+    return levels
+
+
+def production_mode() -> bool:
+    return os.getenv('LOG_PRODUCTION', 'false').lower() == 'true'
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, stage (or logger), message and any ``extra=`` event fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        event = {'time': self.formatTime(record), 'level': record.levelname}
+        if record.name.startswith(STAGE_LOGGER + '.'):
+            event['stage'] = record.name[len(STAGE_LOGGER) + 1:]
+        else:
+            event['logger'] = record.name
+        event['message'] = record.getMessage()
+        event.update((key, value) for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES)
+        if record.exc_info:
+            event['exception'] = self.formatException(record.exc_info)
+        return json.dumps(event, default=str, ensure_ascii=False)
+
+
+class DeferredQueueHandler(QueueHandler):
+    """Enqueue the record untouched: message formatting happens on the listener thread, not the caller's.
+
+    The stock handler formats in the calling thread so records can be pickled
+    across processes; this queue never leaves the process, and the arguments
+    logged on the hot paths are strings and numbers that are not mutated later.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def apply_levels() -> None:
+    """(Re)apply LOG_LEVEL, LOG_STAGE_LEVELS and LOG_PRODUCTION, e.g. after load_dotenv()"""
+    logging.getLogger().setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+    stage_levels = parse_stage_levels(os.getenv('LOG_STAGE_LEVELS'))
+    for stage in STAGES:
+        stage_logger(stage).setLevel(stage_levels.get(stage, logging.NOTSET))
+    # Production: debug events (per-pattern classifier detail, per-frame VAD) are never even created
+    logging.disable(logging.DEBUG if production_mode() else logging.NOTSET)
+
+
+def configure_logging(log_file: Optional[str] = None) -> QueueListener:
+    """Route all logging through one queue to a background writer (console, plus ``log_file`` if given).
+
+    Safe to call more than once: handlers are installed on the first call,
+    later calls only re-apply the level settings.
+    """
+    global _listener
+    if _listener is None:
+        formatter = JsonFormatter() if os.getenv('LOG_FORMAT', 'text').lower() == 'json' else logging.Formatter(TEXT_FORMAT)
+        handlers = [logging.StreamHandler()]
+        if log_file:
+            handlers.insert(0, logging.FileHandler(log_file))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        records = queue.SimpleQueue()  # Unbounded: logging never blocks the caller
+        root = logging.getLogger()
+        for handler in root.handlers[:]:
+            root.removeHandler(handler)
+        root.addHandler(DeferredQueueHandler(records))
+
+        _listener = QueueListener(records, *handlers, respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)  # Drains whatever is still queued on exit
+    apply_levels()
+    return _listener
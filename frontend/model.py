@@ -1,54 +1,63 @@
-import whisper
-import pyaudio
 import wave
 import threading
 import time
 import os
-import re
 import numpy as np
 import signal
 import sys
-# import webrtcvad  # Temporarily disabled due to Python 3.13 compatibility
 from datetime import datetime, timedelta
-from supabase import create_client, Client
-import tempfile
 import logging
-from typing import Optional, List
-from collections import deque
-import struct
+from typing import Optional, List, Union
+from audio_buffer import pcm16_to_float32
+from vad import create_vad
+from segmenter import SpeechSegment, SpeechSegmenter
+from pipeline import Pipeline
+from streaming import StreamingTranscripts
+from transcription_rows import insert_transcription
+from capture import CaptureDevice, list_input_devices, parse_device_config
+from asr_client import load_asr
+from decoding import resolve_profile
+from runtime import load_runtime_profile, pin_current_thread
+from features import MAX_MEL_SECONDS, SegmentFeatures
+from announcement_index import load_announcement_index
+from transcription_cache import cache_namespace, create_transcription_cache
+from cascade import CascadeSettings, CascadeStats, load_triage_asr, should_escalate
+from announcement_classifier import AnnouncementScore, default_classifier
+from announcement_model import load_announcement_model, resolve_backend
+from log_config import apply_levels, configure_logging, stage_logger
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('audio_transcription.log'),
-        logging.StreamHandler()
-    ]
-)
+# Configure logging: records are queued and written by a background thread, off the capture and ASR threads
+configure_logging(os.getenv('LOG_FILE', 'audio_transcription.log'))
 logger = logging.getLogger(__name__)
+# Per-stage loggers (levels via LOG_STAGE_LEVELS); hot-path messages use %-args so they're only formatted if emitted
+capture_log = stage_logger('capture')
+features_log = stage_logger('features')
+asr_log = stage_logger('asr')
+classification_log = stage_logger('classification')
+persistence_log = stage_logger('persistence')
 
 class LiveAudioTranscriber:
     def __init__(self):
         # Load environment variables
         from dotenv import load_dotenv
         load_dotenv()
+        apply_levels()  # LOG_LEVEL / LOG_STAGE_LEVELS / LOG_PRODUCTION may come from .env
         
         # Supabase configuration - FIXED CONNECTION
         self.supabase_url = os.getenv('SUPABASE_URL', 'your_supabase_url_here')
         self.supabase_key = os.getenv('SUPABASE_ANON_KEY', 'your_supabase_anon_key_here')
         
-        # Create Supabase client with standard settings
-        try:
-            self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
-            logger.info("Supabase client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Supabase client: {e}")
-            raise
+        # Supabase client, Whisper and PyAudio are created on first use (see the properties below),
+        # so the classification helpers can be used without them
+        self._supabase = None
+        self.model_name = "base"  # Whisper model (also names the transcript cache's namespace)
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self._audio = None
+        self._pyaudio = None
         
-        # Audio configuration - IMPROVED SETTINGS
+        # Audio configuration - IMPROVED SETTINGS (sample format: see the format property)
         self.chunk = 2048  # Increased chunk size for better audio capture
-        self.format = pyaudio.paInt16  # 16 bits per sample
         self.channels = 1  # Mono audio
         self.rate = 16000  # Sample rate (16kHz is good for Whisper)
         
@@ -57,223 +66,201 @@ class LiveAudioTranscriber:
         self.silence_threshold = 2.0  # Reduced to 2 seconds for better responsiveness
         self.min_speech_duration = 1.0  # Reduced to 1 second minimum
         self.max_recording_duration = 45.0  # Increased to 45 seconds for longer announcements
-        self.volume_threshold = 300  # Reduced threshold for more sensitive detection
+        self.volume_threshold = 300  # Only used by the 'energy' VAD backend
+        self.vad_backend = os.getenv('VAD_BACKEND', 'adaptive')  # adaptive | energy | webrtc (needs webrtcvad)
+        self.vad = create_vad(self.vad_backend, rate=self.rate, volume_threshold=self.volume_threshold)
         
         # Configuration options
         self.test_mode = True  # SET TO FALSE FOR PRODUCTION - accepts all transcriptions for development
         self.cleanup_after_minutes = 10  # Clear transcription_text after this many minutes
+        self.archive_dir = os.getenv('AUDIO_ARCHIVE_DIR')  # Opt-in debug archive of recorded segments as WAV
+        
+        # Streaming mode: decode overlapping windows while someone is still speaking
+        self.streaming_mode = os.getenv('STREAMING_MODE', 'false').lower() == 'true'
+        self.partial_interval = 5.0  # Seconds of new audio between partial decodes
+        self.partial_overlap = 1.5  # Seconds each window overlaps the previous one
+        self.streaming_transcripts = StreamingTranscripts()
+        self.alerted_segments = set()  # Segments that already fired an early alert from a partial
+        
+        # Whisper decoding profile (fast | balanced | accurate); devices may override it
+        self.decoding_profile = resolve_profile(os.getenv('DECODING_PROFILE'))
+        
+        # Capture devices: AUDIO_DEVICES="<index>:<device_id>[:<profile>],..." (default input when unset)
+        # Every device gets its own VAD/segmenter; all of them share one Whisper model and pipeline
+        self.devices = [
+            CaptureDevice(device_id, input_index, self.create_segmenter(),
+                          resolve_profile(profile or self.decoding_profile))
+            for input_index, device_id, profile in parse_device_config(os.getenv('AUDIO_DEVICES'))
+        ]
         
-        # Audio buffer for VAD
-        self.audio_buffer = deque()
-        self.is_speaking = False
-        self.silence_start = None
-        self.speech_start = None
-        
-        # Initialize Whisper model
-        logger.info("Loading Whisper model...")
-        self.model = whisper.load_model("base")
-        logger.info("Whisper model loaded successfully")
-        
-        # Audio interface
-        self.audio = pyaudio.PyAudio()
+        # CPU runtime profile (python runtime.py autotune): ASR workers on their own cores, capture on the rest
+        self.runtime = load_runtime_profile()
+        
+        # Pipeline: capture -> segmentation -> asr -> classification -> persistence
+        # Worker counts can be raised for the bottleneck stage on multi-core hardware
+        self.stage_workers = {
+            'segmentation': 1,  # Stateful VAD - must stay single-threaded
+            'features': 1,
+            'asr': int(os.getenv('ASR_WORKERS', str(self.runtime.asr_workers))),
+            'classification': 1,
+            'persistence': int(os.getenv('PERSISTENCE_WORKERS', '2'))
+        }
+        self.stage_queue_sizes = {
+            'segmentation': int(self.rate / self.chunk * 30),  # ~30s of captured audio
+            'features': 20,
+            'asr': 20,
+            'classification': 50,
+            'persistence': 50
+        }
+        # ASR batching: decode up to ASR_BATCH_SIZE already-queued segments in one Whisper pass. By default a
+        # lone segment is decoded at once; ASR_BATCH_WAIT > 0 holds it that many seconds for the batch to fill
+        self.asr_batch_size = int(os.getenv('ASR_BATCH_SIZE', '4'))
+        self.asr_batch_wait = float(os.getenv('ASR_BATCH_WAIT', '0'))
+        self.stats_interval = 60  # Seconds between pipeline stats log lines
+        self.pipeline = None
+        
+        # ASR cascade (ASR_CASCADE=true): a small model decodes every segment first and only likely
+        # announcements or low-confidence decodes are re-decoded with the main model
+        self.cascade_enabled = os.getenv('ASR_CASCADE', 'false').lower() == 'true'
+        self.cascade_settings = CascadeSettings()
+        self.cascade_stats = CascadeStats() if self.cascade_enabled else None
+        self._triage_engine = None
+        
+        # Known looped announcements (ANNOUNCEMENT_INDEX): recognized acoustically, never sent to Whisper
+        self.announcement_index = load_announcement_index()
+        self.reference_matches = 0
+        
+        # Segments transcribed before - exact repeats and acoustic replays of recent segments - skip Whisper
+        # (TRANSCRIPT_CACHE_SIZE=0 disables; TRANSCRIPT_CACHE_DIR shares it with the offline transcriber)
+        self.transcript_cache = create_transcription_cache()
         
         # Control flags
         self.is_running = False
         self.cleanup_thread = None
         
-        # Announcement keywords/patterns
-        self.announcement_patterns = [
-            r'\b(attention|announcement|notice|important|alert|urgent)\b',
-            r'\b(please note|kindly note|for your information|fyi)\b',
-            r'\b(all passengers|all students|all staff|all users|everyone)\b',
-            r'\b(boarding|departure|arrival|gate|platform|floor|room)\b',
-            r'\b(reminder|warning|caution|safety|emergency)\b',
-            r'\b(now boarding|final call|last call|delayed|cancelled)\b',
-            r'\b(meeting|event|session|break|lunch|closing)\b'
-        ]
+        # Announcement rules from the versioned rule file (ANNOUNCEMENT_RULES), compiled once and
+        # swapped in while running when the file changes - no restart, no Whisper reload
+        self.announcement_classifier = default_classifier()
+        # ANNOUNCEMENT_BACKEND=model swaps in the hashed n-gram model (announcement_model.py report compares them)
+        self.announcement_backend = resolve_backend(os.getenv('ANNOUNCEMENT_BACKEND'))
+        self._announcement_model = None
+        
+    @property
+    def supabase(self):
+        """Supabase client, created on first use"""
+        if self._supabase is None:
+            from supabase import create_client
+            try:
+                self._supabase = create_client(self.supabase_url, self.supabase_key)
+                logger.info("Supabase client initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize Supabase client: {e}")
+                raise
+        return self._supabase
+    
+    @property
+    def engine(self):
+        """Whisper model: the warm inference server if one is running (asr_server.py), else in-process"""
+        if self._engine is None:
+            with self._engine_lock:  # Pipeline workers may ask for it at the same time
+                if self._engine is None:
+                    self._engine = load_asr(self.model_name)
+        return self._engine
+    
+    @property
+    def triage_engine(self):
+        """Small Whisper model for the cascade's first pass (WHISPER_TRIAGE_MODEL, default tiny)"""
+        if self._triage_engine is None:
+            with self._engine_lock:
+                if self._triage_engine is None:
+                    self._triage_engine = load_triage_asr(self.cascade_settings)
+        return self._triage_engine
+    
+    @property
+    def pyaudio(self):
+        """The pyaudio module, imported on first use"""
+        if self._pyaudio is None:
+            import pyaudio
+            self._pyaudio = pyaudio
+        return self._pyaudio
+    
+    @property
+    def audio(self):
+        """PyAudio interface, opened on first use"""
+        if self._audio is None:
+            self._audio = self.pyaudio.PyAudio()
+        return self._audio
+    
+    @property
+    def format(self) -> int:
+        """Sample format of every stream: 16 bits per sample"""
+        return self.pyaudio.paInt16
+    
+    @property
+    def announcement_model(self):
+        """Linear announcement model, loaded (or trained on the labeled datasets) on first use"""
+        if self._announcement_model is None:
+            self._announcement_model = load_announcement_model()
+        return self._announcement_model
+    
+    def current_detector(self):
+        """Detector for the next decision: a snapshot of the rule file, or the linear model"""
+        if self.announcement_backend == 'model':
+            return self.announcement_model
+        return self.announcement_classifier.current
+    
+    def analyze_transcription(self, text: str, detector=None) -> AnnouncementScore:
+        """One pass over a transcript: decision, type, severity, matched features and confidence"""
+        detector = detector or self.current_detector()
+        # Production decides with the fast path and scores only announcements; test mode saves everything, so scores all
+        result = detector.score(text) if self.test_mode else detector.analyze(text)
         
-    def is_announcement(self, text: str) -> bool:
+        # TEST MODE - Accept all non-empty transcriptions for testing
+        if self.test_mode and not result.is_announcement and text.strip():
+            classification_log.debug("TEST MODE: Accepting all transcriptions - %r", text[:80])
+            result = result._replace(is_announcement=True, reason='test mode')
+        return result
+    
+    def is_announcement(self, text: str, detector=None) -> bool:
         """Final optimized announcement detection with highest accuracy"""
         
         # TEST MODE - Accept all non-empty transcriptions for testing
         if hasattr(self, 'test_mode') and self.test_mode:
             if text and len(text.strip()) > 0:
-                logger.info(f"TEST MODE: Accepting all transcriptions - '{text}'")
+                classification_log.debug("TEST MODE: Accepting all transcriptions - %r", text[:80])
                 return True
         
-        text_lower = text.lower()
-        
-        # Immediate conversation indicators (very strong signals)
-        immediate_conversation = [
-            r'\b(i think|i feel|i believe|maybe|perhaps)\b',
-            r'\b(can you|could you|would you|will you|do you)\b',
-            r'\b(i like|i love|i hate|i prefer|i want|i need)\b',
-            r'\b(let\'s|we should|should we|why don\'t we)\b',
-            r'\b(i heard|someone said|i wonder)\b',
-            r'\b(my |our |your )(flight|train|meeting|appointment)\b',
-            r'\b(really (nice|good|bad|great|loud))\b',
-            r'\bisn\'t it\b',
-            r'\bright\?\b',
-            r'\bwhat do you think\b',
-            r'\bif you need me\b',
-            r'\bwent (well|badly|great)\b'
-        ]
-        
-        # Check for immediate conversation indicators first
-        for pattern in immediate_conversation:
-            if re.search(pattern, text_lower):
-                logger.info(f"Immediate conversation detected: {pattern}")
-                return False
-        
-        # Strong announcement indicators (override most other logic)
-        strong_announcement = [
-            r'\b(attention|ladies and gentlemen|code (red|blue|green))\b',
-            r'\b(all (passengers|students|staff|visitors|everyone))\b',
-            r'\b(please note|for your information)\b',
-            r'\b(final call|now boarding|last call)\b',
-            r'\b(emergency|evacuation|drill)\b'
-        ]
-        
-        strong_announcement_score = 0
-        for pattern in strong_announcement:
-            if re.search(pattern, text_lower):
-                strong_announcement_score += 1
-                logger.info(f"Strong announcement indicator: {pattern}")
-        
-        if strong_announcement_score > 0:
-            logger.info("Strong announcement detected")
-            return True
-        
-        # Check for regular announcement patterns
-        announcement_score = 0
-        matched_patterns = []
-        for pattern in self.announcement_patterns:
-            if re.search(pattern, text_lower):
-                announcement_score += 1
-                matched_patterns.append(pattern)
-        
-        # Length requirements for announcements - RELAXED FOR TESTING
-        words = text.split()
-        word_count = len(words)
-        
-        if word_count < 3:  # Reduced from 6 to 3 words for testing
-            logger.info(f"Too short for announcement: {word_count} words")
-            return False
-        
-        # Formal/public language indicators
-        formal_indicators = [
-            'please', 'kindly', 'we would like to', 'we are pleased to',
-            'due to', 'as a result of', 'effective immediately',
-            'will be', 'has been', 'have been', 'is now', 'are now'
-        ]
-        formal_count = sum(1 for indicator in formal_indicators if indicator in text_lower)
-        
-        # Public service language
-        public_service = [
-            'passengers', 'students', 'staff', 'visitors', 'customers',
-            'will be closed', 'will be open', 'is currently', 'are currently',
-            'please complete', 'please proceed', 'please stand',
-            'must sign in', 'must have', 'required to'
-        ]
-        public_count = sum(1 for indicator in public_service if indicator in text_lower)
-        
-        # Time/location indicators for announcements
-        time_indicators = ['minutes', 'hours', 'pm', 'am', 'today', 'tomorrow', 'now', 'currently']
-        time_count = sum(1 for indicator in time_indicators if indicator in text_lower)
-        
-        location_indicators = ['gate', 'platform', 'room', 'floor', 'hall', 'building', 'area']
-        location_count = sum(1 for indicator in location_indicators if indicator in text_lower)
-        
-        # Sentence structure analysis
-        structure_score = 0
-        
-        # Announcements often start formally
-        first_words = text_lower.split()[:2]
-        if first_words:
-            if first_words[0] in ['attention', 'please', 'all', 'the', 'passengers', 'students']:
-                structure_score += 2
-            elif first_words[0] in ['due', 'we', 'this']:
-                structure_score += 1
-        
-        # Passive voice and formal constructions
-        if any(phrase in text_lower for phrase in ['will be', 'has been', 'have been', 'is being', 'are being']):
-            structure_score += 1
-        
-        # Calculate comprehensive score
-        total_score = (
-            announcement_score * 2 +
-            formal_count * 1.5 +
-            public_count * 2 +
-            time_count * 0.8 +
-            location_count * 1.0 +
-            structure_score
-        )
-        
-        # Decision thresholds - RELAXED FOR TESTING
-        logger.info(f"Announcement analysis: patterns={len(matched_patterns)}, total_score={total_score}, formal={formal_count}, public={public_count}")
-        
-        # More lenient criteria for testing
-        if announcement_score >= 1 and total_score >= 2:  # Reduced from 4 to 2
-            logger.info(f"Announcement detected: pattern match + score {total_score}")
-            return True
-        elif formal_count >= 1 and public_count >= 1:  # Reduced formal requirement
-            logger.info(f"Announcement detected: formal language + public service")
-            return True
-        elif total_score >= 3:  # Reduced from 6 to 3
-            logger.info(f"Announcement detected: high total score {total_score}")
-            return True
-        elif len(matched_patterns) >= 1:  # If any announcement pattern matches
-            logger.info(f"Announcement detected: pattern match {matched_patterns}")
-            return True
-        else:
-            logger.info(f"Conversation detected: score {total_score}, patterns {len(matched_patterns)}")
-            return False
+        return self.matches_announcement_rules(text, detector or self.current_detector())
+    
+    def matches_announcement_rules(self, text: str, detector=None) -> bool:
+        """The announcement rules themselves, regardless of test mode (also used for cascade triage)"""
+        detector = detector or self.announcement_classifier.current
+        if classification_log.isEnabledFor(logging.DEBUG):  # Never true with LOG_PRODUCTION=true
+            result = detector.score(text)
+            classification_log.debug("Announcement analysis (%s): %s, score %s, features %s",
+                                     result.rule_version, result.reason, result.total_score, dict(result.features))
+            return result.is_announcement
+        return detector(text)
     
-    # def convert_to_vad_format(self, audio_data: bytes) -> bytes:
-    #     """Convert audio data to format suitable for VAD (16-bit PCM, specific sample rates)"""
-    #     # WebRTC VAD requires specific sample rates: 8000, 16000, 32000, or 48000 Hz
-    #     # Our rate is 16000 Hz which is supported
-    #     
-    #     # Convert bytes to numpy array
-    #     audio_np = np.frombuffer(audio_data, dtype=np.int16)
-    #     
-    #     # Ensure the audio is in the right format
-    #     frame_length = int(self.rate * self.frame_duration / 1000)  # Frame length in samples
-    #     
-    #     # Pad or trim to exact frame length if necessary
-    #     if len(audio_np) != frame_length:
-    #         if len(audio_np) < frame_length:
-    #             audio_np = np.pad(audio_np, (0, frame_length - len(audio_np)))
-    #         else:
-    #             audio_np = audio_np[:frame_length]
-    #     
-    #     return audio_np.tobytes()
-    
-    def is_speech(self, audio_data: bytes) -> bool:
-        """Improved volume-based voice activity detection"""
+    def is_speech(self, audio_data) -> bool:
+        """Voice activity detection for a single frame (bytes or int16 array) using the configured VAD backend"""
         try:
-            # Convert bytes to numpy array
-            audio_np = np.frombuffer(audio_data, dtype=np.int16)
+            # Convert bytes to numpy array (arrays from the ring buffer are used as-is)
+            audio_np = np.frombuffer(audio_data, dtype=np.int16) if isinstance(audio_data, (bytes, bytearray)) else audio_data
             
             if len(audio_np) == 0:
                 return False
             
-            # Calculate RMS (Root Mean Square) for volume level
-            rms = np.sqrt(np.mean(audio_np.astype(np.float32) ** 2))
-            
-            # Also check for peak amplitude
-            peak = np.max(np.abs(audio_np))
-            
-            # Use both RMS and peak for better detection
-            has_speech = (rms > self.volume_threshold) or (peak > self.volume_threshold * 2)
+            # Single-row batch through the same vectorized VAD used by the capture loop
+            has_speech = bool(self.vad.speech_mask(audio_np)[0])
             
             # Log volume levels for debugging
             if has_speech:
-                logger.debug(f"Speech detected - RMS: {rms:.1f}, Peak: {peak:.1f}, Threshold: {self.volume_threshold}")
+                capture_log.debug("Speech detected (%s VAD)", self.vad_backend)
             
             return has_speech
         except Exception as e:
-            logger.warning(f"Volume-based VAD error, assuming speech: {e}")
+            logger.warning(f"VAD error, assuming speech: {e}")
             return True  # Default to assuming speech if VAD fails
         
     def setup_database_table(self):
@@ -287,28 +274,36 @@ class LiveAudioTranscriber:
             logger.error(f"Database setup error: {e}")
             return False
     
-    def save_announcement_to_supabase(self, text: str, timestamp: datetime, duration: float) -> bool:
+    def save_announcement_to_supabase(self, text: str, timestamp: datetime, duration: float, trigger_alert: bool = True,
+                                      device_id: str = 'live_audio_device', decoding_profile: Optional[str] = None,
+                                      decode_seconds: Optional[float] = None,
+                                      analysis: Optional[AnnouncementScore] = None) -> bool:
         """Save announcement transcription with timestamp to Supabase - IMPROVED WITH RETRY + HAPTIC ALERTS"""
         max_retries = 3
         retry_delay = 2
-        announcement_type = self.classify_announcement(text)
+        analysis = analysis or self.analyze_transcription(text)
         
         for attempt in range(max_retries):
             try:
                 data = {
                     'transcription_text': text,
                     'created_at': timestamp.isoformat(),
-                    'device_id': 'live_audio_device',
+                    'device_id': device_id,
                     'audio_duration': duration,
                     'is_announcement': True,
-                    'announcement_type': announcement_type
+                    'announcement_type': analysis.announcement_type,
+                    'rule_version': analysis.rule_version  # Optional columns: see transcription_rows
                 }
+                if decoding_profile:
+                    data['decoding_profile'] = decoding_profile
+                    data['decode_ms'] = round(decode_seconds * 1000) if decode_seconds is not None else None
                 
-                result = self.supabase.table('transcriptions').insert(data).execute()
-                logger.info(f"SUCCESS: Announcement saved to database (attempt {attempt + 1}): {text[:80]}...")
+                result = insert_transcription(self.supabase, data)
+                persistence_log.info("SUCCESS: Announcement saved to database (attempt %d): %s...", attempt + 1, text[:80])
                 
                 # 🔥 Trigger haptic alerts via backend API (only on successful save)
-                self.trigger_haptic_alert(text, announcement_type)
+                if trigger_alert:
+                    self.trigger_haptic_alert(text, analysis)
                 
                 return True
                 
@@ -324,21 +319,14 @@ class LiveAudioTranscriber:
         
         return False
     
-    def trigger_haptic_alert(self, text: str, announcement_type: str):
+    def trigger_haptic_alert(self, text: str, analysis: AnnouncementScore):
         """Send alert to backend API to trigger haptic alerts for subscribed users"""
         try:
             import requests
             
-            # Determine severity based on announcement type
-            if announcement_type == 'emergency':
-                severity = 'critical'
-                morse_code = 'SOS'
-            elif announcement_type == 'travel' or any(word in text.lower() for word in ['urgent', 'immediate', 'attention']):
-                severity = 'high'
-                morse_code = 'HELP'
-            else:
-                severity = 'medium'
-                morse_code = 'HELP'
+            # Severity comes from the analysis (rule file: critical/high types and urgent wording)
+            severity = analysis.severity
+            morse_code = 'SOS' if severity == 'critical' else 'HELP'
             
             # Backend API endpoint
             backend_url = os.getenv('BACKEND_URL', 'http://localhost:3000')
@@ -351,14 +339,14 @@ class LiveAudioTranscriber:
                 'morseCode': morse_code
             }
             
-            logger.info(f"🚨 Triggering {severity} alert: {morse_code}")
+            persistence_log.info("🚨 Triggering %s alert: %s", severity, morse_code)
             
             # Send to backend (with timeout to not block ML processing)
             response = requests.post(endpoint, json=payload, timeout=3)
             
             if response.status_code == 200:
                 result = response.json()
-                logger.info(f"✅ Alert triggered successfully: {result}")
+                persistence_log.info("✅ Alert triggered successfully: %s", result)
             else:
                 logger.warning(f"⚠️ Alert trigger failed: {response.status_code} - {response.text}")
                 
@@ -371,18 +359,7 @@ class LiveAudioTranscriber:
     
     def classify_announcement(self, text: str) -> str:
         """Classify the type of announcement"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['boarding', 'gate', 'departure', 'arrival', 'flight']):
-            return 'travel'
-        elif any(word in text_lower for word in ['meeting', 'session', 'conference', 'break']):
-            return 'meeting'
-        elif any(word in text_lower for word in ['emergency', 'evacuation', 'safety', 'alert']):
-            return 'emergency'
-        elif any(word in text_lower for word in ['reminder', 'notice', 'information']):
-            return 'general'
-        else:
-            return 'other'
+        return self.announcement_classifier.classify_type(text)
     
     def delete_old_transcriptions(self):
         """Clear transcription_text from records older than configured minutes (keep records but remove sensitive text)"""
@@ -414,147 +391,415 @@ class LiveAudioTranscriber:
                 logger.error(f"Cleanup worker error: {e}")
                 time.sleep(300)
     
-    def record_dynamic_audio_chunk(self) -> Optional[str]:
-        """Record audio dynamically until silence gap of 3+ seconds is detected"""
+    def archive_segment(self, segment: np.ndarray, device_id: str = 'live_audio_device') -> Optional[str]:
+        """Write an int16 speech segment to the debug archive (only when AUDIO_ARCHIVE_DIR is set)"""
+        if not self.archive_dir:
+            return None
+        
         try:
-            # Create temporary file for audio
-            temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.wav')
-            temp_filename = temp_file.name
-            temp_file.close()
+            os.makedirs(self.archive_dir, exist_ok=True)
+            filename = os.path.join(self.archive_dir, f"{device_id}_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.wav")
             
-            # Start recording
+            wf = wave.open(filename, 'wb')
+            wf.setnchannels(self.channels)
+            wf.setsampwidth(2)  # 16-bit PCM
+            wf.setframerate(self.rate)
+            wf.writeframes(segment.tobytes())
+            wf.close()
+            
+            logger.debug("Archived segment to %s", filename)
+            return filename
+        except Exception as e:
+            logger.warning(f"Failed to archive audio segment: {e}")
+            return None
+    
+    def create_segmenter(self) -> SpeechSegmenter:
+        """Build a VAD segmenter (with its own VAD state) for one capture device"""
+        return SpeechSegmenter(
+            create_vad(self.vad_backend, rate=self.rate, volume_threshold=self.volume_threshold),
+            rate=self.rate,
+            frame_duration=self.frame_duration,
+            silence_threshold=self.silence_threshold,
+            min_speech_duration=self.min_speech_duration,
+            max_recording_duration=self.max_recording_duration,
+            partial_interval=self.partial_interval if self.streaming_mode else None,
+            partial_overlap=self.partial_overlap
+        )
+    
+    def record_dynamic_audio_chunk(self) -> Optional[np.ndarray]:
+        """Record one segment from the first device with a blocking stream until a silence gap (debug helper)"""
+        device = self.devices[0]
+        try:
             stream = self.audio.open(
                 format=self.format,
                 channels=self.channels,
                 rate=self.rate,
                 input=True,
+                input_device_index=device.input_device_index,
                 frames_per_buffer=self.chunk
             )
             
             logger.info("Listening for speech...")
+            device.segmenter.reset()
+            segments = []
             
-            frames = []
-            speech_detected = False
-            silence_duration = 0.0
-            speech_duration = 0.0
-            recording_start = time.time()
-            
-            # Frame duration for VAD processing
-            frame_duration_samples = int(self.rate * self.frame_duration / 1000)
-            
-            while self.is_running:
-                # Read audio data
-                data = stream.read(self.chunk, exception_on_overflow=False)
-                
-                # Check recording duration limits
-                current_time = time.time()
-                total_duration = current_time - recording_start
-                
-                if total_duration > self.max_recording_duration:
-                    logger.info(f"Maximum recording duration ({self.max_recording_duration}s) reached")
-                    break
-                
-                # Accumulate audio for VAD processing
-                self.audio_buffer.extend(struct.unpack(f'{len(data)//2}h', data))
-                
-                # Process VAD when we have enough samples
-                if len(self.audio_buffer) >= frame_duration_samples:
-                    # Extract frame for VAD
-                    vad_frame_data = list(self.audio_buffer)[:frame_duration_samples]
-                    vad_frame_bytes = struct.pack(f'{len(vad_frame_data)}h', *vad_frame_data)
-                    
-                    # Remove processed samples from buffer
-                    for _ in range(frame_duration_samples):
-                        if self.audio_buffer:
-                            self.audio_buffer.popleft()
-                    
-                    # Check if this frame contains speech
-                    has_speech = self.is_speech(vad_frame_bytes)
-                    
-                    if has_speech:
-                        if not speech_detected:
-                            logger.info("Speech detected, starting recording...")
-                            speech_detected = True
-                            self.speech_start = current_time
-                        
-                        silence_duration = 0.0  # Reset silence counter
-                        speech_duration = current_time - (self.speech_start or current_time)
-                        
-                        # Add this frame to recording
-                        frames.append(data)
-                        
-                    else:
-                        # No speech in this frame
-                        if speech_detected:
-                            silence_duration += self.frame_duration / 1000.0  # Convert ms to seconds
-                            
-                            # Still add to recording during short silences (to capture pauses in speech)
-                            if silence_duration < self.silence_threshold:
-                                frames.append(data)
-                            else:
-                                # Long silence detected, end recording
-                                logger.info(f"Silence detected for {silence_duration:.1f}s, ending recording")
-                                break
-                        # If no speech detected yet, don't add to frames
-                else:
-                    # Not enough data for VAD yet, just continue accumulating
-                    if speech_detected:
-                        frames.append(data)
-            
-            stream.stop_stream()
-            stream.close()
-            
-            # Check if we have enough speech to process
-            if speech_duration < self.min_speech_duration:
-                logger.info(f"Speech too short ({speech_duration:.1f}s), skipping...")
-                os.unlink(temp_filename)
-                return None
+            try:
+                while self.is_running and not segments:
+                    data = stream.read(self.chunk, exception_on_overflow=False)
+                    segments = [segment for segment in device.segmenter.feed(data) if not segment.is_partial]
+            finally:
+                stream.stop_stream()
+                stream.close()
             
-            if not frames:
+            if not segments:
                 logger.info("No speech frames recorded")
-                os.unlink(temp_filename)
                 return None
             
-            # Save audio to file
-            wf = wave.open(temp_filename, 'wb')
-            wf.setnchannels(self.channels)
-            wf.setsampwidth(self.audio.get_sample_size(self.format))
-            wf.setframerate(self.rate)
-            wf.writeframes(b''.join(frames))
-            wf.close()
-            
-            logger.info(f"Recorded {speech_duration:.1f}s of speech")
-            return temp_filename
+            self.archive_segment(segments[0].audio, device.device_id)
+            return pcm16_to_float32(segments[0].audio)
             
         except Exception as e:
             logger.error(f"Error recording audio: {e}")
             return None
     
-    def transcribe_audio(self, audio_file: str) -> Optional[str]:
-        """Transcribe audio file using Whisper"""
+    def audio_callback(self, device: CaptureDevice, in_data, status):
+        """PyAudio callback: hand the chunk to the pipeline and return immediately"""
+        pyaudio = self._pyaudio  # Imported before any stream was opened
+        if status & pyaudio.paInputOverflow:
+            device.input_overflows += 1
+        self.pipeline.submit((device, in_data))  # Never blocks; drops are counted by the stage
+        return (None, pyaudio.paContinue)
+    
+    def start_capture_stream(self, device: CaptureDevice):
+        """Open the persistent callback-mode input stream for one device"""
+        device.stream = self.audio.open(
+            format=self.format,
+            channels=self.channels,
+            rate=self.rate,
+            input=True,
+            input_device_index=device.input_device_index,
+            frames_per_buffer=self.chunk,
+            stream_callback=lambda in_data, frame_count, time_info, status: self.audio_callback(device, in_data, status)
+        )
+        device.stream.start_stream()
+        capture_log.info("Listening for speech on %s...", device)
+    
+    def build_pipeline(self) -> Pipeline:
+        """Wire the live processing stages together with bounded queues"""
+        pipeline = Pipeline()
+        # Capture and ASR queues are served round-robin per device so one busy zone can't starve the rest
+        stages = [
+            ('segmentation', self.segment_audio, {'drop_when_full': True, 'flush': self.flush_segments,
+                                                  'fair_key': lambda item: item[0].device_id}),
+            ('features', self.extract_features, {}),
+            ('asr', self.transcribe_segments, {'fair_key': lambda item: item['device_id'],
+                                               'batch_size': self.asr_batch_size,
+                                               'batch_wait': self.asr_batch_wait}),
+            ('classification', self.classify_transcription, {}),
+            ('persistence', self.persist_announcement, {})
+        ]
+        for name, handler, options in stages:
+            pipeline.add_stage(
+                name, handler,
+                workers=self.stage_workers[name],
+                queue_size=self.stage_queue_sizes[name] * (len(self.devices) if name == 'segmentation' else 1),
+                worker_init=lambda stage=name: self.pin_stage_worker(stage),
+                **options
+            )
+        return pipeline
+    
+    def stage_cores(self, stage: str) -> List[int]:
+        """Segmentation with capture, Whisper (and its torch pool) on the ASR cores, the rest off the capture cores"""
+        if stage == 'segmentation':
+            return self.runtime.capture_cores
+        if stage == 'asr':
+            return self.runtime.asr_cores
+        return self.runtime.worker_cores
+    
+    def pin_stage_worker(self, stage: str):
+        cores = self.stage_cores(stage)
+        if pin_current_thread(cores):
+            logger.info(f"{threading.current_thread().name} ({stage}) pinned to cores {cores}")
+    
+    def segment_audio(self, item):
+        """Segmentation stage: run VAD on a captured chunk and emit finished segments and partial windows"""
+        device, data = item
+        return [self.prepare_segment(device, segment) for segment in device.segmenter.feed(data)]
+    
+    def flush_segments(self):
+        """Hand over whatever was still being recorded at shutdown"""
+        return [
+            self.prepare_segment(device, segment)
+            for device in self.devices
+            for segment in device.segmenter.flush()
+        ]
+    
+    def prepare_segment(self, device: CaptureDevice, segment: SpeechSegment) -> dict:
+        """Package a segment as an in-memory float32 waveform for ASR"""
+        if not segment.is_partial:
+            self.archive_segment(segment.audio, device.device_id)
+        return {
+            'device_id': device.device_id,
+            'key': (device.device_id, segment.segment_id),  # Segment ids are only unique per device
+            'segment': segment,
+            'audio': pcm16_to_float32(segment.audio),
+            'profile': device.decoding_profile,
+            'duration': len(segment.audio) / self.rate,
+            'timestamp': datetime.now()
+        }
+    
+    def extract_features(self, item: dict):
+        """Feature stage: one STFT/log-mel per segment, shared by everything downstream (Whisper gets the mel)"""
+        segment = item['segment']
+        # Segments over 30s go through full transcription (its own front end) unless only their tail is decoded
+        if item['duration'] <= MAX_MEL_SECONDS or segment.windows or self.announcement_index is not None \
+                or self.transcript_cache is not None:
+            item['features'] = SegmentFeatures(item['audio'], self.engine.n_mels)
+        
+        if self.announcement_index is not None and not segment.is_partial:
+            match = self.announcement_index.match(item['features'])
+            if match is not None:
+                features_log.info("📼 Known announcement '%s' (score %.2f, %.1fms) - skipping Whisper",
+                                  match.name, match.score, match.match_ms, extra={'device_id': item['device_id']})
+                item['match'] = match
+        
+        if self.transcript_cache is not None and not segment.is_partial and 'match' not in item:
+            cached = self.transcript_cache.lookup(cache_namespace(self.model_name, item['profile']), item['audio'],
+                                                  item['features'])
+            if cached is not None:
+                features_log.info("♻️ Cached transcript - skipping Whisper: %s", cached,
+                                  extra={'device_id': item['device_id']})
+                item['cached'] = cached
+        return [item]
+    
+    def transcribe_segments(self, items: List[dict]):
+        """ASR stage: transcribe a batch of partial windows and finished segments in one Whisper pass"""
+        # Windows decoded in this same batch count as available to their segment's final
+        pending = {}
+        for item in items:
+            if item['segment'].is_partial:
+                pending.setdefault(item['key'], set()).add(item['segment'].window_index)
+        
+        inputs = [self.asr_input(item, pending.get(item['key'], ())) for item in items]
+        audios = [audio for audio, _ in inputs]
+        if len(items) > 1:
+            asr_log.info("🗣️ Transcribing batch of %d segments (%.1fs audio)...", len(items), sum(map(len, audios)) / self.rate)
+        
+        # One decode per profile present in the batch (devices can use different profiles)
+        texts = [None] * len(items)
+        for i, item in enumerate(items):
+            if 'match' in item or 'cached' in item:
+                texts[i] = item['match'].transcript if 'match' in item else item['cached'] or None
+                item['decode_seconds'] = 0.0
+        
+        decode = [i for i, item in enumerate(items) if 'match' not in item and 'cached' not in item]
+        for profile in sorted({items[i]['profile'] for i in decode}):
+            indexes = [i for i in decode if items[i]['profile'] == profile]
+            
+            if self.cascade_enabled:
+                indexes = self.triage_segments(items, indexes, inputs, texts)
+                if not indexes:
+                    continue
+            
+            started = time.perf_counter()
+            batch_texts = self.transcribe_batch([audios[i] for i in indexes], profile, [inputs[i][1] for i in indexes])
+            for i, text in zip(indexes, batch_texts):
+                texts[i] = text
+            elapsed = time.perf_counter() - started
+            asr_log.info("⏱️ '%s' profile decoded %d segment(s) in %.2fs", profile, len(indexes), elapsed,
+                         extra={'profile': profile, 'segments': len(indexes), 'decode_seconds': elapsed})
+            if self.cascade_stats is not None:
+                self.cascade_stats.record_main(elapsed)
+            for i in indexes:
+                # Batch time shared across its segments (on top of any triage pass)
+                items[i]['decode_seconds'] = items[i].get('decode_seconds', 0.0) + elapsed / len(indexes)
+        
+        outputs = []
+        for item, text in zip(items, texts):
+            if self.asr_output(item, text):
+                outputs.append(item)
+        return outputs
+    
+    def triage_segments(self, items: List[dict], indexes: List[int], inputs: list, texts: list) -> List[int]:
+        """Cascade first pass: decode with the triage model, keep its text where the main model isn't needed.
+        
+        Returns the indexes that still need the main model.
+        """
+        started = time.perf_counter()
+        try:
+            results = self.triage_engine.triage_batch([inputs[i][0] for i in indexes], [inputs[i][1] for i in indexes])
+        except Exception as e:
+            logger.error(f"Triage pass failed ({e}) - decoding with the main model")
+            return indexes
+        elapsed = time.perf_counter() - started
+        
+        escalated = []
+        for i, (text, avg_logprob) in zip(indexes, results):
+            items[i]['decode_seconds'] = elapsed / len(indexes)
+            threshold = self.cascade_settings.logprob_threshold
+            if should_escalate(text, avg_logprob, self.matches_announcement_rules, threshold):
+                escalated.append(i)
+            else:
+                texts[i] = text or None
+                items[i]['triage_only'] = True  # Not the main model's transcript: kept out of the cache
+        self.cascade_stats.record_triage(len(indexes), len(escalated), elapsed)
+        asr_log.info("🔎 %s triage: %d/%d segment(s) escalated (%.2fs)", self.cascade_settings.model_name,
+                     len(escalated), len(indexes), elapsed)
+        return escalated
+    
+    def asr_input(self, item: dict, pending_windows=()):
+        """Pick what to decode: the window itself, only the tail of a streamed segment, or all of it.
+        
+        Returns (audio, mel); mel is the precomputed Whisper window, or None if the audio exceeds 30s.
+        """
+        segment = item['segment']
+        features = item.get('features')
+        item['tail_only'] = False
+        start = 0
+        
+        if not segment.is_partial and 'match' not in item and 'cached' not in item:
+            asr_log.info("🗣️ Starting transcription of %.1fs segment...", item['duration'])
+            if segment.windows and self.streaming_transcripts.has_windows(item['key'], segment.windows, pending_windows):
+                # Earlier windows are already decoded - only the tail is left
+                item['tail_only'] = True
+                start = segment.tail_start
+        
+        audio = item['audio'][start:]
+        mel = features.whisper_mel(start) if features is not None and len(audio) <= MAX_MEL_SECONDS * self.rate else None
+        return audio, mel
+    
+    def asr_output(self, item: dict, text: Optional[str]) -> bool:
+        """Attach the transcript to the item; returns False if there is nothing to pass on"""
+        segment = item['segment']
+        features = item.pop('features', None)  # Spectrogram no longer needed downstream
+        
+        if segment.is_partial:
+            if not self.streaming_transcripts.add_window(item['key'], segment.window_index, text):
+                return False  # Its segment was finalised first - too late to matter
+            item['transcription'] = self.streaming_transcripts.text(item['key'])
+            asr_log.info("⏩ Partial transcript (window %d): %s", segment.window_index, item['transcription'])
+            return bool(item['transcription'])
+        
+        if item.pop('tail_only'):
+            self.streaming_transcripts.add_window(item['key'], segment.windows, text)
+            transcription = self.streaming_transcripts.finish(item['key'])
+        else:
+            self.streaming_transcripts.discard(item['key'])
+            transcription = text
+        
+        # Empty results aren't cached: a failed decode looks the same as silence here
+        if transcription and self.transcript_cache is not None \
+                and not any(key in item for key in ('match', 'cached', 'triage_only')):
+            self.transcript_cache.store(cache_namespace(self.model_name, item['profile']), item['audio'],
+                                        transcription, features)
+        
+        if not transcription:
+            asr_log.info("❌ No transcription returned, continuing...")
+            self.alerted_segments.discard(item['key'])
+            return False
+        
+        item['transcription'] = transcription
+        return True
+    
+    def classify_transcription(self, item: dict):
+        """Classification stage: pass announcements (and early emergency partials) on, drop conversation"""
+        transcription = item['transcription']
+        segment = item['segment']
+        
+        if segment.is_partial:
+            # Only emergencies are worth alerting on before the speaker finishes, and only once
+            if item['key'] in self.alerted_segments:
+                return None
+            # Decided on the wording itself (evacuate, fire, ...), not the decision or first-match type
+            detector = self.current_detector()
+            if not detector.is_critical(transcription):
+                return None
+            item['analysis'] = detector.score(transcription)
+            self.alerted_segments.add(item['key'])
+            classification_log.info("🚨 Emergency detected in partial transcript - alerting early")
+            return [item]
+        
+        if 'match' in item:
+            self.reference_matches += 1
+            # Reference clips are announcements by definition
+            item['analysis'] = self.current_detector().reference(transcription, item['match'].announcement_type)
+            return [item]
+        
+        classification_log.info("🔍 Checking if this is an announcement...")
+        # Persistence, alerting and reporting all use this one result
+        analysis = item['analysis'] = self.analyze_transcription(transcription)
+        if analysis.is_announcement:
+            classification_log.info("🎯 ANNOUNCEMENT DETECTED (%s, %s, confidence %.2f)! Saving to database...",
+                                    analysis.announcement_type, analysis.severity, analysis.confidence)
+            return [item]
+        
+        classification_log.info("❌ Not an announcement - ignoring: %s...", transcription[:50])
+        self.alerted_segments.discard(item['key'])
+        return None
+    
+    def persist_announcement(self, item: dict):
+        """Persistence/alerting stage: save to Supabase (with retries) and trigger haptic alerts"""
+        transcription = item['transcription']
+        segment = item['segment']
+        
+        if segment.is_partial:
+            self.trigger_haptic_alert(transcription, item['analysis'])
+            return None
+        
+        # Don't alert twice for a segment that already fired from a partial
+        already_alerted = item['key'] in self.alerted_segments
+        self.alerted_segments.discard(item['key'])
+        success = self.save_announcement_to_supabase(
+            transcription, item['timestamp'], item['duration'],
+            trigger_alert=not already_alerted, device_id=item['device_id'],
+            decoding_profile=item['profile'], decode_seconds=item.get('decode_seconds'), analysis=item['analysis']
+        )
+        
+        if success:
+            analysis = item['analysis']
+            persistence_log.info("✅ ANNOUNCEMENT DETECTED AND SAVED [%s]: %s", item['device_id'], transcription,
+                                 extra={'device_id': item['device_id'], 'announcement_type': analysis.announcement_type,
+                                        'severity': analysis.severity, 'rule_version': analysis.rule_version})
+            print(f"\n🔊 ANNOUNCEMENT [{item['device_id']}] ({analysis.announcement_type}, {analysis.severity}): {transcription}\n")
+        else:
+            logger.warning("Failed to save announcement to database")
+        return None
+    
+    def transcribe_audio(self, audio: Union[str, np.ndarray], profile: Optional[str] = None) -> Optional[str]:
+        """Transcribe a float32 16 kHz waveform (or an audio file path) using Whisper"""
         try:
-            logger.info("Transcribing audio...")
-            result = self.model.transcribe(audio_file)
+            asr_log.info("Transcribing audio...")
+            # Arrays go straight to the model - no temp file, no ffmpeg decode
+            result = self.engine.transcribe(audio, profile or self.decoding_profile)
             transcription = result['text'].strip()
             
             # Only return non-empty transcriptions
             if transcription:
-                logger.info(f"Transcription: {transcription}")
+                asr_log.info("Transcription: %s", transcription)
                 return transcription
             else:
-                logger.info("Empty transcription, skipping...")
+                asr_log.info("Empty transcription, skipping...")
                 return None
                 
         except Exception as e:
             logger.error(f"Error transcribing audio: {e}")
             return None
-        finally:
-            # Clean up temporary file
-            try:
-                if os.path.exists(audio_file):
-                    os.unlink(audio_file)
-            except Exception as cleanup_error:
-                logger.warning(f"Failed to cleanup temp file: {cleanup_error}")
+    
+    def transcribe_batch(self, audios: List[np.ndarray], profile: Optional[str] = None,
+                         mels: Optional[List[Optional[np.ndarray]]] = None) -> List[Optional[str]]:
+        """Transcribe several float32 waveforms together (from precomputed mels where given); None for empty results"""
+        try:
+            texts = self.engine.transcribe_batch(audios, profile or self.decoding_profile, mels)
+        except Exception as e:
+            logger.error(f"Batched transcription failed ({e}) - decoding segments one by one")
+            return [self.transcribe_audio(audio, profile) for audio in audios]
+        
+        for text in texts:
+            if text:
+                asr_log.info("Transcription: %s", text)
+            else:
+                asr_log.info("Empty transcription, skipping...")
+        return [text or None for text in texts]
     
     def start_transcription(self):
         """Start the continuous announcement detection and transcription process"""
@@ -565,54 +810,47 @@ class LiveAudioTranscriber:
             logger.error("Failed to setup database, exiting...")
             return
         
+        # Connect and load the model(s) before audio starts flowing, so neither delays the first segment
+        self.supabase
+        self.engine
+        if self.cascade_enabled:
+            self.triage_engine
+            logger.info(f"ASR cascade: {self.cascade_settings}")
+        if self.announcement_backend == 'model':
+            self.announcement_model
+        
         self.is_running = True
         
         # Start cleanup worker thread
         self.cleanup_thread = threading.Thread(target=self.cleanup_worker, daemon=True)
         self.cleanup_thread.start()
         
+        logger.info(f"Runtime profile: {self.runtime}")
+        logger.info(f"Announcement detector: {self.announcement_backend} ({self.current_detector().version})")
+        
+        # Each stage runs on its own workers so a slow stage only backs up its own queue;
+        # every worker pins itself to its stage's cores (see stage_cores)
+        self.pipeline = self.build_pipeline()
+        self.pipeline.start()
+        
         try:
+            # Only now take the capture cores: the PortAudio callback threads opened below inherit them
+            pin_current_thread(self.runtime.capture_cores)
+            for device in self.devices:
+                self.start_capture_stream(device)
+            
+            last_stats = time.time()
             while self.is_running:
-                # Record audio dynamically until silence gap
-                logger.info("🎤 Starting audio recording cycle...")
-                audio_file = self.record_dynamic_audio_chunk()
-                if not audio_file:
-                    logger.info("❌ No audio file returned, continuing...")
-                    continue
-                
-                logger.info(f"✅ Audio file created: {audio_file}")
-                
-                # Transcribe audio
-                logger.info("🗣️ Starting transcription...")
-                transcription = self.transcribe_audio(audio_file)
-                if not transcription:
-                    logger.info("❌ No transcription returned, continuing...")
-                    continue
-                
-                logger.info(f"✅ Transcription received: '{transcription}'")
-                
-                # Check if this is an announcement
-                logger.info("🔍 Checking if this is an announcement...")
-                if self.is_announcement(transcription):
-                    logger.info("🎯 ANNOUNCEMENT DETECTED! Saving to database...")
-                    # Save announcement to database with timestamp
-                    timestamp = datetime.now()
-                    
-                    # Calculate approximate duration (rough estimate)
-                    duration = len(transcription.split()) * 0.6  # Rough estimate: 0.6 seconds per word
-                    
-                    success = self.save_announcement_to_supabase(transcription, timestamp, duration)
-                    
-                    if success:
-                        logger.info(f"✅ ANNOUNCEMENT DETECTED AND SAVED: {transcription}")
-                        print(f"\n🔊 ANNOUNCEMENT: {transcription}\n")
-                    else:
-                        logger.warning("Failed to save announcement to database")
-                else:
-                    logger.info(f"❌ Not an announcement - ignoring: {transcription[:50]}...")
-                
-                # Small delay before next recording cycle
                 time.sleep(0.5)
+                if time.time() - last_stats >= self.stats_interval:
+                    logger.info(f"Pipeline stats - {self.pipeline.format_stats()}")
+                    if self.transcript_cache is not None:
+                        logger.info(f"Transcript cache - {self.transcript_cache.format_stats()}")
+                    if self.announcement_index is not None:
+                        logger.info(f"Known announcements - {self.reference_matches} recognized without Whisper")
+                    if self.cascade_stats is not None:
+                        logger.info(f"ASR cascade - {self.cascade_stats.format_stats()}")
+                    last_stats = time.time()
                 
         except KeyboardInterrupt:
             logger.info("Received interrupt signal, stopping...")
@@ -622,16 +860,44 @@ class LiveAudioTranscriber:
             self.stop_transcription()
     
     def stop_transcription(self):
-        """Stop the transcription process"""
+        """Stop the transcription process (safe to call at any point, and more than once)"""
         logger.info("Stopping transcription...")
         self.is_running = False
         
+        # Stop capture first so no new chunks arrive
+        for device in self.devices:
+            if device.stream is not None:
+                try:
+                    device.stream.stop_stream()
+                    device.stream.close()
+                except Exception as e:
+                    logger.warning(f"Error closing audio stream for {device.device_id}: {e}")
+                device.stream = None
+        
+        # Drain the pipeline stage by stage
+        if self.pipeline is not None:
+            self.pipeline.stop()
+            logger.info(f"Pipeline stats - {self.pipeline.format_stats()}")
+            if self.transcript_cache is not None:
+                logger.info(f"Transcript cache - {self.transcript_cache.format_stats()}")
+                self.transcript_cache.close()  # Saves the replay fingerprints with TRANSCRIPT_CACHE_DIR
+            if self.announcement_index is not None:
+                logger.info(f"Known announcements - {self.reference_matches} recognized without Whisper")
+            if self.cascade_stats is not None:
+                logger.info(f"ASR cascade - {self.cascade_stats.format_stats()}")
+            for device in self.devices:
+                if device.input_overflows:
+                    logger.warning(f"{device.device_id}: capture reported {device.input_overflows} input overflows")
+            self.pipeline = None
+        
         # Wait for cleanup thread to finish
         if self.cleanup_thread and self.cleanup_thread.is_alive():
             self.cleanup_thread.join(timeout=5)
         
         # Close audio interface
-        self.audio.terminate()
+        if self._audio is not None:
+            self._audio.terminate()
+            self._audio = None
         logger.info("Transcription stopped")
 
 def signal_handler(sig, frame):
@@ -645,6 +911,15 @@ def main():
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
     
+    if '--list-devices' in sys.argv:
+        import pyaudio
+        audio = pyaudio.PyAudio()
+        print("🎤 Input devices (use as AUDIO_DEVICES=\"<index>:<device_id>,...\"):")
+        for index, name, channels in list_input_devices(audio):
+            print(f"   {index:3d}: {name} ({channels} ch)")
+        audio.terminate()
+        return
+    
     transcriber = None
     try:
         logger.info("Starting Enhanced Live Audio Transcription System")
@@ -3,151 +3,129 @@
 Offline Audio Transcription System
 Processes audio files the same way as the live system
 """
-import whisper
 import os
-import re
+import time
 import numpy as np
 from datetime import datetime
-from supabase import create_client, Client
 import logging
 from typing import Optional
 from dotenv import load_dotenv
+import threading
 import wave
 import tempfile
+from asr_client import load_asr
+from decoding import resolve_profile
+from transcription_cache import TranscriptionCache, cache_namespace, create_transcription_cache, file_fingerprint
+from transcription_rows import insert_transcription
+from announcement_classifier import AnnouncementScore, default_classifier
+from announcement_model import load_announcement_model, resolve_backend
+from log_config import apply_levels, configure_logging
 
 # Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler('offline_transcription.log'),
-        logging.StreamHandler()
-    ]
-)
+configure_logging('offline_transcription.log')  # Queued; written by a background thread
 logger = logging.getLogger(__name__)
 
 class OfflineAudioTranscriber:
     def __init__(self):
         # Load environment variables
         load_dotenv()
+        apply_levels()  # LOG_LEVEL / LOG_STAGE_LEVELS / LOG_PRODUCTION may come from .env
         
         # Supabase configuration
         self.supabase_url = os.getenv('SUPABASE_URL', 'your_supabase_url_here')
         self.supabase_key = os.getenv('SUPABASE_ANON_KEY', 'your_supabase_anon_key_here')
         
-        try:
-            self.supabase: Client = create_client(self.supabase_url, self.supabase_key)
-            logger.info("Supabase client initialized successfully")
-        except Exception as e:
-            logger.error(f"Failed to initialize Supabase client: {e}")
-            raise
+        # Supabase client and Whisper are created on first use, so announcement detection and
+        # file helpers work without them (and without credentials)
+        self._supabase = None
+        self.model_name = "base"  # Whisper model (also names the transcript cache's namespace)
+        self._engine = None
+        self._engine_lock = threading.Lock()
         
         # Configuration options (same as live system)
         self.test_mode = True  # Accept all transcriptions for development
         self.cleanup_after_minutes = 10
         
-        # Load Whisper model
-        logger.info("Loading Whisper model...")
-        self.model = whisper.load_model("base")
-        logger.info("Whisper model loaded successfully")
+        self.decoding_profile = resolve_profile(os.getenv('DECODING_PROFILE'))  # fast | balanced | accurate
+        # Same cache as the live system. One run is usually one file, so hits across runs come from the disk tier
+        self.transcript_cache = create_transcription_cache()
+        if self.transcript_cache is not None and not self.transcript_cache.disk_dir:
+            logger.info("Transcript cache has no disk tier (TRANSCRIPT_CACHE_DIR) - it only helps within this run")
+        
+        # Announcement rules (same rule file as live system, reloaded when it changes)
+        self.announcement_classifier = default_classifier()
+        self.announcement_backend = resolve_backend(os.getenv('ANNOUNCEMENT_BACKEND'))  # rules | model
+        self._announcement_model = None
+
+    @property
+    def supabase(self):
+        """Supabase client, created on first use"""
+        if self._supabase is None:
+            from supabase import create_client
+            try:
+                self._supabase = create_client(self.supabase_url, self.supabase_key)
+                logger.info("Supabase client initialized successfully")
+            except Exception as e:
+                logger.error(f"Failed to initialize Supabase client: {e}")
+                raise
+        return self._supabase
+
+    @property
+    def engine(self):
+        """Whisper model: the warm inference server if one is running (asr_server.py), else in-process"""
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = load_asr(self.model_name)
+        return self._engine
+
+    @property
+    def announcement_model(self):
+        """Linear announcement model, loaded (or trained on the labeled datasets) on first use"""
+        if self._announcement_model is None:
+            self._announcement_model = load_announcement_model()
+        return self._announcement_model
+
+    def current_detector(self):
+        """Detector for the next decision: a snapshot of the rule file, or the linear model"""
+        if self.announcement_backend == 'model':
+            return self.announcement_model
+        return self.announcement_classifier.current
+
+    def analyze_transcription(self, text: str, detector=None) -> AnnouncementScore:
+        """One pass over a transcript: decision, type, severity, matched features and confidence (same as live system)"""
+        detector = detector or self.current_detector()
+        # Production decides with the fast path and scores only announcements; test mode saves everything, so scores all
+        result = detector.score(text) if self.test_mode else detector.analyze(text)
         
-        # Announcement patterns (same as live system)
-        self.announcement_patterns = [
-            r'\b(attention|announcement|notice|important|alert|urgent)\b',
-            r'\b(please note|kindly note|for your information|fyi)\b',
-            r'\b(all passengers|all students|all staff|all users|everyone)\b',
-            r'\b(boarding|departure|arrival|gate|platform|floor|room)\b',
-            r'\b(reminder|warning|caution|safety|emergency)\b',
-            r'\b(now boarding|final call|last call|delayed|cancelled)\b',
-            r'\b(meeting|event|session|break|lunch|closing)\b'
-        ]
+        # TEST MODE - Accept all non-empty transcriptions for testing
+        if self.test_mode and not result.is_announcement and text.strip():
+            logger.debug("TEST MODE: Accepting all transcriptions - %r", text[:80])
+            result = result._replace(is_announcement=True, reason='test mode')
+        return result
 
-    def is_announcement(self, text: str) -> bool:
+    def is_announcement(self, text: str, detector=None) -> bool:
         """Same announcement detection logic as live system"""
         
         # TEST MODE - Accept all non-empty transcriptions for testing
         if hasattr(self, 'test_mode') and self.test_mode:
             if text and len(text.strip()) > 0:
-                logger.info(f"TEST MODE: Accepting all transcriptions - '{text}'")
+                logger.debug("TEST MODE: Accepting all transcriptions - %r", text[:80])
                 return True
         
-        text_lower = text.lower()
-        
-        # Immediate conversation indicators (very strong signals)
-        immediate_conversation = [
-            r'\b(i think|i feel|i believe|maybe|perhaps)\b',
-            r'\b(can you|could you|would you|will you|do you)\b',
-            r'\b(i like|i love|i hate|i prefer|i want|i need)\b',
-            r'\b(let\'s|we should|should we|why don\'t we)\b',
-            r'\b(i heard|someone said|i wonder)\b',
-        ]
-        
-        # Check for immediate conversation indicators first
-        for pattern in immediate_conversation:
-            if re.search(pattern, text_lower):
-                logger.info(f"Immediate conversation detected: {pattern}")
-                return False
-        
-        # Strong announcement indicators
-        strong_announcement = [
-            r'\b(attention|ladies and gentlemen|code (red|blue|green))\b',
-            r'\b(all (passengers|students|staff|visitors|everyone))\b',
-            r'\b(please note|for your information)\b',
-            r'\b(final call|now boarding|last call)\b',
-            r'\b(emergency|evacuation|drill)\b'
-        ]
-        
-        strong_announcement_score = 0
-        for pattern in strong_announcement:
-            if re.search(pattern, text_lower):
-                strong_announcement_score += 1
-                logger.info(f"Strong announcement indicator: {pattern}")
-        
-        if strong_announcement_score > 0:
-            logger.info("Strong announcement detected")
-            return True
-        
-        # Check for regular announcement patterns
-        announcement_score = 0
-        matched_patterns = []
-        for pattern in self.announcement_patterns:
-            if re.search(pattern, text_lower):
-                announcement_score += 1
-                matched_patterns.append(pattern)
-        
-        # Length requirements - relaxed for testing
-        words = text.split()
-        word_count = len(words)
-        
-        if word_count < 3:  # Minimum 3 words
-            logger.info(f"Too short for announcement: {word_count} words")
-            return False
-        
-        # Decision logic (relaxed thresholds)
-        if len(matched_patterns) >= 1:  # If any announcement pattern matches
-            logger.info(f"Announcement detected: pattern match {matched_patterns}")
-            return True
-        else:
-            logger.info(f"Conversation detected: patterns {len(matched_patterns)}")
-            return False
+        return (detector or self.current_detector())(text)
 
     def classify_announcement(self, text: str) -> str:
         """Classify the type of announcement (same as live system)"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['boarding', 'gate', 'departure', 'arrival', 'flight']):
-            return 'travel'
-        elif any(word in text_lower for word in ['meeting', 'session', 'conference', 'break']):
-            return 'meeting'
-        elif any(word in text_lower for word in ['emergency', 'evacuation', 'safety', 'alert']):
-            return 'emergency'
-        else:
-            return 'general'
+        return self.announcement_classifier.classify_type(text)
 
-    def save_announcement_to_supabase(self, text: str, timestamp: datetime, duration: float, source_file: str) -> bool:
+    def save_announcement_to_supabase(self, text: str, timestamp: datetime, duration: float, source_file: str,
+                                      decode_seconds: Optional[float] = None,
+                                      analysis: Optional[AnnouncementScore] = None) -> bool:
         """Save announcement transcription to Supabase (same as live system but with source file)"""
         max_retries = 3
         retry_delay = 2
+        analysis = analysis or self.analyze_transcription(text)
         
         for attempt in range(max_retries):
             try:
@@ -157,10 +135,13 @@ class OfflineAudioTranscriber:
                     'device_id': f'offline_file_{os.path.basename(source_file)}',
                     'audio_duration': duration,
                     'is_announcement': True,
-                    'announcement_type': self.classify_announcement(text)
+                    'announcement_type': analysis.announcement_type,
+                    'decoding_profile': self.decoding_profile,
+                    'decode_ms': round(decode_seconds * 1000) if decode_seconds is not None else None,
+                    'rule_version': analysis.rule_version  # Optional columns: see transcription_rows
                 }
                 
-                result = self.supabase.table('transcriptions').insert(data).execute()
+                result = insert_transcription(self.supabase, data)
                 logger.info(f"SUCCESS: Announcement saved to database (attempt {attempt + 1}): {text[:80]}...")
                 return True
                 
@@ -188,6 +169,22 @@ class OfflineAudioTranscriber:
             logger.warning(f"Could not get audio duration: {e}")
             return 0.0
 
+    def load_cache_audio(self, audio_file_path: str) -> Optional[np.ndarray]:
+        """A WAV file as float32 16 kHz samples for the transcript cache (None for other formats, or without a cache)"""
+        if self.transcript_cache is None or not audio_file_path.lower().endswith('.wav'):
+            return None
+        from audio_io import load_wav_16k
+        try:
+            return load_wav_16k(audio_file_path).astype(np.float32) / 32768.0
+        except Exception as e:
+            logger.warning(f"Could not read {audio_file_path} for the transcript cache: {e}")
+            return None
+
+    def close(self):
+        """Save the transcript cache's replay fingerprints (TRANSCRIPT_CACHE_DIR)"""
+        if self.transcript_cache is not None:
+            self.transcript_cache.close()
+
     def transcribe_audio_file(self, audio_file_path: str) -> Optional[str]:
         """
         Process an audio file the same way as the live system
@@ -211,25 +208,48 @@ class OfflineAudioTranscriber:
             logger.info(f"Audio duration: {duration:.1f} seconds")
             
             # Transcribe using Whisper (same as live system)
-            logger.info("Transcribing audio with Whisper...")
-            result = self.model.transcribe(audio_file_path)
-            transcription = result['text'].strip()
+            logger.info(f"Transcribing audio with Whisper ('{self.decoding_profile}' profile)...")
+            started = time.perf_counter()
+            namespace = cache_namespace(self.model_name, self.decoding_profile)  # No Whisper load for a hit
+            audio = self.load_cache_audio(audio_file_path)
+            transcription = None
+            if self.transcript_cache is not None:
+                if audio is not None:
+                    transcription = self.transcript_cache.lookup(namespace, audio)
+                else:
+                    transcription = self.transcript_cache.get(
+                        TranscriptionCache.key(namespace, file_fingerprint(audio_file_path)))
+                if transcription is not None:
+                    logger.info("Transcript served from cache - Whisper skipped")
+            if transcription is None:
+                result = self.engine.transcribe(audio_file_path, self.decoding_profile)
+                transcription = result['text'].strip()
+                if self.transcript_cache is not None:
+                    if audio is not None:
+                        self.transcript_cache.store(namespace, audio, transcription)
+                    else:
+                        self.transcript_cache.put(TranscriptionCache.key(namespace, file_fingerprint(audio_file_path)),
+                                                  transcription)
+            decode_seconds = time.perf_counter() - started
+            if self.transcript_cache is not None:
+                logger.info(f"Transcript cache - {self.transcript_cache.format_stats()}")
             
             if not transcription:
                 logger.info("Empty transcription, skipping...")
                 return None
                 
-            logger.info(f"Transcription: '{transcription}'")
+            logger.info(f"Transcription ({decode_seconds:.2f}s): '{transcription}'")
             
             # Check if this is an announcement (same logic as live system)
             logger.info("Checking if this is an announcement...")
-            if self.is_announcement(transcription):
+            analysis = self.analyze_transcription(transcription)  # Saving and reporting reuse this result
+            if analysis.is_announcement:
                 logger.info("ANNOUNCEMENT DETECTED! Saving to database...")
                 
                 # Save to database with timestamp
                 timestamp = datetime.now()
                 success = self.save_announcement_to_supabase(
-                    transcription, timestamp, duration, audio_file_path
+                    transcription, timestamp, duration, audio_file_path, decode_seconds, analysis
                 )
                 
                 if success:
@@ -237,7 +257,7 @@ class OfflineAudioTranscriber:
                     print(f"\n🔊 ANNOUNCEMENT DETECTED: {transcription}")
                     print(f"📁 Source: {os.path.basename(audio_file_path)}")
                     print(f"⏱️ Duration: {duration:.1f}s")
-                    print(f"🏷️ Type: {self.classify_announcement(transcription)}")
+                    print(f"🏷️ Type: {analysis.announcement_type} ({analysis.severity})")
                     print(f"💾 Saved to database successfully!\n")
                     return transcription
                 else:
@@ -257,26 +277,31 @@ def main():
     """Main function for offline audio processing"""
     import sys
     
-    if len(sys.argv) != 2:
-        print("Usage: python offline_transcription.py <audio_file_path>")
+    if len(sys.argv) < 2:
+        print("Usage: python offline_transcription.py <audio_file_path> [<audio_file_path> ...]")
         print("Example: python offline_transcription.py recording.wav")
         return
     
-    audio_file = sys.argv[1]
+    audio_files = sys.argv[1:]
     
     print("🎧 OFFLINE AUDIO TRANSCRIPTION SYSTEM")
     print("=" * 50)
-    print(f"Processing: {audio_file}")
+    print(f"Processing: {', '.join(audio_files)}")
     print("=" * 50)
     
     try:
+        # One transcriber for every file, so repeats among them hit the cache's memory tier
         transcriber = OfflineAudioTranscriber()
-        result = transcriber.transcribe_audio_file(audio_file)
-        
-        if result:
-            print("✅ Processing completed successfully!")
-        else:
-            print("❌ Processing failed or no transcription generated.")
+        try:
+            for audio_file in audio_files:
+                result = transcriber.transcribe_audio_file(audio_file)
+                
+                if result:
+                    print(f"✅ Processing completed successfully! ({audio_file})")
+                else:
+                    print(f"❌ Processing failed or no transcription generated. ({audio_file})")
+        finally:
+            transcriber.close()
             
     except Exception as e:
         logger.error(f"Fatal error: {e}")
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""
+Staged pipeline engine for the live transcriber
+Stages run on their own worker threads and are connected by bounded queues
+"""
+import logging
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Callable, Dict, Hashable, Iterable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_STOP = object()  # Sentinel telling one worker to exit
+
+
+class FairQueue:
+    """Bounded queue that serves items round-robin across keys (e.g. device_id).
+
+    Drop-in for ``queue.Queue`` inside a stage, so one busy input cannot
+    starve the others. Stop sentinels are only served once every key is empty.
+    """
+
+    def __init__(self, maxsize: int, key: Callable[[object], Hashable]):
+        self.maxsize = maxsize
+        self._key = key
+        self._queues: 'OrderedDict[Hashable, deque]' = OrderedDict()
+        self._stops = deque()
+        self._size = 0
+        self._cond = threading.Condition()
+
+    def qsize(self) -> int:
+        with self._cond:
+            return self._size
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def depths(self) -> Dict[Hashable, int]:
+        with self._cond:
+            return {key: len(items) for key, items in self._queues.items()}
+
+    def put(self, item, block: bool = True, timeout: Optional[float] = None):
+        with self._cond:
+            if item is not _STOP and self.maxsize > 0:
+                if not self._cond.wait_for(lambda: self._size < self.maxsize, timeout if block else 0):
+                    raise queue.Full
+            if item is _STOP:
+                self._stops.append(item)
+            else:
+                self._queues.setdefault(self._key(item), deque()).append(item)
+            self._size += 1
+            self._cond.notify_all()
+
+    def put_nowait(self, item):
+        self.put(item, block=False)
+
+    def get(self, block: bool = True, timeout: Optional[float] = None):
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._size > 0, timeout if block else 0):
+                raise queue.Empty
+            if self._queues:
+                # Serve the least recently served key, then send it to the back of the line
+                key, items = next(iter(self._queues.items()))
+                item = items.popleft()
+                del self._queues[key]
+                if items:
+                    self._queues[key] = items
+            else:
+                item = self._stops.popleft()
+            self._size -= 1
+            self._cond.notify_all()
+            return item
+
+    def get_nowait(self):
+        return self.get(block=False)
+
+
+class PipelineStage:
+    """One pipeline stage: a bounded input queue served by ``workers`` threads.
+
+    ``handler(item)`` returns an iterable of output items for the next stage
+    (or None for nothing). ``flush()``, if given, runs once after the workers
+    exit and may return final items (e.g. a segment still being recorded).
+    With ``fair_key`` the input queue is served round-robin across its keys.
+    ``worker_init()`` runs first on every worker thread (e.g. CPU pinning).
+
+    With ``batch_size`` > 1 the handler receives a list: after the first item
+    a worker takes whatever else is already queued, up to ``batch_size``. A
+    ``batch_wait`` > 0 also waits that long for more, trading latency for
+    throughput; with 0 nothing waits for a batch to fill.
+    """
+
+    def __init__(self, name: str, handler: Callable[[object], Optional[Iterable]],
+                 workers: int = 1, queue_size: int = 10, drop_when_full: bool = False,
+                 flush: Optional[Callable[[], Optional[Iterable]]] = None,
+                 fair_key: Optional[Callable[[object], Hashable]] = None,
+                 batch_size: int = 1, batch_wait: float = 0.0,
+                 worker_init: Optional[Callable[[], None]] = None):
+        if workers < 1:
+            raise ValueError(f"Stage '{name}' needs at least one worker")
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.drop_when_full = drop_when_full
+        self.flush = flush
+        self.batch_size = max(1, batch_size)
+        self.batch_wait = batch_wait
+        self.worker_init = worker_init
+        self.queue = FairQueue(queue_size, fair_key) if fair_key else queue.Queue(maxsize=queue_size)
+        self.next_stage: Optional['PipelineStage'] = None
+
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._accepting = False
+
+        # Metrics
+        self.batches = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.total_service_time = 0.0
+        self.max_service_time = 0.0
+
+    def start(self):
+        self._accepting = True
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def offer(self, item) -> bool:
+        """Queue an item; returns False if it was dropped.
+
+        Drop-when-full stages never block (used for the real-time capture
+        input). Other stages apply backpressure to their producer.
+        """
+        if self.drop_when_full:
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                with self._lock:
+                    self.dropped += 1
+                return False
+
+        while self._accepting:
+            try:
+                self.queue.put(item, timeout=0.5)
+                return True
+            except queue.Full:
+                continue
+
+        with self._lock:
+            self.dropped += 1
+        return False
+
+    def stop(self, timeout: float = 10.0):
+        """Let the workers drain the queue, then run the flush hook"""
+        for _ in self._threads:
+            try:
+                self.queue.put(_STOP, timeout=timeout)
+            except queue.Full:
+                logger.warning(f"Stage '{self.name}' did not drain in {timeout}s")
+                break
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+        self._threads = []
+        self._accepting = False
+
+        if self.flush is not None:
+            try:
+                self._forward(self.flush())
+            except Exception as e:
+                logger.error(f"Stage '{self.name}' flush failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            served = self.processed + self.errors
+            stats = {
+                'workers': self.workers,
+                'queue_depth': self.queue.qsize(),
+                'queue_size': self.queue.maxsize,
+                'processed': self.processed,
+                'dropped': self.dropped,
+                'errors': self.errors,
+                'avg_service_ms': (self.total_service_time / served * 1000) if served else 0.0,
+                'max_service_ms': self.max_service_time * 1000
+            }
+            if self.batch_size > 1:
+                stats['avg_batch_size'] = (served / self.batches) if self.batches else 0.0
+        if isinstance(self.queue, FairQueue):
+            stats['queue_depth_by_key'] = self.queue.depths()
+        return stats
+
+    def _run(self):
+        if self.worker_init is not None:
+            try:
+                self.worker_init()
+            except Exception as e:
+                logger.error(f"Stage '{self.name}' worker init failed: {e}")
+
+        stopping = False
+        while not stopping:
+            item = self.queue.get()
+            if item is _STOP:
+                break
+
+            if self.batch_size > 1:
+                item, stopping = self._collect_batch(item)
+            count = len(item) if self.batch_size > 1 else 1
+
+            started = time.perf_counter()
+            failed = False
+            try:
+                outputs = self.handler(item)
+            except Exception as e:
+                logger.error(f"Stage '{self.name}' error: {e}")
+                outputs = None
+                failed = True
+            elapsed = time.perf_counter() - started
+
+            with self._lock:
+                if failed:
+                    self.errors += count
+                else:
+                    self.processed += count
+                self.batches += 1
+                self.total_service_time += elapsed
+                self.max_service_time = max(self.max_service_time, elapsed)
+
+            self._forward(outputs)
+
+    def _collect_batch(self, first):
+        """Gather up to batch_size items: those already queued, plus any arriving within batch_wait"""
+        batch = [first]
+        deadline = time.perf_counter() + self.batch_wait
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self.queue.get(timeout=remaining) if remaining > 0 else self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def _forward(self, outputs: Optional[Iterable]):
+        if outputs is None or self.next_stage is None:
+            return
+        for output in outputs:
+            self.next_stage.offer(output)
+
+
+class Pipeline:
+    """Linear chain of stages; items submitted to the first stage flow to the last"""
+
+    def __init__(self):
+        self.stages: List[PipelineStage] = []
+        self.is_running = False
+
+    def add_stage(self, name: str, handler: Callable[[object], Optional[Iterable]], **options) -> PipelineStage:
+        stage = PipelineStage(name, handler, **options)
+        if self.stages:
+            self.stages[-1].next_stage = stage
+        self.stages.append(stage)
+        return stage
+
+    def stage(self, name: str) -> PipelineStage:
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def start(self):
+        # Start downstream first so no stage forwards into a stage without workers
+        for stage in reversed(self.stages):
+            stage.start()
+        self.is_running = True
+
+    def submit(self, item) -> bool:
+        """Feed an item into the first stage; returns False if it was dropped"""
+        if not self.is_running:
+            return False
+        return self.stages[0].offer(item)
+
+    def stop(self, timeout: float = 10.0):
+        """Stop stages front to back so in-flight items drain downstream"""
+        self.is_running = False
+        for stage in self.stages:
+            stage.stop(timeout)
+
+    def stats(self) -> dict:
+        return {stage.name: stage.stats() for stage in self.stages}
+
+    def format_stats(self) -> str:
+        return " | ".join(
+            f"{name}: depth {s['queue_depth']}/{s['queue_size']}, "
+            f"avg {s['avg_service_ms']:.0f}ms, done {s['processed']}, dropped {s['dropped']}"
+            for name, s in self.stats().items()
+        )
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+fp32 vs int8 Whisper benchmark on recorded announcement clips
+Reports real-time factor, transcript agreement and announcement-detection agreement
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+
+from asr_engine import WhisperEngine
+from audio_buffer import pcm16_to_float32
+from audio_io import RATE, load_wav_16k
+from test_final import FinalOptimizedTester
+
+
+def _words(text: str) -> list:
+    return re.sub(r"[^\w\s']", ' ', text.lower()).split()
+
+
+def word_error_rate(reference: str, hypothesis: str) -> float:
+    """Word-level edit distance between two transcripts, relative to the reference length"""
+    ref, hyp = _words(reference), _words(hypothesis)
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def time_transcription(engine: WhisperEngine, audio) -> tuple:
+    started = time.perf_counter()
+    text = engine.transcribe(audio)['text'].strip()
+    return text, time.perf_counter() - started
+
+
+def build_report(audio_dir: str, model_name: str) -> dict:
+    files = sorted(f for f in os.listdir(audio_dir) if f.lower().endswith('.wav'))
+    clips = [(f, pcm16_to_float32(load_wav_16k(os.path.join(audio_dir, f)))) for f in files]
+    detector = FinalOptimizedTester()
+
+    engines = {'fp32': WhisperEngine(model_name), 'int8': WhisperEngine(model_name, quantize=True)}
+    if clips:
+        for engine in engines.values():
+            engine.transcribe(clips[0][1])  # Warm-up: first call pays one-off allocation costs
+
+    report = {'audio_dir': audio_dir, 'model': model_name, 'files': len(clips),
+              'audio_seconds': sum(len(audio) for _, audio in clips) / RATE, 'clips': []}
+    totals = {mode: 0.0 for mode in engines}
+
+    for filename, audio in clips:
+        clip = {'file': filename, 'seconds': len(audio) / RATE}
+        for mode, engine in engines.items():
+            text, elapsed = time_transcription(engine, audio)
+            totals[mode] += elapsed
+            clip[mode] = {'text': text, 'decode_seconds': elapsed, 'announcement': detector.is_announcement(text)}
+        clip['wer_vs_fp32'] = word_error_rate(clip['fp32']['text'], clip['int8']['text'])
+        clip['detection_agrees'] = clip['fp32']['announcement'] == clip['int8']['announcement']
+        report['clips'].append(clip)
+
+    audio_seconds = report['audio_seconds'] or 1.0
+    report['modes'] = {mode: {'decode_seconds': total, 'rtf': total / audio_seconds} for mode, total in totals.items()}
+    report['speedup'] = totals['fp32'] / totals['int8'] if totals['int8'] else 0.0
+    report['mean_wer_vs_fp32'] = (sum(c['wer_vs_fp32'] for c in report['clips']) / len(clips)) if clips else 0.0
+    report['exact_matches'] = sum(_words(c['fp32']['text']) == _words(c['int8']['text']) for c in report['clips'])
+    report['detection_disagreements'] = [c['file'] for c in report['clips'] if not c['detection_agrees']]
+    return report
+
+
+def print_report(report: dict):
+    print("⚡ QUANTIZED WHISPER BENCHMARK")
+    print("=" * 80)
+    print(f"Model '{report['model']}': {report['files']} clips, {report['audio_seconds']:.1f}s from {report['audio_dir']}\n")
+    print(f"{'Clip':<32} {'Secs':>6} {'fp32 s':>8} {'int8 s':>8} {'WER':>6}  Detection")
+    print("-" * 80)
+    for clip in report['clips']:
+        detection = "same" if clip['detection_agrees'] else f"❌ fp32={clip['fp32']['announcement']} int8={clip['int8']['announcement']}"
+        print(f"{clip['file'][:32]:<32} {clip['seconds']:>6.1f} {clip['fp32']['decode_seconds']:>8.2f} "
+              f"{clip['int8']['decode_seconds']:>8.2f} {clip['wer_vs_fp32']:>6.1%}  {detection}")
+
+    print("-" * 80)
+    for mode, stats in report['modes'].items():
+        print(f"{mode}: {stats['decode_seconds']:.1f}s decode, real-time factor {stats['rtf']:.3f}")
+    print(f"Speedup: {report['speedup']:.2f}x | mean WER vs fp32: {report['mean_wer_vs_fp32']:.1%} | "
+          f"identical transcripts: {report['exact_matches']}/{report['files']}")
+
+    disagreements = report['detection_disagreements']
+    if disagreements:
+        print(f"⚠️ Announcement detection differs on {len(disagreements)} clip(s): {', '.join(disagreements)}")
+    else:
+        print("✅ Announcement detection identical on every clip")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fp32 and int8-quantized Whisper on announcement clips")
+    parser.add_argument('audio_dir', nargs='?', default='./audio', help="Directory of WAV recordings")
+    parser.add_argument('--model', default='base', help="Whisper model name")
+    parser.add_argument('--json', help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.audio_dir):
+        print(f"❌ Audio directory not found: {args.audio_dir}")
+        sys.exit(1)
+
+    report = build_report(args.audio_dir, args.model)
+    print_report(report)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
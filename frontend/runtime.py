@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+CPU runtime profile for the ASR stage
+Torch thread counts and core pinning that keep Whisper off the capture core.
+
+    python runtime.py show
+    python runtime.py autotune clip.wav
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RUNTIME_PROFILE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'asr_runtime.json')
+
+
+def runtime_profile_path() -> str:
+    """ASR_RUNTIME_PROFILE, read on use rather than at import (the transcribers load .env after importing this)"""
+    return os.getenv('ASR_RUNTIME_PROFILE', DEFAULT_RUNTIME_PROFILE_PATH)
+
+
+def available_cores() -> List[int]:
+    """Cores this process may run on"""
+    if hasattr(os, 'sched_getaffinity'):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+class RuntimeProfile:
+    """Thread counts and core sets for capture and ASR.
+
+    ``capture_cores`` run the PortAudio callback threads and the segmentation
+    workers; ASR workers pin themselves to ``asr_cores``, where torch's
+    intra-op pool is created, and the other pipeline workers to
+    ``worker_cores`` so they never compete with capture.
+    """
+
+    def __init__(self, intra_op_threads: int, inter_op_threads: int, asr_workers: int,
+                 capture_cores: List[int], asr_cores: List[int], benchmark: Optional[dict] = None):
+        self.intra_op_threads = intra_op_threads
+        self.inter_op_threads = inter_op_threads
+        self.asr_workers = asr_workers
+        self.capture_cores = capture_cores
+        self.asr_cores = asr_cores
+        self.benchmark = benchmark
+
+    @classmethod
+    def default(cls) -> 'RuntimeProfile':
+        """One core reserved for capture (on machines with more than two), the rest for one ASR worker"""
+        cores = available_cores()
+        capture_cores = cores[:1] if len(cores) > 2 else cores
+        asr_cores = cores[1:] if len(cores) > 2 else cores
+        return cls(len(asr_cores), 1, 1, capture_cores, asr_cores)
+
+    @property
+    def worker_cores(self) -> List[int]:
+        """Cores for the other pipeline workers: all but the capture cores (all, if capture has them all)"""
+        return [c for c in available_cores() if c not in self.capture_cores] or available_cores()
+
+    def to_dict(self) -> dict:
+        return {
+            'intra_op_threads': self.intra_op_threads,
+            'inter_op_threads': self.inter_op_threads,
+            'asr_workers': self.asr_workers,
+            'capture_cores': self.capture_cores,
+            'asr_cores': self.asr_cores,
+            'benchmark': self.benchmark
+        }
+
+    def __repr__(self):
+        return (f"RuntimeProfile(asr_workers={self.asr_workers}, intra_op={self.intra_op_threads}, "
+                f"inter_op={self.inter_op_threads}, capture_cores={self.capture_cores}, asr_cores={self.asr_cores})")
+
+
+def load_runtime_profile(path: Optional[str] = None) -> RuntimeProfile:
+    """Load the autotuned profile (ASR_RUNTIME_PROFILE), or the default split if none was saved on this machine"""
+    path = path or runtime_profile_path()
+    if os.path.exists(path):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            profile = RuntimeProfile(**data)
+            # Drop cores this machine (or container) doesn't have
+            cores = set(available_cores())
+            profile.capture_cores = [c for c in profile.capture_cores if c in cores] or available_cores()[:1]
+            profile.asr_cores = [c for c in profile.asr_cores if c in cores] or available_cores()
+            return profile
+        except (OSError, ValueError, TypeError) as e:
+            logger.warning(f"Ignoring unreadable runtime profile {path}: {e}")
+    return RuntimeProfile.default()
+
+
+def save_runtime_profile(profile: RuntimeProfile, path: Optional[str] = None):
+    with open(path or runtime_profile_path(), 'w', encoding='utf-8') as f:
+        json.dump(profile.to_dict(), f, indent=2)
+
+
+def apply_torch_threads(profile: RuntimeProfile):
+    """Set torch intra/inter-op thread counts (inter-op only takes effect before the first model call)"""
+    import torch
+    torch.set_num_threads(profile.intra_op_threads)
+    try:
+        torch.set_interop_threads(profile.inter_op_threads)
+    except RuntimeError:
+        logger.debug("Inter-op thread count already fixed for this process")
+    logger.info(f"Torch threads: intra-op {profile.intra_op_threads}, inter-op {profile.inter_op_threads}")
+
+
+def pin_current_thread(cores: List[int]) -> bool:
+    """Restrict the calling thread (and threads it starts later) to ``cores``; no-op off Linux"""
+    if not cores or not hasattr(os, 'sched_setaffinity'):
+        return False
+    try:
+        os.sched_setaffinity(0, cores)
+        return True
+    except OSError as e:
+        logger.warning(f"Could not pin {threading.current_thread().name} to cores {cores}: {e}")
+        return False
+
+
+def _benchmark(engine, audio, profile: Optional[str], workers: int, threads: int,
+               asr_cores: List[int], rounds: int) -> dict:
+    """Decode ``audio`` ``rounds`` times on each of ``workers`` pinned threads"""
+    import torch
+    torch.set_num_threads(threads)
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        pin_current_thread(asr_cores)
+        for _ in range(rounds):
+            started = time.perf_counter()
+            engine.transcribe(audio, profile)
+            with lock:
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    pool = [threading.Thread(target=worker) for _ in range(workers)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    wall = time.perf_counter() - started
+
+    audio_seconds = len(audio) / 16000 * len(latencies)
+    return {
+        'asr_workers': workers,
+        'intra_op_threads': threads,
+        'mean_latency_s': sum(latencies) / len(latencies),
+        'throughput_x_realtime': audio_seconds / wall
+    }
+
+
+def autotune(clip: str, model_name: str = 'base', profile: Optional[str] = None,
+             rounds: int = 3, objective: str = 'latency') -> RuntimeProfile:
+    """Benchmark worker/thread combinations on this machine and return the best profile"""
+    from asr_engine import WhisperEngine
+    from audio_buffer import pcm16_to_float32
+    from audio_io import load_wav_16k
+
+    base = RuntimeProfile.default()
+    audio = pcm16_to_float32(load_wav_16k(clip))
+    engine = WhisperEngine(model_name)
+    engine.transcribe(audio, profile)  # Warm-up
+
+    candidates = [
+        (workers, threads)
+        for workers in (1, 2, 4)
+        for threads in sorted({1, 2, 4, 8, len(base.asr_cores) // workers})
+        if threads >= 1 and workers * threads <= len(base.asr_cores)
+    ]
+
+    print(f"⚙️ Autotuning on {len(base.asr_cores)} ASR cores (capture cores {base.capture_cores}), "
+          f"{len(audio) / 16000:.1f}s clip, {rounds} rounds per worker")
+    print(f"{'Workers':>8} {'Threads':>8} {'Latency s':>10} {'x realtime':>11}")
+    results = []
+    for workers, threads in candidates:
+        result = _benchmark(engine, audio, profile, workers, threads, base.asr_cores, rounds)
+        results.append(result)
+        print(f"{workers:>8} {threads:>8} {result['mean_latency_s']:>10.2f} {result['throughput_x_realtime']:>11.1f}")
+
+    if objective == 'throughput':
+        best = max(results, key=lambda r: r['throughput_x_realtime'])
+    else:
+        best = min(results, key=lambda r: r['mean_latency_s'])
+
+    return RuntimeProfile(best['intra_op_threads'], 1, best['asr_workers'], base.capture_cores, base.asr_cores,
+                          benchmark={'objective': objective, 'clip': os.path.basename(clip), 'model': model_name,
+                                     'decoding_profile': profile, 'results': results})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show or autotune the ASR CPU runtime profile")
+    sub = parser.add_subparsers(dest='command', required=True)
+    sub.add_parser('show', help="Print the profile in effect on this machine")
+    tune = sub.add_parser('autotune', help="Benchmark configurations and save the best one")
+    tune.add_argument('clip', help="Representative 16-bit WAV announcement clip")
+    tune.add_argument('--model', default=os.getenv('WHISPER_MODEL', 'base'), help="Whisper model name")
+    tune.add_argument('--profile', default=os.getenv('DECODING_PROFILE'), help="Decoding profile")
+    tune.add_argument('--rounds', type=int, default=3, help="Decodes per worker for each configuration")
+    tune.add_argument('--objective', choices=('latency', 'throughput'), default='latency',
+                      help="latency: fastest single announcement; throughput: most audio per second (many devices)")
+    tune.add_argument('--output', default=runtime_profile_path(), help="Where to save the profile")
+    args = parser.parse_args()
+
+    if args.command == 'show':
+        path = runtime_profile_path()
+        source = path if os.path.exists(path) else 'default'
+        print(f"{load_runtime_profile()} ({source})")
+        return
+
+    if not os.path.exists(args.clip):
+        print(f"❌ Clip not found: {args.clip}")
+        sys.exit(1)
+
+    best = autotune(args.clip, args.model, args.profile, args.rounds, args.objective)
+    save_runtime_profile(best, args.output)
+    print(f"\n✅ Best: {best}")
+    print(f"💾 Saved to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Incremental speech segmentation for the live transcriber
+Feed raw PCM chunks as they arrive and collect finished speech segments
+(plus overlapping partial windows when streaming is enabled)
+"""
+import numpy as np
+from typing import List, Optional, Union
+
+from audio_buffer import AudioRingBuffer, SegmentRecorder
+from log_config import stage_logger
+from vad import frame_view
+
+logger = stage_logger('segmentation')  # Runs on the segmentation stage; gated with LOG_STAGE_LEVELS
+
+
+class SpeechSegment:
+    """A finished speech segment, or a partial window of one still being recorded.
+
+    For a final segment, ``windows`` is the number of partial windows emitted
+    for it and ``tail_start`` the sample offset where the not-yet-transcribed
+    tail begins (overlap included).
+    """
+
+    def __init__(self, audio: np.ndarray, segment_id: int, is_partial: bool = False,
+                 window_index: int = 0, windows: int = 0, tail_start: int = 0):
+        self.audio = audio
+        self.segment_id = segment_id
+        self.is_partial = is_partial
+        self.window_index = window_index
+        self.windows = windows
+        self.tail_start = tail_start
+
+
+class SpeechSegmenter:
+    """VAD-driven segmenter that never blocks on I/O.
+
+    A segment starts on the first speech frame and ends after
+    ``silence_threshold`` seconds of non-speech frames or when it reaches
+    ``max_recording_duration``. Segments shorter than ``min_speech_duration``
+    (trailing silence excluded) are discarded.
+
+    With ``partial_interval`` set, a partial window is emitted every
+    ``partial_interval`` seconds of recorded audio, each starting
+    ``partial_overlap`` seconds before the previous window ended.
+    """
+
+    def __init__(self, vad, rate: int = 16000, frame_duration: int = 30,
+                 silence_threshold: float = 2.0, min_speech_duration: float = 1.0,
+                 max_recording_duration: float = 45.0, partial_interval: Optional[float] = None,
+                 partial_overlap: float = 1.5):
+        self.vad = vad
+        self.rate = rate
+        self.frame_length = int(rate * frame_duration / 1000)
+        self.frame_seconds = self.frame_length / rate
+        self.silence_threshold = silence_threshold
+        self.min_speech_duration = min_speech_duration
+
+        # Preallocated audio buffers: VAD backlog (1s) and one full-length recording
+        self.audio_buffer = AudioRingBuffer(rate)
+        self.recording = SegmentRecorder(int(rate * max_recording_duration))
+
+        # Streaming windows (disabled when partial_interval is None)
+        self.partial_samples = int(rate * partial_interval) if partial_interval else 0
+        self.overlap_samples = int(rate * partial_overlap)
+
+        self.speech_detected = False
+        self.silence_duration = 0.0
+        self.segment_id = 0
+        self.windows_emitted = 0
+
+    @property
+    def speech_duration(self) -> float:
+        """Seconds of recorded audio in the current segment, trailing silence excluded"""
+        return len(self.recording) / self.rate - self.silence_duration
+
+    def feed(self, data: Union[bytes, np.ndarray]) -> List[SpeechSegment]:
+        """Process one chunk of int16 PCM and return the segments/windows it completed, in order"""
+        segments = []
+        self.audio_buffer.write(data)
+
+        # Run VAD over every complete frame in one pass; a partial frame waits for the next chunk
+        n_frames = len(self.audio_buffer) // self.frame_length
+        if n_frames == 0:
+            return segments
+
+        frames = frame_view(self.audio_buffer.read(n_frames * self.frame_length), self.frame_length)
+        speech_mask = self.vad.speech_mask(frames)
+
+        for frame, has_speech in zip(frames, speech_mask):
+            if has_speech:
+                if not self.speech_detected:
+                    logger.info("Speech detected, starting recording...")
+                    self.speech_detected = True
+                self.silence_duration = 0.0  # Reset silence counter
+
+            elif self.speech_detected:
+                self.silence_duration += self.frame_seconds
+
+                # Long silence detected, end recording
+                if self.silence_duration >= self.silence_threshold:
+                    logger.info("Silence detected for %.1fs, ending recording", self.silence_duration)
+                    self._finish(segments)
+                    continue
+
+            # Record exactly the frames VAD judged: speech plus short pauses after it
+            if self.speech_detected:
+                self.recording.append(frame)
+                if self.partial_samples and len(self.recording) >= self.partial_samples * (self.windows_emitted + 1):
+                    self._emit_partial(segments)
+                if self.recording.is_full:
+                    logger.info("Maximum recording duration (%.0fs) reached", self.recording.max_samples / self.rate)
+                    self._finish(segments)
+
+        return segments
+
+    def flush(self) -> List[SpeechSegment]:
+        """End any segment in progress (e.g. on shutdown)"""
+        segments = []
+        if self.speech_detected:
+            self._finish(segments)
+        return segments
+
+    def reset(self) -> None:
+        self.audio_buffer.clear()
+        self.recording.reset()
+        self.speech_detected = False
+        self.silence_duration = 0.0
+        self.windows_emitted = 0
+
+    def _window_start(self, index: int) -> int:
+        return max(0, index * self.partial_samples - self.overlap_samples)
+
+    def _emit_partial(self, segments: List[SpeechSegment]) -> None:
+        index = self.windows_emitted
+        end = self.partial_samples * (index + 1)
+        window = self.recording.view()[self._window_start(index):end].copy()
+        segments.append(SpeechSegment(window, self.segment_id, is_partial=True, window_index=index))
+        self.windows_emitted += 1
+
+    def _finish(self, segments: List[SpeechSegment]) -> None:
+        speech_duration = self.speech_duration
+        if speech_duration < self.min_speech_duration:
+            logger.info("Speech too short (%.1fs), skipping...", speech_duration)
+        else:
+            logger.info("Recorded %.1fs of speech", speech_duration)
+            # Copy out so the recorder can be reused for the next segment immediately
+            segments.append(SpeechSegment(
+                self.recording.view().copy(),
+                self.segment_id,
+                windows=self.windows_emitted,
+                tail_start=self._window_start(self.windows_emitted)
+            ))
+
+        self.recording.reset()
+        self.speech_detected = False
+        self.silence_duration = 0.0
+        self.windows_emitted = 0
+        self.segment_id += 1
@@ -4,73 +4,19 @@ Simple test script for announcement detection logic only
 This tests just the text-based announcement detection without audio processing
 """
 
-import re
+from announcement_classifier import classify_type, score
 
 class SimpleAnnouncementTester:
-    def __init__(self):
-        # Announcement keywords/patterns
-        self.announcement_patterns = [
-            r'\b(attention|announcement|notice|important|alert|urgent)\b',
-            r'\b(please note|kindly note|for your information|fyi)\b',
-            r'\b(all passengers|all students|all staff|all users|everyone)\b',
-            r'\b(boarding|departure|arrival|gate|platform|floor|room)\b',
-            r'\b(reminder|warning|caution|safety|emergency)\b',
-            r'\b(now boarding|final call|last call|delayed|cancelled)\b',
-            r'\b(meeting|event|session|break|lunch|closing)\b'
-        ]
-        
     def is_announcement(self, text: str) -> bool:
         """Determine if the transcribed text is likely an announcement"""
-        text_lower = text.lower()
-        
-        # Check for announcement patterns
-        for pattern in self.announcement_patterns:
-            if re.search(pattern, text_lower):
-                print(f"   Matched pattern: {pattern}")
-                return True
-        
-        # Additional heuristics for announcements:
-        
-        # 1. Length check - announcements are usually longer than casual conversation
-        if len(text.split()) < 5:
-            print(f"   Too short: {len(text.split())} words")
-            return False
-            
-        # 2. Formal language indicators
-        formal_indicators = ['please', 'kindly', 'thank you', 'ladies and gentlemen']
-        formal_count = sum(1 for indicator in formal_indicators if indicator in text_lower)
-        
-        # 3. Time-related announcements
-        time_indicators = ['minutes', 'hours', 'o\'clock', 'am', 'pm', 'schedule', 'time']
-        time_count = sum(1 for indicator in time_indicators if indicator in text_lower)
-        
-        # 4. Location/direction indicators
-        location_indicators = ['to', 'from', 'at', 'in', 'gate', 'platform', 'room', 'floor', 'building']
-        location_count = sum(1 for indicator in location_indicators if indicator in text_lower)
-        
-        # Score-based decision
-        score = formal_count * 2 + time_count + location_count
-        print(f"   Score: {score} (formal:{formal_count}, time:{time_count}, location:{location_count})")
-        
-        if score >= 3:
-            return True
-            
-        return False
+        result = score(text)
+        print(f"   Reason: {result.reason}, score {result.total_score:.1f} "
+              f"(formal:{result.features['formal']}, time:{result.features['time']}, location:{result.features['location']})")
+        return result.is_announcement
     
     def classify_announcement(self, text: str) -> str:
         """Classify the type of announcement"""
-        text_lower = text.lower()
-        
-        if any(word in text_lower for word in ['boarding', 'gate', 'departure', 'arrival', 'flight']):
-            return 'travel'
-        elif any(word in text_lower for word in ['meeting', 'session', 'conference', 'break']):
-            return 'meeting'
-        elif any(word in text_lower for word in ['emergency', 'evacuation', 'safety', 'alert']):
-            return 'emergency'
-        elif any(word in text_lower for word in ['reminder', 'notice', 'information']):
-            return 'general'
-        else:
-            return 'other'
+        return classify_type(text)
 
 def test_announcement_detection():
     """Test the announcement detection with sample texts"""
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Streaming partial transcription helpers
+Stitches transcripts of overlapping audio windows into one running transcript
+"""
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (device_id, segment_id): segment ids are only unique per device
+SegmentKey = Tuple[str, int]
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r'[^\w]', '', word.lower())
+
+
+def stitch_transcripts(previous: str, new: str, max_overlap_words: int = 8) -> str:
+    """Append ``new`` to ``previous``, removing words repeated by the window overlap"""
+    previous_words = previous.split()
+    new_words = new.split()
+    if not previous_words:
+        return new.strip()
+    if not new_words:
+        return previous.strip()
+
+    previous_norm = [_normalize(w) for w in previous_words[-max_overlap_words:]]
+    new_norm = [_normalize(w) for w in new_words[:max_overlap_words]]
+
+    # Longest suffix of the previous text that is also a prefix of the new text
+    overlap = 0
+    for k in range(min(len(previous_norm), len(new_norm)), 0, -1):
+        if previous_norm[-k:] == new_norm[:k]:
+            overlap = k
+            break
+
+    return " ".join(previous_words + new_words[overlap:])
+
+
+class StreamingTranscripts:
+    """Per-segment window transcripts, stitched in window order.
+
+    ASR workers add window transcripts as they finish; ``text()`` returns the
+    stitched transcript of the contiguous windows received so far. Once a
+    segment is finished or discarded, windows that arrive late for it are
+    ignored instead of starting a new entry that nothing would remove.
+    """
+
+    def __init__(self, max_overlap_words: int = 8, max_closed: int = 1024):
+        self.max_overlap_words = max_overlap_words
+        self.max_closed = max_closed
+        self._windows: Dict[SegmentKey, Dict[int, str]] = {}
+        self._closed: 'OrderedDict[SegmentKey, None]' = OrderedDict()  # Recently finalised, oldest first
+        self._lock = threading.Lock()
+
+    def add_window(self, key: SegmentKey, window_index: int, text: Optional[str]) -> bool:
+        """Store a window transcript; False (and nothing stored) if the segment was already finalised"""
+        with self._lock:
+            if key in self._closed:
+                return False
+            self._windows.setdefault(key, {})[window_index] = text or ""
+            return True
+
+    def has_windows(self, key: SegmentKey, count: int, pending: Iterable[int] = ()) -> bool:
+        """True if windows 0..count-1 have all been transcribed (or are in ``pending``)"""
+        with self._lock:
+            windows = set(self._windows.get(key, {})) | set(pending)
+            return all(i in windows for i in range(count))
+
+    def text(self, key: SegmentKey) -> str:
+        with self._lock:
+            windows = self._windows.get(key, {})
+            texts: List[str] = []
+            index = 0
+            while index in windows:
+                texts.append(windows[index])
+                index += 1
+
+        stitched = ""
+        for text in texts:
+            stitched = stitch_transcripts(stitched, text, self.max_overlap_words)
+        return stitched
+
+    def finish(self, key: SegmentKey) -> str:
+        """Return the final stitched transcript and forget the segment"""
+        stitched = self.text(key)
+        self.discard(key)
+        return stitched
+
+    def discard(self, key: SegmentKey):
+        """Forget the segment and ignore any of its windows still in flight"""
+        with self._lock:
+            self._windows.pop(key, None)
+            self._closed[key] = None
+            self._closed.move_to_end(key)
+            if len(self._closed) > self.max_closed:
+                self._closed.popitem(last=False)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Test script for the reference announcement index
+Replays synthetic speech-like clips under white noise and checks which are recognized, without any recordings
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import numpy as np
+
+from announcement_index import AnnouncementIndex, check_noisy_replays
+from features import SAMPLE_RATE, SegmentFeatures
+
+
+def speech_like(seconds, seed):
+    """Voiced syllables: a gliding harmonic series shaped by three random formants, with pauses between"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    audio = np.zeros_like(t)
+    start = 0.0
+    while start < seconds:
+        length = rng.uniform(0.12, 0.3)
+        pitch = rng.uniform(100, 220)
+        formants = rng.uniform([300, 900, 2000], [900, 2200, 3200])
+        mask = (t >= start) & (t < start + length)
+        local = t[mask] - start
+        envelope = np.sin(np.pi * local / length)
+        for harmonic in range(1, 30):
+            gain = np.exp(-((pitch * harmonic - formants) / 150) ** 2).sum()
+            audio[mask] += gain * np.sin(2 * np.pi * pitch * harmonic * (1 + 0.05 * local) * local) * envelope
+        start += length + rng.uniform(0.02, 0.15)
+    return (0.1 * audio / np.abs(audio).max()).astype(np.float32)
+
+
+def test_noisy_replays():
+    """Replays of indexed clips should be recognized through moderate noise, and nothing else should be"""
+
+    clips = {f"announcement_{i}.wav": speech_like(8, i) for i in range(12)}
+    index = AnnouncementIndex()
+    for name, audio in clips.items():
+        index.add(name, audio, f"transcript of {name}")
+
+    print("\n🔊 Testing Noisy Replays Against the Reference Index\n")
+    print("=" * 60)
+    print(f"Threshold {index.threshold:.2f}, {len(clips)} references\n")
+
+    # (noise amplitude, replays that must be recognized)
+    expected_matches = {0.0: len(clips), 0.005: len(clips), 0.01: len(clips), 0.02: len(clips) // 2}
+    results = check_noisy_replays(index, clips, levels=(0.005, 0.01, 0.02))
+    for level, result in results.items():
+        own = np.median(result['own'])
+        other = max(result['other'])
+        ok = result['matched'] >= expected_matches[level] and other < index.threshold
+        print(f"{'✅' if ok else '❌'} Noise {level}: own score median {own:.3f}, best other {other:.3f}, "
+              f"matched {result['matched']}/{len(clips)} (expected at least {expected_matches[level]})")
+
+    # Clips that were never indexed, clean and noisy, must fall back to Whisper
+    rng = np.random.default_rng(1)
+    false_matches = 0
+    for seed in range(100, 112):
+        audio = speech_like(8, seed)
+        for level in (0.0, 0.01):
+            noisy = audio + (level * rng.standard_normal(len(audio))).astype(np.float32)
+            false_matches += index.match(SegmentFeatures(noisy)) is not None
+    print(f"{'✅' if false_matches == 0 else '❌'} Unindexed clips matched: {false_matches}/24 (expected 0)")
+
+    # A fragment of a reference must not return the whole stored transcript
+    fragment = clips['announcement_0.wav'][:3 * SAMPLE_RATE]
+    result = index.match(SegmentFeatures(fragment))
+    print(f"{'✅' if result is None else '❌'} 3s fragment of an 8s reference: "
+          f"{'no match' if result is None else result.name} (expected no match)")
+
+
+if __name__ == "__main__":
+    try:
+        test_noisy_replays()
+    except KeyboardInterrupt:
+        print("\n\nTest interrupted by user.")
+    except Exception as e:
+        print(f"\nError during testing: {e}")
@@ -45,11 +45,12 @@ def test_announcement_detection():
     total_tests = len(test_cases)
     
     for i, (text, expected) in enumerate(test_cases, 1):
-        result = transcriber.is_announcement(text)
+        analysis = transcriber.analyze_transcription(text)
+        result = analysis.is_announcement
         is_correct = result == expected
         
         status = "✅ CORRECT" if is_correct else "❌ WRONG"
-        announcement_type = transcriber.classify_announcement(text) if result else "N/A"
+        announcement_type = analysis.announcement_type if result else "N/A"
         
         print(f"Test {i:2d}: {status}")
         print(f"   Text: '{text}'")
@@ -101,10 +102,46 @@ def test_classification():
         print(f"   Detected: {detected_type}")
         print()
 
+def test_early_alerts():
+    """Partial transcripts alert early on critical wording, whatever type the rest of the text suggests"""
+    import numpy as np
+    from segmenter import SpeechSegment
+    
+    transcriber = LiveAudioTranscriber()
+    
+    # (partial transcript, should alert before the speaker finishes)
+    test_cases = [
+        ("Attention passengers, evacuate gate B immediately", True),  # Worded like travel
+        ("There is a fire on the second floor, please leave the building", True),
+        ("Code red, code red in the main hall", True),
+        ("Emergency evacuation required", True),
+        ("Flight 123 is now boarding at gate 5", False),
+        ("Attention passengers, the flight has been delayed", False),
+        ("He got fired from the restaurant last week", False),
+    ]
+    
+    print("\n🚨 Testing Early Alerts on Partial Transcripts\n")
+    print("=" * 60)
+    
+    for segment_id, (text, expected) in enumerate(test_cases):
+        item = {
+            'device_id': 'test', 'key': ('test', segment_id), 'transcription': text,
+            'segment': SpeechSegment(np.zeros(0, dtype=np.int16), segment_id, is_partial=True, window_index=1)
+        }
+        alerted = bool(transcriber.classify_transcription(item))
+        status = "✅" if alerted == expected else "❌"
+        severity = f" ({item['analysis'].severity})" if alerted else ""
+        
+        print(f"{status} Text: '{text}'")
+        print(f"   Expected: {'alert' if expected else 'no alert'}")
+        print(f"   Detected: {'alert' + severity if alerted else 'no alert'}")
+        print()
+
 if __name__ == "__main__":
     try:
         test_announcement_detection()
         test_classification()
+        test_early_alerts()
     except KeyboardInterrupt:
         print("\n\nTest interrupted by user.")
     except Exception as e:
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Test script for the live pipeline's building blocks
+Checks segmentation, window stitching, fair queueing, the ring buffer, the transcript cache and the
+compiled classifier on synthetic input, without a microphone, Whisper or Supabase
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(__file__))
+
+import queue
+import tempfile
+
+import numpy as np
+
+from announcement_classifier import AnnouncementClassifier, load_rules, reference_is_announcement, transcript_corpus
+from audio_buffer import AudioRingBuffer
+from pipeline import FairQueue
+from segmenter import SpeechSegmenter
+from streaming import StreamingTranscripts, stitch_transcripts
+from test_announcement_index import speech_like
+from transcription_cache import TranscriptionCache
+from vad import EnergyVAD
+
+RATE = 16000
+
+
+def check(ok, description):
+    print(f"{'✅' if ok else '❌'} {description}")
+    return ok
+
+
+def loud(seconds):
+    """Int16 ramp every energy VAD calls speech (distinct sample values, so a misplaced slice doesn't compare equal)"""
+    return (1000 + np.arange(int(seconds * RATE)) % 30000).astype(np.int16)
+
+
+def silence(seconds):
+    return np.zeros(int(seconds * RATE), dtype=np.int16)
+
+
+def feed(segmenter, *parts, chunk=1024):
+    """Feed audio the way the capture loop does, ``chunk`` samples at a time (the VAD backlog holds 1s)"""
+    audio = np.concatenate(parts)
+    segments = []
+    for start in range(0, len(audio), chunk):
+        segments.extend(segmenter.feed(audio[start:start + chunk]))
+    return segments
+
+
+def test_segmenter():
+    """Short blips are dropped, long speech is cut at the maximum, partial windows overlap as configured"""
+
+    print("\n✂️  Testing Speech Segmentation\n")
+    print("=" * 60)
+
+    segmenter = SpeechSegmenter(EnergyVAD(300), min_speech_duration=1.0, silence_threshold=2.0)
+    segments = feed(segmenter, loud(0.5), silence(2.5))
+    check(segments == [], f"0.5s of speech is dropped (min 1.0s): {len(segments)} segments")
+
+    segments = feed(segmenter, loud(1.5), silence(2.5))
+    duration = len(segments[0].audio) / RATE if segments else 0.0
+    check(len(segments) == 1 and 1.5 <= duration < 1.5 + 2.0 and not segments[0].is_partial,
+          f"1.5s of speech then silence is one final segment: {len(segments)} segment(s), {duration:.2f}s "
+          f"(speech plus the pause before the 2.0s silence threshold)")
+
+    segmenter = SpeechSegmenter(EnergyVAD(300), max_recording_duration=3.0)
+    segments = feed(segmenter, loud(7.5)) + segmenter.flush()
+    lengths = [len(segment.audio) / RATE for segment in segments]
+    check(lengths == [3.0, 3.0, 1.5], f"7.5s of continuous speech is cut at the 3s maximum: {lengths}")
+    check([segment.segment_id for segment in segments] == [0, 1, 2], "Each cut starts a new segment id")
+
+    # 3.5s of speech and the 0.48s pause before the 0.5s silence threshold: windows end at 1s, 2s and 3s
+    segmenter = SpeechSegmenter(EnergyVAD(300), silence_threshold=0.5, partial_interval=1.0, partial_overlap=0.25)
+    audio = loud(3.5)
+    segments = feed(segmenter, audio, silence(1.0))
+    partials = [segment for segment in segments if segment.is_partial]
+    expected = [(0, 16000), (12000, 32000), (28000, 48000)]  # Each window starts 0.25s before the last one ended
+    placed = [np.array_equal(segment.audio, audio[start:end]) for segment, (start, end) in zip(partials, expected)]
+    check(len(partials) == 3 and all(placed) and [segment.window_index for segment in partials] == [0, 1, 2],
+          f"Partial windows every 1s with 0.25s overlap: {len(partials)} windows, samples "
+          f"{', '.join(f'{start}-{end}' for start, end in expected)} {'match' if all(placed) else 'do not match'}")
+    final = segments[-1]
+    check(not final.is_partial and final.windows == 3 and final.tail_start == 44000,
+          f"Final segment records 3 windows and its tail from sample 44000: "
+          f"windows={final.windows}, tail_start={final.tail_start}")
+
+
+def test_streaming():
+    """Window transcripts are stitched in order without repeating the overlap, and late windows are ignored"""
+
+    print("\n🧵 Testing Streaming Transcripts\n")
+    print("=" * 60)
+
+    stitched = stitch_transcripts("Attention all passengers on flight", "on flight 12, now boarding")
+    check(stitched == "Attention all passengers on flight 12, now boarding", f"Overlap removed once: '{stitched}'")
+
+    transcripts = StreamingTranscripts()
+    key = ('gate-5', 7)
+    transcripts.add_window(key, 1, "flight 12 is now boarding")
+    check(transcripts.text(key) == "", "Window 1 alone is held back until window 0 arrives")
+    check(transcripts.has_windows(key, 2, pending=[0]), "Windows 0..1 count as covered with 0 still pending")
+    transcripts.add_window(key, 0, "attention passengers flight 12")
+    text = transcripts.finish(key)
+    check(text == "attention passengers flight 12 is now boarding", f"Windows stitched in window order: '{text}'")
+
+    late = transcripts.add_window(key, 2, "at gate 5")
+    check(not late and transcripts.text(key) == "", "A window arriving after finish() is dropped")
+    transcripts.discard(('gate-5', 8))
+    check(not transcripts.add_window(('gate-5', 8), 0, "cancelled"), "A window for a discarded segment is dropped")
+
+
+def test_fair_queue():
+    """Items are served round-robin across keys, in order within a key, and the bound is enforced"""
+
+    print("\n⚖️  Testing Fair Queue\n")
+    print("=" * 60)
+
+    fair = FairQueue(maxsize=5, key=lambda item: item[0])
+    for item in ['a1', 'a2', 'a3', 'b1', 'c1']:
+        fair.put(item)
+    try:
+        fair.put_nowait('d1')
+        full = False
+    except queue.Full:
+        full = True
+    check(full, "A sixth item does not fit a queue of 5")
+
+    order = [fair.get_nowait() for _ in range(5)]
+    check(order == ['a1', 'b1', 'c1', 'a2', 'a3'], f"Busy key 'a' does not starve the others: {order}")
+    check(fair.empty(), "Queue is empty afterwards")
+
+
+def test_ring_buffer():
+    """Reads across the wrap point are contiguous and in order; overflow keeps the newest samples"""
+
+    print("\n🔁 Testing Audio Ring Buffer\n")
+    print("=" * 60)
+
+    ring = AudioRingBuffer(8)
+    ring.write(np.arange(6, dtype=np.int16))
+    first = ring.read(4).tolist()
+    ring.write(np.arange(6, 11, dtype=np.int16))  # Wraps past the end of the backing array
+    wrapped = ring.read(7).tolist()
+    check(first == [0, 1, 2, 3] and wrapped == [4, 5, 6, 7, 8, 9, 10], f"Read across the wrap: {first} + {wrapped}")
+
+    ring.write(np.arange(20, 25, dtype=np.int16))
+    dropped = ring.write(np.arange(25, 30, dtype=np.int16).tobytes())
+    kept = ring.peek(8).tolist()
+    check(dropped == 2 and kept == list(range(22, 30)),
+          f"Overflow overwrites the oldest unread samples: dropped {dropped}, kept {kept}")
+
+    dropped = ring.write(np.arange(40, 50, dtype=np.int16))
+    kept = ring.peek(8).tolist()
+    check(dropped == 10 and kept == list(range(42, 50)) and ring.dropped_samples == 12,
+          f"One write larger than the buffer keeps its newest 8: dropped {dropped}, kept {kept}, "
+          f"{ring.dropped_samples} dropped in total")
+
+
+def test_transcript_cache():
+    """Exact repeats hit the memory tier, replays hit the fingerprint tier, other audio misses"""
+
+    print("\n🗄️  Testing Transcript Cache\n")
+    print("=" * 60)
+
+    cache = TranscriptionCache(max_entries=2)
+    cache.put('m|a', "first")
+    cache.put('m|b', "second")
+    cache.get('m|a')
+    cache.put('m|c', "third")  # Evicts 'm|b', the least recently used
+    check(cache.get('m|a') == "first" and cache.get('m|b') is None and cache.evictions == 1,
+          "Memory tier keeps the 2 most recently used keys")
+
+    audio = speech_like(6, 0)
+    with tempfile.TemporaryDirectory() as disk_dir:
+        cache = TranscriptionCache(disk_dir=disk_dir)
+        cache.store('base:fp32:balanced', audio, "gate 12 is now boarding")
+        padded = np.concatenate([np.zeros(RATE // 2, dtype=np.float32), audio])
+        check(cache.lookup('base:fp32:balanced', padded) == "gate 12 is now boarding" and cache.memory_hits == 1,
+              "Same recording with leading silence is an exact hit")
+
+        replay = audio + (0.005 * np.random.default_rng(0).standard_normal(len(audio))).astype(np.float32)
+        check(cache.lookup('base:fp32:balanced', replay) == "gate 12 is now boarding" and cache.replay_hits == 1,
+              "Noisy replay of it hits the fingerprint tier")
+        check(cache.lookup('base:fp32:balanced', speech_like(6, 1)) is None, "A different recording misses")
+        check(cache.lookup('small:fp32:balanced', audio) is None, "Another model's namespace misses")
+        cache.close()
+
+        reopened = TranscriptionCache(disk_dir=disk_dir)
+        check(reopened.lookup('base:fp32:balanced', audio) == "gate 12 is now boarding" and reopened.disk_hits == 1,
+              "Disk tier serves it after a restart")
+        fresh_replay = audio + (0.005 * np.random.default_rng(1).standard_normal(len(audio))).astype(np.float32)
+        check(reopened.lookup('base:fp32:balanced', fresh_replay) == "gate 12 is now boarding",
+              "Replay fingerprints are reloaded from disk")
+        reopened.close()
+
+
+def test_classifier_agreement():
+    """The compiled classifier makes the same decisions as the original rule-by-rule logic"""
+
+    print("\n🧮 Testing Classifier Agreement With the Original Rules\n")
+    print("=" * 60)
+
+    rules = load_rules()
+    classifier = AnnouncementClassifier(rules)
+    texts = transcript_corpus() + [
+        "", "   ", "ATTENTION!!! Gate 5.", "attention", "Fire drill at 3 PM, please evacuate calmly",
+        "I think the flight to Paris is boarding now, right?", "Passengers... please proceed to gate B12"
+    ]
+    expected = [reference_is_announcement(text, rules) for text in texts]
+    for name, decisions in [
+        ('score', [classifier.score(text).is_announcement for text in texts]),
+        ('analyze', [classifier.analyze(text).is_announcement for text in texts]),
+        ('score_many', [result.is_announcement for result in classifier.score_many(texts)]),
+    ]:
+        mismatches = [text for text, got, want in zip(texts, decisions, expected) if got != want]
+        check(not mismatches, f"{name}: {len(texts) - len(mismatches)}/{len(texts)} decisions agree"
+                              + (f" (first mismatch: '{mismatches[0]}')" if mismatches else ""))
+
+
+if __name__ == "__main__":
+    try:
+        test_segmenter()
+        test_streaming()
+        test_fair_queue()
+        test_ring_buffer()
+        test_transcript_cache()
+        test_classifier_agreement()
+    except KeyboardInterrupt:
+        print("\n\nTest interrupted by user.")
+    except Exception as e:
+        print(f"\nError during testing: {e}")
@@ -3,134 +3,14 @@
 Final optimized announcement detection with analysis of remaining errors
 """
 
-import re
+from announcement_classifier import is_announcement
 
 class FinalOptimizedTester:
-    def __init__(self):
-        # Enhanced announcement patterns
-        self.announcement_patterns = [
-            r'\b(attention|announcement|notice|important|alert|urgent)\b',
-            r'\b(please note|kindly note|for your information|fyi)\b',
-            r'\b(all passengers|all students|all staff|all users|everyone)\b',
-            r'\b(boarding|departure|arrival|gate|platform|floor|room)\b',
-            r'\b(reminder|warning|caution|safety|emergency)\b',
-            r'\b(now boarding|final call|last call|delayed|cancelled)\b',
-            r'\b(meeting|event|session|break|lunch|closing)\b'
-        ]
-        
+    """The production announcement rules (announcement_classifier), as used by the live and offline systems"""
+
     def is_announcement(self, text: str) -> bool:
         """Final optimized announcement detection"""
-        text_lower = text.lower()
-        
-        # Immediate conversation indicators (very strong)
-        immediate_conversation = [
-            r'\b(i think|i feel|i believe|maybe|perhaps)\b',
-            r'\b(can you|could you|would you|will you|do you)\b',
-            r'\b(i like|i love|i hate|i prefer|i want|i need)\b',
-            r'\b(let\'s|we should|should we|why don\'t we)\b',
-            r'\b(i heard|someone said|i wonder)\b',
-            r'\b(my |our |your )(flight|train|meeting|appointment)\b',
-            r'\b(really (nice|good|bad|great|loud))\b',
-            r'\bisn\'t it\b',
-            r'\bright\?\b',
-            r'\bwhat do you think\b',
-            r'\bif you need me\b',
-            r'\bwent (well|badly|great)\b'
-        ]
-        
-        # Check for immediate conversation indicators
-        for pattern in immediate_conversation:
-            if re.search(pattern, text_lower):
-                return False
-        
-        # Strong announcement indicators (override most other logic)
-        strong_announcement = [
-            r'\b(attention|ladies and gentlemen|code (red|blue|green))\b',
-            r'\b(all (passengers|students|staff|visitors|everyone))\b',
-            r'\b(please note|for your information)\b',
-            r'\b(final call|now boarding|last call)\b',
-            r'\b(emergency|evacuation|drill)\b'
-        ]
-        
-        strong_announcement_score = 0
-        for pattern in strong_announcement:
-            if re.search(pattern, text_lower):
-                strong_announcement_score += 1
-        
-        if strong_announcement_score > 0:
-            return True
-        
-        # Check for regular announcement patterns
-        announcement_score = 0
-        for pattern in self.announcement_patterns:
-            if re.search(pattern, text_lower):
-                announcement_score += 1
-        
-        # Length requirements for announcements
-        words = text.split()
-        word_count = len(words)
-        
-        if word_count < 6:  # Increased minimum length
-            return False
-        
-        # Formal/public language indicators
-        formal_indicators = [
-            'please', 'kindly', 'we would like to', 'we are pleased to',
-            'due to', 'as a result of', 'effective immediately',
-            'will be', 'has been', 'have been', 'is now', 'are now'
-        ]
-        formal_count = sum(1 for indicator in formal_indicators if indicator in text_lower)
-        
-        # Public service language
-        public_service = [
-            'passengers', 'students', 'staff', 'visitors', 'customers',
-            'will be closed', 'will be open', 'is currently', 'are currently',
-            'please complete', 'please proceed', 'please stand',
-            'must sign in', 'must have', 'required to'
-        ]
-        public_count = sum(1 for indicator in public_service if indicator in text_lower)
-        
-        # Time/location indicators for announcements
-        time_indicators = ['minutes', 'hours', 'pm', 'am', 'today', 'tomorrow', 'now', 'currently']
-        time_count = sum(1 for indicator in time_indicators if indicator in text_lower)
-        
-        location_indicators = ['gate', 'platform', 'room', 'floor', 'hall', 'building', 'area']
-        location_count = sum(1 for indicator in location_indicators if indicator in text_lower)
-        
-        # Sentence structure analysis
-        structure_score = 0
-        
-        # Announcements often start formally
-        first_words = text_lower.split()[:2]
-        if first_words:
-            if first_words[0] in ['attention', 'please', 'all', 'the', 'passengers', 'students']:
-                structure_score += 2
-            elif first_words[0] in ['due', 'we', 'this']:
-                structure_score += 1
-        
-        # Passive voice and formal constructions
-        if any(phrase in text_lower for phrase in ['will be', 'has been', 'have been', 'is being', 'are being']):
-            structure_score += 1
-        
-        # Calculate comprehensive score
-        total_score = (
-            announcement_score * 2 +
-            formal_count * 1.5 +
-            public_count * 2 +
-            time_count * 0.8 +
-            location_count * 1.0 +
-            structure_score
-        )
-        
-        # Decision thresholds
-        if announcement_score >= 1 and total_score >= 4:
-            return True
-        elif formal_count >= 2 and public_count >= 1:
-            return True
-        elif total_score >= 6:
-            return True
-        else:
-            return False
+        return is_announcement(text)
 
 def create_test_dataset():
     """Test dataset with focus on the 8 remaining error cases"""
@@ -6,154 +6,14 @@ This imports the actual LiveAudioTranscriber class to test the real implementati
 
 import sys
 import os
-import re
 
-# Simple version of the improved detection for testing (without audio dependencies)
+from announcement_classifier import is_announcement
+
+# The production detection (announcement_classifier), without LiveAudioTranscriber's audio dependencies
 class ImprovedAnnouncementTester:
-    def __init__(self):
-        # Enhanced announcement patterns
-        self.announcement_patterns = [
-            r'\b(attention|announcement|notice|important|alert|urgent)\b',
-            r'\b(please note|kindly note|for your information|fyi)\b',
-            r'\b(all passengers|all students|all staff|all users|everyone)\b',
-            r'\b(boarding|departure|arrival|gate|platform|floor|room)\b',
-            r'\b(reminder|warning|caution|safety|emergency)\b',
-            r'\b(now boarding|final call|last call|delayed|cancelled)\b',
-            r'\b(meeting|event|session|break|lunch|closing)\b'
-        ]
-        
     def is_announcement(self, text: str) -> bool:
         """Enhanced announcement detection with improved conversational filtering"""
-        text_lower = text.lower()
-        
-        # Strong conversational indicators that should override announcement detection
-        strong_conversation_patterns = [
-            r'\b(i think|i feel|i believe|in my opinion|personally|maybe|perhaps)\b',
-            r'\b(how are you|what\'s up|hey|hi|hello|bye|goodbye)\b',
-            r'\b(can you|could you|would you|will you|do you)\b',
-            r'\b(i like|i love|i hate|i prefer|i want|i need)\b',
-            r'\b(let\'s|we should|should we|why don\'t we)\b',
-            r'\b(i heard|someone said|they say|rumors are)\b',
-            r'\b(i wonder|i\'m wondering|wondering if)\b',
-            r'\b(my |our |your )(flight|train|meeting|appointment)\b',  # Personal ownership
-            r'\b(the .+ (is|was|will be) (nice|good|bad|terrible|great))\b',  # Personal opinions
-            r'\bwhat do you think\b',
-            r'\bisn\'t it\b',
-            r'\bright\?\b'
-        ]
-        
-        # Check for strong conversational indicators first
-        conversation_score = 0
-        for pattern in strong_conversation_patterns:
-            if re.search(pattern, text_lower):
-                conversation_score += 2
-        
-        # Additional conversational context indicators
-        casual_indicators = [
-            r'\b(oh|ah|um|uh|well|so|anyway|actually|really)\b',
-            r'\b(thanks|thank you) (for|that)\b',
-            r'\b(sorry|excuse me)\b',
-            r'\bif you need me\b',
-            r'\bwent (well|badly|great)\b'
-        ]
-        
-        for pattern in casual_indicators:
-            if re.search(pattern, text_lower):
-                conversation_score += 1
-        
-        # If strong conversational indicators, likely not an announcement
-        if conversation_score >= 3:
-            return False
-        
-        # Check for announcement patterns
-        announcement_score = 0
-        matched_patterns = []
-        
-        for pattern in self.announcement_patterns:
-            if re.search(pattern, text_lower):
-                announcement_score += 2
-                matched_patterns.append(pattern)
-        
-        # Length check - announcements are usually substantial
-        words = text.split()
-        word_count = len(words)
-        
-        if word_count < 5:
-            return False
-        elif word_count < 8:
-            announcement_score -= 1
-        
-        # Formal structure indicators
-        formal_indicators = [
-            'please', 'kindly', 'thank you', 'ladies and gentlemen',
-            'we would like to', 'we are pleased to', 'we regret to',
-            'due to', 'as a result of', 'in order to', 'effective immediately',
-            'passengers are', 'customers are', 'students are', 'staff are'
-        ]
-        formal_count = sum(1 for indicator in formal_indicators if indicator in text_lower)
-        
-        # Time-related indicators
-        time_indicators = [
-            'minutes', 'hours', 'o\'clock', 'am', 'pm', 'schedule', 'time',
-            'today', 'tomorrow', 'yesterday', 'now', 'soon', 'shortly',
-            'immediately', 'currently', 'presently', 'at this time'
-        ]
-        time_count = sum(1 for indicator in time_indicators if indicator in text_lower)
-        
-        # Location/direction indicators
-        location_indicators = [
-            'gate', 'platform', 'room', 'floor', 'building', 'terminal',
-            'departure', 'arrival', 'lounge', 'hall', 'auditorium',
-            'entrance', 'exit', 'left', 'right', 'upstairs', 'downstairs'
-        ]
-        location_count = sum(1 for indicator in location_indicators if indicator in text_lower)
-        
-        # Enhanced sentence structure analysis
-        structure_score = 0
-        
-        # Announcements often start with attention-grabbing words
-        first_words = text_lower.split()[:3]
-        if first_words:
-            if first_words[0] in ['attention', 'notice', 'announcement', 'important', 'please', 'all', 'ladies', 'dear']:
-                structure_score += 3
-            elif any(word in ['will', 'are', 'is'] for word in first_words):
-                structure_score += 1
-        
-        # Announcements often use formal/declarative language
-        if any(phrase in text_lower for phrase in ['will be', 'are', 'is now', 'has been', 'have been']):
-            structure_score += 1
-        
-        # Public address indicators
-        public_address_score = 0
-        if any(phrase in text_lower for phrase in [
-            'all passengers', 'all students', 'all staff', 'everyone',
-            'ladies and gentlemen', 'your attention', 'please note'
-        ]):
-            public_address_score += 3
-        
-        # Calculate total score with weighted components
-        total_score = (
-            announcement_score +           # Direct announcement patterns (weight: 2 each)
-            formal_count * 1.5 +          # Formal language
-            time_count * 1.0 +            # Time references
-            location_count * 0.8 +        # Location references
-            structure_score +             # Sentence structure
-            public_address_score -        # Public address indicators
-            conversation_score * 1.5      # Penalty for conversational language
-        )
-        
-        # Decision logic with stricter thresholds
-        if announcement_score >= 2:  # Direct pattern match
-            if conversation_score <= 1:  # Low conversational score
-                return True
-            else:
-                return False
-        elif total_score >= 6 and conversation_score == 0:  # High score, no conversation
-            return True
-        elif total_score >= 4 and conversation_score == 0 and formal_count >= 1:  # Medium score, formal language
-            return True
-        else:
-            return False
+        return is_announcement(text)
 
 def create_test_dataset():
     """Create the same test dataset for comparison"""
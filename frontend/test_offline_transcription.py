@@ -33,8 +33,9 @@ def test_offline_transcription():
     
     for i, text in enumerate(test_cases, 1):
         print(f"\nTest {i}: '{text}'")
-        is_announcement = transcriber.is_announcement(text)
-        announcement_type = transcriber.classify_announcement(text) if is_announcement else "N/A"
+        analysis = transcriber.analyze_transcription(text)
+        is_announcement = analysis.is_announcement
+        announcement_type = analysis.announcement_type if is_announcement else "N/A"
         
         status = "🔊 ANNOUNCEMENT" if is_announcement else "💬 CONVERSATION"
         print(f"Result: {status} (Type: {announcement_type})")
@@ -0,0 +1,284 @@
+#!/usr/bin/env python3
+"""
+Transcription cache shared by the live and offline transcribers
+Audio that was transcribed before skips Whisper: an exact hash of the normalized samples catches re-processed files,
+and peak fingerprints of recently transcribed segments (announcement_index) catch acoustic replays of the same
+recording, which never repeat sample for sample. Both tiers are kept across restarts with TRANSCRIPT_CACHE_DIR.
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+import wave
+from collections import OrderedDict
+from typing import Dict, Optional
+
+import numpy as np
+
+from announcement_index import AnnouncementIndex
+from features import SegmentFeatures
+
+logger = logging.getLogger(__name__)
+
+
+def pcm_fingerprint(audio: np.ndarray, silence_ratio: float = 0.02) -> str:
+    """Hash of a float32 segment after normalization.
+
+    Leading/trailing samples below ``silence_ratio`` of the peak are trimmed,
+    then DC is removed and the level peak-normalized before quantizing to
+    8 bits, so the same recording with different silence padding, DC offset
+    or (rounding permitting) output level hashes identically. Any acoustic
+    difference changes the key; replays are left to the fingerprint tier.
+    """
+    samples = np.asarray(audio, dtype=np.float32)
+    peak = float(np.max(np.abs(samples))) if samples.size else 0.0
+    if peak > 0:
+        loud = np.flatnonzero(np.abs(samples) >= peak * silence_ratio)
+        samples = samples[loud[0]:loud[-1] + 1]
+        samples = samples - samples.mean()
+        peak = float(np.max(np.abs(samples)))
+        if peak > 0:
+            samples = samples / peak
+    quantized = np.round(samples * 127).astype(np.int8)
+    return hashlib.blake2b(quantized.tobytes(), digest_size=16).hexdigest()
+
+
+def cache_namespace(model_name: str, profile: str) -> str:
+    """Namespace for transcripts of a model and decoding profile, from configuration (WHISPER_QUANTIZE).
+
+    Nothing here touches the engine, so a cache hit never waits for Whisper to load.
+    """
+    precision = 'int8' if os.getenv('WHISPER_QUANTIZE', 'false').lower() == 'true' else 'fp32'
+    return f"{model_name}:{precision}:{profile}"
+
+
+def file_fingerprint(path: str) -> str:
+    """PCM fingerprint of a 16-bit WAV file, or a hash of the raw bytes for anything else"""
+    try:
+        with wave.open(path, 'rb') as wf:
+            if wf.getsampwidth() == 2:
+                samples = np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)
+                if wf.getnchannels() > 1:
+                    samples = samples.reshape(-1, wf.getnchannels()).mean(axis=1)
+                fingerprint = pcm_fingerprint(samples.astype(np.float32) / 32768.0)
+                return fingerprint if wf.getframerate() == 16000 else f"{wf.getframerate()}:{fingerprint}"
+    except (wave.Error, EOFError):
+        pass
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return f"file:{digest.hexdigest()}"
+
+
+class TranscriptionCache:
+    """Two-tier LRU cache of transcripts keyed by audio fingerprint, plus a replay tier.
+
+    The memory tier holds ``max_entries`` transcripts; the optional disk tier
+    (a SQLite file in ``disk_dir``) survives restarts and holds up to
+    ``max_disk_entries``. Entries older than ``ttl_seconds`` are treated as
+    misses. Transcripts depend on the model and decoding settings, so callers
+    pass those in ``namespace`` (see ``cache_namespace``).
+
+    ``lookup``/``store`` take the audio itself: after the exact key they try
+    the peak fingerprints of the last ``max_replays`` transcribed segments of
+    the namespace, so a replayed recording hits even though its samples
+    differ. That tier is saved to ``disk_dir`` by ``close``.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None,
+                 disk_dir: Optional[str] = None, max_disk_entries: int = 10000, max_replays: int = 200):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.max_replays = max_replays
+        self.disk_dir = disk_dir
+        self._memory: 'OrderedDict[str, tuple]' = OrderedDict()
+        self._replays: Dict[str, Optional[AnnouncementIndex]] = {}  # None: nothing saved for the namespace yet
+        self._lock = threading.Lock()
+        self._db = None
+
+        if disk_dir:
+            os.makedirs(disk_dir, exist_ok=True)
+            self._db = sqlite3.connect(os.path.join(disk_dir, 'transcripts.sqlite3'), check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS transcripts "
+                "(key TEXT PRIMARY KEY, text TEXT NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+            )
+            self._db.commit()
+
+        # Metrics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.replay_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def key(namespace: str, fingerprint: str) -> str:
+        return f"{namespace}|{fingerprint}"
+
+    def _expired(self, created: float, now: float) -> bool:
+        return bool(self.ttl_seconds) and now - created > self.ttl_seconds
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached transcript (possibly empty for known silence/noise), or None on a miss"""
+        with self._lock:
+            text = self._get(key)
+            if text is None:
+                self.misses += 1
+            return text
+
+    def _get(self, key: str) -> Optional[str]:
+        """Exact-key lookup in both tiers (caller holds the lock; misses aren't counted here)"""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is not None:
+            if not self._expired(entry[1], now):
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            del self._memory[key]
+            self.expirations += 1
+
+        if self._db is not None:
+            row = self._db.execute("SELECT text, created FROM transcripts WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                if not self._expired(row[1], now):
+                    self._db.execute("UPDATE transcripts SET last_used = ? WHERE key = ?", (now, key))
+                    self._db.commit()
+                    self._remember(key, row[0], row[1])
+                    self.disk_hits += 1
+                    return row[0]
+                self._db.execute("DELETE FROM transcripts WHERE key = ?", (key,))
+                self._db.commit()
+                self.expirations += 1
+        return None
+
+    def lookup(self, namespace: str, audio: np.ndarray, features: Optional[SegmentFeatures] = None) -> Optional[str]:
+        """Transcript of this float32 16 kHz audio or of a recording it replays, or None on a miss.
+
+        Pass the segment's ``features`` if they're already computed; the
+        replay tier only needs the power spectrogram.
+        """
+        key = self.key(namespace, pcm_fingerprint(audio))
+        with self._lock:
+            text = self._get(key)
+            if text is not None:
+                return text
+            replays = self._replay_index(namespace)
+            match = replays.match(features or SegmentFeatures(audio)) if replays is not None and len(replays) else None
+            if match is None:
+                self.misses += 1
+                return None
+            self.replay_hits += 1
+            self._remember(key, match.transcript, time.time())  # The same capture again is an exact hit
+            return match.transcript
+
+    def store(self, namespace: str, audio: np.ndarray, text: str, features: Optional[SegmentFeatures] = None):
+        """Cache the transcript of a segment under its exact key and, if it has words, its peak fingerprints"""
+        self.put(self.key(namespace, pcm_fingerprint(audio)), text)
+        if not text or self.max_replays <= 0:
+            return
+        with self._lock:
+            replays = self._replay_index(namespace)
+            if replays is None:
+                replays = self._replays[namespace] = AnnouncementIndex()
+            replays.add(f"segment-{time.time():.3f}", audio, text, features=features)
+            overflow = len(replays) - self.max_replays
+            if overflow > 0:
+                replays.drop_oldest(overflow)
+                self.evictions += overflow
+
+    def _replay_index(self, namespace: str) -> Optional[AnnouncementIndex]:
+        """Replay fingerprints of a namespace, loaded from the disk tier the first time it's used"""
+        if namespace not in self._replays:
+            self._replays[namespace] = None
+            path = self._replay_path(namespace)
+            if path is not None and os.path.exists(path):
+                try:
+                    self._replays[namespace] = AnnouncementIndex.load(path)
+                except Exception as e:
+                    logger.warning(f"Ignoring unreadable replay fingerprints {path}: {e}")
+        return self._replays[namespace]
+
+    def _replay_path(self, namespace: str) -> Optional[str]:
+        if not self.disk_dir:
+            return None
+        digest = hashlib.blake2b(namespace.encode(), digest_size=8).hexdigest()
+        return os.path.join(self.disk_dir, f"replays-{digest}.npz")
+
+    def put(self, key: str, text: str):
+        now = time.time()
+        with self._lock:
+            self._remember(key, text, now)
+            if self._db is not None:
+                self._db.execute("INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)", (key, text, now, now))
+                overflow = self._db.execute("SELECT COUNT(*) FROM transcripts").fetchone()[0] - self.max_disk_entries
+                if overflow > 0:
+                    self._db.execute(
+                        "DELETE FROM transcripts WHERE key IN "
+                        "(SELECT key FROM transcripts ORDER BY last_used LIMIT ?)", (overflow,)
+                    )
+                    self.evictions += overflow
+                self._db.commit()
+
+    def _remember(self, key: str, text: str, created: float):
+        self._memory[key] = (text, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.replay_hits + self.misses
+            return {
+                'entries': len(self._memory),
+                'replays': sum(len(replays) for replays in self._replays.values() if replays is not None),
+                'memory_hits': self.memory_hits,
+                'disk_hits': self.disk_hits,
+                'replay_hits': self.replay_hits,
+                'misses': self.misses,
+                'hit_rate': (self.memory_hits + self.disk_hits + self.replay_hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations
+            }
+
+    def format_stats(self) -> str:
+        s = self.stats()
+        return (f"hit rate {s['hit_rate']:.0%} ({s['memory_hits']} memory + {s['disk_hits']} disk + "
+                f"{s['replay_hits']} replay hits, {s['misses']} misses), {s['entries']} entries, "
+                f"{s['replays']} replay fingerprints, {s['evictions']} evicted, {s['expirations']} expired")
+
+    def close(self):
+        """Save the replay fingerprints to the disk tier and close it"""
+        with self._lock:
+            for namespace, replays in self._replays.items():
+                path = self._replay_path(namespace)
+                if path is not None and replays is not None and len(replays):
+                    try:
+                        replays.save(path)
+                    except OSError as e:
+                        logger.warning(f"Could not save replay fingerprints {path}: {e}")
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def create_transcription_cache() -> Optional[TranscriptionCache]:
+    """Build the cache from TRANSCRIPT_CACHE_* settings; None when TRANSCRIPT_CACHE_SIZE=0"""
+    max_entries = int(os.getenv('TRANSCRIPT_CACHE_SIZE', '256'))
+    if max_entries <= 0:
+        return None
+    ttl = float(os.getenv('TRANSCRIPT_CACHE_TTL', '0')) or None
+    return TranscriptionCache(
+        max_entries=max_entries,
+        ttl_seconds=ttl,
+        disk_dir=os.getenv('TRANSCRIPT_CACHE_DIR') or None,
+        max_disk_entries=int(os.getenv('TRANSCRIPT_CACHE_DISK_SIZE', '10000')),
+        max_replays=int(os.getenv('TRANSCRIPT_CACHE_REPLAYS', '200'))
+    )
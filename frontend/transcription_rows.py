@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Inserts into the transcriptions table that work before and after the optional migrations
+Columns added by a migration are sent when the database has them; a database without them still gets the row
+"""
+import logging
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional column -> the migration (repo root) that adds it
+OPTIONAL_COLUMNS = {
+    'rule_version': 'add-rule-version-to-transcriptions.sql',
+    'decoding_profile': 'add-decoding-profile-to-transcriptions.sql',
+    'decode_ms': 'add-decoding-profile-to-transcriptions.sql'
+}
+
+# Optional columns this database turned out not to have (for the rest of the process)
+_missing_columns = set()
+
+
+def missing_column(error: Exception) -> Optional[str]:
+    """The optional column a failed insert complained about, if any.
+
+    PostgREST reports "Could not find the '<column>' column of ..." and
+    Postgres 'column "<column>" of relation ... does not exist'.
+    """
+    message = str(error)
+    if 'column' not in message.lower():
+        return None
+    return next((column for column in OPTIONAL_COLUMNS if column in message), None)
+
+
+def insert_transcription(supabase, data: dict):
+    """Insert one transcriptions row, leaving out optional columns the database doesn't have.
+
+    The first insert that fails on a missing optional column logs which
+    migration adds it and is retried without it; later inserts skip it.
+    Any other error is raised as before.
+    """
+    while True:
+        row = {key: value for key, value in data.items() if key not in _missing_columns}
+        try:
+            return supabase.table('transcriptions').insert(row).execute()
+        except Exception as e:
+            column = missing_column(e)
+            if column is None or column in _missing_columns:
+                raise
+            _missing_columns.add(column)
+            logger.warning(f"transcriptions.{column} does not exist - saving without it "
+                           f"(run {OPTIONAL_COLUMNS[column]} to record it)")
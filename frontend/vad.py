@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Voice Activity Detection for the live transcriber
+Evaluates whole chunks of int16 PCM as (n_frames, frame_length) views in one NumPy pass
+"""
+import logging
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def frame_view(samples: np.ndarray, frame_length: int) -> np.ndarray:
+    """Reshape the complete frames in ``samples`` into an (n_frames, frame_length) view"""
+    n_frames = len(samples) // frame_length
+    return samples[:n_frames * frame_length].reshape(n_frames, frame_length)
+
+
+class VoiceActivityDetector(ABC):
+    """Pluggable VAD interface used by SpeechSegmenter.
+
+    Backends receive consecutive frames in order and may keep state between
+    calls (noise estimates, hangover), so one instance serves one stream.
+    A backend must implement speech_mask(); reset() is optional.
+    """
+
+    @abstractmethod
+    def speech_mask(self, frames: np.ndarray) -> np.ndarray:
+        """Return a boolean speech decision for every row of ``frames``"""
+
+    def reset(self) -> None:
+        """Forget any adaptive state"""
+
+
+class EnergyVAD(VoiceActivityDetector):
+    """Volume-based VAD: a frame is speech if its RMS or peak clears the threshold"""
+
+    def __init__(self, volume_threshold: float = 300):
+        self.volume_threshold = volume_threshold
+
+    def speech_mask(self, frames: np.ndarray) -> np.ndarray:
+        frames = np.atleast_2d(frames)
+        if frames.size == 0:
+            return np.zeros(len(frames), dtype=bool)
+
+        # Single float conversion shared by RMS and peak (avoids int16 abs overflow)
+        samples = frames.astype(np.float32)
+        rms = np.sqrt(np.mean(samples * samples, axis=1))
+        peak = np.max(np.abs(samples), axis=1)
+
+        return (rms > self.volume_threshold) | (peak > self.volume_threshold * 2)
+
+
+class AdaptiveVAD(VoiceActivityDetector):
+    """Multi-feature VAD with an adaptive noise floor and hangover smoothing.
+
+    A frame is speech-like when its energy clears the tracked noise floor by
+    ``snr_threshold_db``, its spectrum is not flat (noise, crowd hum and
+    ventilation are spectrally flat; voiced speech is peaky) and its
+    zero-crossing rate is below the hiss range. ``onset_frames`` consecutive
+    speech-like frames open the gate and ``hangover_frames`` keep it open
+    across short pauses between words.
+
+    The floor follows non-speech frames at ``noise_adapt_rate`` per frame and
+    creeps up by ``noise_rise_db`` per frame even through speech-like frames,
+    so a venue that gets steadily louder cannot hold the gate open forever.
+    """
+
+    def __init__(self, rate: int = 16000, snr_threshold_db: float = 9.0,
+                 flatness_threshold: float = 0.45, max_zcr: float = 0.35,
+                 min_energy_db: float = 30.0, noise_adapt_rate: float = 0.05,
+                 noise_rise_db: float = 0.03, onset_frames: int = 2, hangover_frames: int = 10):
+        self.rate = rate
+        self.snr_threshold_db = snr_threshold_db
+        self.flatness_threshold = flatness_threshold
+        self.max_zcr = max_zcr
+        self.min_energy_db = min_energy_db
+        self.noise_adapt_rate = noise_adapt_rate
+        self.noise_rise_db = noise_rise_db
+        self.onset_frames = onset_frames
+        self.hangover_frames = hangover_frames
+        self.reset()
+
+    def reset(self) -> None:
+        self.noise_floor_db = None
+        self._onset_count = 0
+        self._hangover = 0
+
+    def features(self, frames: np.ndarray):
+        """Per-frame energy (dB re. 1 LSB), spectral flatness and zero-crossing rate"""
+        samples = np.atleast_2d(frames).astype(np.float32)
+
+        energy = np.mean(samples * samples, axis=1)
+        energy_db = 10.0 * np.log10(energy + 1e-10)
+
+        # Spectral flatness: geometric / arithmetic mean of the power spectrum (window removes edge leakage)
+        window = np.hanning(samples.shape[1]).astype(np.float32)
+        power = np.abs(np.fft.rfft(samples * window, axis=1)) ** 2 + 1e-10
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+
+        signs = np.signbit(samples)
+        zcr = np.mean(signs[:, 1:] != signs[:, :-1], axis=1)
+
+        return energy_db, flatness, zcr
+
+    def speech_mask(self, frames: np.ndarray) -> np.ndarray:
+        frames = np.atleast_2d(frames)
+        if frames.size == 0:
+            return np.zeros(len(frames), dtype=bool)
+
+        energy_db, flatness, zcr = self.features(frames)
+
+        if self.noise_floor_db is None:
+            # Seed from the quietest frame seen so far
+            self.noise_floor_db = float(np.min(energy_db))
+
+        raw = (
+            (energy_db > self.noise_floor_db + self.snr_threshold_db) &
+            (energy_db > self.min_energy_db) &
+            (flatness < self.flatness_threshold) &
+            (zcr < self.max_zcr)
+        )
+
+        self._update_noise_floor(energy_db, raw)
+
+        # Onset + hangover smoothing (sequential, but only over a handful of frames per chunk)
+        mask = np.empty(len(raw), dtype=bool)
+        for i, is_speech_like in enumerate(raw):
+            if is_speech_like:
+                self._onset_count += 1
+                if self._onset_count >= self.onset_frames or self._hangover > 0:
+                    self._hangover = self.hangover_frames
+            else:
+                self._onset_count = 0
+                if self._hangover > 0:
+                    self._hangover -= 1
+            mask[i] = self._hangover > 0
+
+        return mask
+
+    def _update_noise_floor(self, energy_db: np.ndarray, raw: np.ndarray) -> None:
+        noise = energy_db[~raw]
+        if len(noise):
+            # Exponential smoothing toward the batch's noise level, applied once per noise frame
+            weight = 1.0 - (1.0 - self.noise_adapt_rate) ** len(noise)
+            self.noise_floor_db += weight * (float(np.mean(noise)) - self.noise_floor_db)
+            self.noise_floor_db = min(self.noise_floor_db, float(np.min(noise)))
+
+        speech_like = int(np.count_nonzero(raw))
+        if speech_like:
+            ceiling = float(np.min(energy_db[raw]))
+            self.noise_floor_db = min(self.noise_floor_db + self.noise_rise_db * speech_like, ceiling)
+
+
+class WebRTCVAD(VoiceActivityDetector):
+    """Wrapper around the optional ``webrtcvad`` package (10/20/30 ms frames at 8-48 kHz)"""
+
+    def __init__(self, rate: int = 16000, aggressiveness: int = 2):
+        try:
+            import webrtcvad
+        except ImportError as e:
+            raise ImportError("webrtcvad is not installed - use the 'adaptive' VAD backend instead") from e
+        self.rate = rate
+        self._vad = webrtcvad.Vad(aggressiveness)
+
+    def speech_mask(self, frames: np.ndarray) -> np.ndarray:
+        frames = np.atleast_2d(frames).astype(np.int16, copy=False)
+        return np.fromiter(
+            (self._vad.is_speech(frame.tobytes(), self.rate) for frame in frames),
+            dtype=bool, count=len(frames)
+        )
+
+
+VAD_BACKENDS = ('adaptive', 'energy', 'webrtc')
+
+
+def create_vad(name: str = 'adaptive', rate: int = 16000, volume_threshold: float = 300) -> VoiceActivityDetector:
+    """Build a VAD backend by name, falling back to the adaptive VAD if webrtcvad is unavailable"""
+    if name == 'adaptive':
+        return AdaptiveVAD(rate=rate)
+    if name == 'energy':
+        return EnergyVAD(volume_threshold)
+    if name == 'webrtc':
+        try:
+            return WebRTCVAD(rate=rate)
+        except ImportError as e:
+            logger.warning(f"{e}; falling back to adaptive VAD")
+            return AdaptiveVAD(rate=rate)
+    raise ValueError(f"Unknown VAD backend '{name}' (choose from {', '.join(VAD_BACKENDS)})")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+VAD comparison report on recorded venue audio
+Runs each VAD backend through the live segmenter and reports how much audio would be sent to Whisper
+"""
+import argparse
+import json
+import os
+import sys
+
+import numpy as np
+
+from audio_io import RATE, load_wav_16k
+from segmenter import SpeechSegmenter
+from vad import VAD_BACKENDS, create_vad
+
+CHUNK = 2048
+
+
+def segment_file(samples: np.ndarray, backend: str, max_recording_duration: float = 45.0) -> list:
+    """Feed a recording through the live segmenter in capture-sized chunks; returns segment lengths (s)"""
+    segmenter = SpeechSegmenter(
+        create_vad(backend, rate=RATE),
+        rate=RATE,
+        max_recording_duration=max_recording_duration
+    )
+    segments = []
+    for start in range(0, len(samples), CHUNK):
+        segments.extend(segmenter.feed(samples[start:start + CHUNK]))
+    segments.extend(segmenter.flush())
+    return [len(segment.audio) / RATE for segment in segments]
+
+
+def build_report(audio_dir: str, backends: list, rtf: float) -> dict:
+    files = sorted(f for f in os.listdir(audio_dir) if f.lower().endswith('.wav'))
+    report = {'audio_dir': audio_dir, 'files': len(files), 'audio_seconds': 0.0, 'backends': {}}
+
+    for backend in backends:
+        report['backends'][backend] = {'segments': 0, 'asr_seconds': 0.0, 'max_segment_seconds': 0.0}
+
+    for filename in files:
+        samples = load_wav_16k(os.path.join(audio_dir, filename))
+        report['audio_seconds'] += len(samples) / RATE
+
+        for backend in backends:
+            lengths = segment_file(samples, backend)
+            stats = report['backends'][backend]
+            stats['segments'] += len(lengths)
+            stats['asr_seconds'] += sum(lengths)
+            stats['max_segment_seconds'] = max([stats['max_segment_seconds']] + lengths)
+
+    baseline = report['backends'].get('energy')
+    for stats in report['backends'].values():
+        stats['avg_segment_seconds'] = stats['asr_seconds'] / stats['segments'] if stats['segments'] else 0.0
+        stats['estimated_decode_seconds'] = stats['asr_seconds'] * rtf
+        if baseline:
+            stats['asr_seconds_saved_vs_energy'] = baseline['asr_seconds'] - stats['asr_seconds']
+
+    return report
+
+
+def print_report(report: dict, rtf: float):
+    print("🎙️ VAD REPORT")
+    print("=" * 80)
+    print(f"Audio: {report['files']} files, {report['audio_seconds']:.1f}s from {report['audio_dir']}")
+    print(f"Decode estimate assumes real-time factor {rtf}\n")
+    print(f"{'Backend':<10} {'Segments':>9} {'ASR s':>9} {'Avg s':>7} {'Max s':>7} {'Decode s':>9} {'Saved s':>9}")
+    print("-" * 80)
+    for backend, stats in report['backends'].items():
+        saved = stats.get('asr_seconds_saved_vs_energy')
+        print(f"{backend:<10} {stats['segments']:>9} {stats['asr_seconds']:>9.1f} {stats['avg_segment_seconds']:>7.1f} "
+              f"{stats['max_segment_seconds']:>7.1f} {stats['estimated_decode_seconds']:>9.1f} "
+              f"{saved if saved is not None else float('nan'):>9.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare VAD backends on recorded venue audio")
+    parser.add_argument('audio_dir', nargs='?', default='./audio', help="Directory of WAV recordings")
+    parser.add_argument('--backends', default='energy,adaptive', help=f"Comma-separated subset of {', '.join(VAD_BACKENDS)}")
+    parser.add_argument('--rtf', type=float, default=0.3, help="Whisper real-time factor on this machine")
+    parser.add_argument('--json', help="Also write the report as JSON to this path")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.audio_dir):
+        print(f"❌ Audio directory not found: {args.audio_dir}")
+        sys.exit(1)
+
+    report = build_report(args.audio_dir, args.backends.split(','), args.rtf)
+    print_report(report, args.rtf)
+
+    if args.json:
+        with open(args.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()